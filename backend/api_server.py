@@ -7,6 +7,7 @@ import sys
 import os
 import asyncio
 import threading
+import time
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from pathlib import Path
@@ -16,6 +17,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.profile_manager import ProfileManager
 from src.database import LeadsDatabase
+from src.lead_writer import get_lead_writer, writer_metrics
+from src.analytics import get_profile_analytics
+from src.shared_store import get_shared_store
 from src.zip_lookup import get_zips_in_radius
 
 # Determine UI directory - USE TAURI FOLDER (the REAL glassmorphic UI!)
@@ -32,6 +36,13 @@ CORS(app)  # Enable CORS for frontend
 print(f"[Backend] Serving UI from: {UI_DIR}")
 print(f"[Backend] UI exists: {UI_DIR.exists()}")
 
+# /api/leads page sizes (every response is one page; follow nextCursor for more)
+DEFAULT_LEADS_PAGE_SIZE = 200
+MAX_LEADS_PAGE_SIZE = 1000
+
+# Minutes between background moves of Archived leads into leads_archive (0 = off)
+ARCHIVE_COMPACT_INTERVAL_MIN = float(os.getenv("LEADS_COMPACT_INTERVAL_MIN", "15"))
+
 # Global state
 profile_manager = ProfileManager()
 scraping_state = {
@@ -72,6 +83,12 @@ def health_check():
 
 # === PROFILE MANAGEMENT ===
 
+def analytics():
+    """Cross-profile analytics over every profile's database"""
+    return get_profile_analytics([
+        (p.profile_id, p.get_database_path()) for p in profile_manager.get_all_profiles()
+    ])
+
 @app.route('/api/profiles', methods=['GET'])
 def get_profiles():
     """Get all profiles with real lead counts from database"""
@@ -79,6 +96,14 @@ def get_profiles():
         profiles = profile_manager.get_all_profiles()
         print(f"[DEBUG] Loaded {len(profiles)} profiles", flush=True)
 
+        # Counts for every profile in one statement over the attached profile DBs;
+        # profiles it can't answer for are counted from their own file below
+        try:
+            totals = analytics().profile_totals()
+        except Exception as analytics_error:
+            print(f"[ERROR] Cross-profile totals failed, counting per profile: {analytics_error}")
+            totals = {}
+
         result_profiles = []
         for p in profiles:
             print(f"[DEBUG] Processing profile: {p.name}")
@@ -88,31 +113,18 @@ def get_profiles():
                 db_path = p.get_database_path()
                 print(f"[DEBUG] Database path: {db_path}")
 
-                # Test if file exists
-                import os
-                if not os.path.exists(db_path):
-                    print(f"[ERROR] Database file not found: {db_path}")
-                    raise FileNotFoundError(f"Database not found: {db_path}")
-
-                # Count valid leads
-                import sqlite3
-                print(f"[DEBUG] Connecting to database...")
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-
-                # Count valid
-                print(f"[DEBUG] Counting valid leads...")
-                cursor.execute('SELECT COUNT(*) FROM leads WHERE phone NOT IN ("N/A", "") AND phone IS NOT NULL AND name NOT LIKE "%![%" AND name NOT LIKE "%[Website%" AND name NOT LIKE "%About Search%"')
-                valid_count = cursor.fetchone()[0]
-                print(f"[DEBUG] Valid leads: {valid_count}")
-
-                # Count total
-                print(f"[DEBUG] Counting total leads...")
-                cursor.execute('SELECT COUNT(*) FROM leads')
-                total_count = cursor.fetchone()[0]
-                print(f"[DEBUG] Total leads: {total_count}")
-
-                conn.close()
+                if p.profile_id in totals:
+                    valid_count = totals[p.profile_id]['valid']
+                    total_count = totals[p.profile_id]['total']
+                else:
+                    if not os.path.exists(db_path):
+                        print(f"[ERROR] Database file not found: {db_path}")
+                        raise FileNotFoundError(f"Database not found: {db_path}")
+                    # Not attached (unreadable when analytics was built): read its lead_counters
+                    db = LeadsDatabase(db_path)
+                    valid_count = db.get_valid_lead_count()
+                    total_count = db.get_total_leads()
+                print(f"[DEBUG] Valid leads: {valid_count}, total leads: {total_count}")
 
                 result_profiles.append({
                     'id': p.profile_id,
@@ -153,6 +165,40 @@ def get_profiles():
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/analytics/overlaps', methods=['GET'])
+def get_profile_overlaps():
+    """Businesses stored by more than one profile"""
+    try:
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        return jsonify({
+            'success': True,
+            'overlaps': analytics().overlapping_businesses(limit)
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analytics/combos', methods=['GET'])
+def get_all_scraped_combos():
+    """ZIP + category combos scraped by any profile (optional ?zip=)"""
+    try:
+        return jsonify({
+            'success': True,
+            'combos': analytics().scraped_combos(request.args.get('zip'))
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/shared-store', methods=['GET'])
+def get_shared_store_stats():
+    """Shared lead store size and per-profile membership (enabled: false in per-profile mode)"""
+    shared_store = get_shared_store()
+    if not shared_store:
+        return jsonify({'success': True, 'enabled': False}), 200
+    try:
+        return jsonify({'success': True, 'enabled': True, 'stats': shared_store.stats()}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/profiles', methods=['POST'])
 def create_profile():
     """Create a new profile"""
@@ -296,14 +342,15 @@ def get_scrape_status():
     """Get current scraping status"""
     return jsonify({
         'success': True,
-        'status': scraping_state
+        'status': scraping_state,
+        'writers': writer_metrics()
     }), 200
 
 # === LEAD MANAGEMENT ===
 
 @app.route('/api/dashboard/<profile_id>', methods=['GET'])
 def get_dashboard_stats(profile_id):
-    """Get dashboard statistics for a profile"""
+    """Get dashboard statistics for a profile (?cities=1 adds the distinct lead cities)"""
     try:
         profile = profile_manager.get_profile(profile_id)
         if not profile:
@@ -311,6 +358,8 @@ def get_dashboard_stats(profile_id):
 
         db = LeadsDatabase(profile.get_database_path())
         stats = db.get_dashboard_stats()
+        if request.args.get('cities') in ('1', 'true'):
+            stats['cities'] = db.get_lead_cities()
 
         return jsonify({
             'success': True,
@@ -322,41 +371,163 @@ def get_dashboard_stats(profile_id):
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/maintenance/<profile_id>', methods=['POST'])
+def run_maintenance(profile_id):
+    """Integrity check, incremental vacuum and ANALYZE for a profile's database"""
+    try:
+        profile = profile_manager.get_profile(profile_id)
+        if not profile:
+            return jsonify({'success': False, 'error': 'Profile not found'}), 404
+
+        # VACUUM and integrity_check hold the write lock for a while
+        if scraping_state['active']:
+            return jsonify({'success': False, 'error': 'Scrape in progress, try again when it finishes'}), 409
+
+        data = request.json or {}
+        db = LeadsDatabase(profile.get_database_path())
+        report = db.maintain(
+            vacuum=data.get('vacuum', True),
+            analyze=data.get('analyze', True),
+            quick=data.get('quick', False)
+        )
+
+        return jsonify({
+            'success': True,
+            'healthy': not report['integrity'] and not report['counter_mismatches'],
+            'report': report
+        }), 200
+    except Exception as e:
+        print(f"[Maintenance] Error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def lead_to_json(lead) -> dict:
+    """API shape of a query_leads/search_leads row"""
+    return {
+        'id': lead[0],  # id from database
+        'name': lead[1],
+        'phone': lead[2],
+        'address': lead[3],
+        'website': lead[4],
+        'email': lead[5],
+        'category': lead[6],
+        'zipCode': lead[7],
+        'status': lead[8],
+        'city': lead[9]  # city/location from database
+    }
+
 @app.route('/api/leads/<profile_id>', methods=['GET'])
 def get_leads(profile_id):
-    """Get leads for a profile with optional filtering"""
+    """
+    Get leads for a profile, filtered and sorted server-side.
+
+    Query params: zip, category, status, city, sort (newest|oldest),
+    limit (default DEFAULT_LEADS_PAGE_SIZE) and cursor. The response is one
+    page plus nextCursor for the next call. Archived leads moved to
+    leads_archive are included for status=Archived or includeArchived=1.
+    """
     try:
         profile = profile_manager.get_profile(profile_id)
         if not profile:
             return jsonify({'success': False, 'error': 'Profile not found'}), 404
 
         # Get filter parameters
-        filter_zip = request.args.get('zip')
-        filter_category = request.args.get('category')
-        filter_status = request.args.get('status')
+        filters = {
+            'zip_code': request.args.get('zip'),
+            'category': request.args.get('category'),
+            'status': request.args.get('status'),
+            'city': request.args.get('city'),
+        }
+        sort = request.args.get('sort', 'newest')
+        cursor = request.args.get('cursor')
+        limit = max(1, min(request.args.get('limit', DEFAULT_LEADS_PAGE_SIZE, type=int), MAX_LEADS_PAGE_SIZE))
+        include_archived = request.args.get('includeArchived') in ('1', 'true')
 
         db = LeadsDatabase(profile.get_database_path())
+        # Read before the leads so a change made in between is re-sent by /changes
+        change_seq = db.get_change_seq()
+        try:
+            leads, next_cursor = db.query_leads(filters, sort=sort, after_cursor=cursor, limit=limit,
+                                                include_archived=include_archived)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
 
-        # Get all leads with status
-        leads = db.get_all_leads()
+        return jsonify({
+            'success': True,
+            'leads': [lead_to_json(lead) for lead in leads],
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None,
+            'changeSeq': change_seq
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/leads/<profile_id>/changes', methods=['GET'])
+def get_lead_changes(profile_id):
+    """
+    Lead changes since a sequence number, for clients that keep a lead list.
+
+    Query params: since (changeSeq from /api/leads or nextSince from the
+    previous call) and limit. Events are insert, status, update, delete,
+    archive and unarchive; leads holds the current state of the touched
+    leads. reset=true means the client is too far behind and should reload.
+    """
+    try:
+        profile = profile_manager.get_profile(profile_id)
+        if not profile:
+            return jsonify({'success': False, 'error': 'Profile not found'}), 404
+
+        since = request.args.get('since', 0, type=int)
+        limit = max(1, min(request.args.get('limit', DEFAULT_LEADS_PAGE_SIZE, type=int), MAX_LEADS_PAGE_SIZE))
+
+        db = LeadsDatabase(profile.get_database_path())
+        changes = db.get_lead_changes(since, limit=limit)
 
         return jsonify({
             'success': True,
-            'leads': [
-                {
-                    'id': lead[0],  # id from database
-                    'name': lead[1],
-                    'phone': lead[2],
-                    'address': lead[3],
-                    'website': lead[4],
-                    'email': lead[5],
-                    'category': lead[6] if len(lead) > 6 else 'N/A',
-                    'zipCode': lead[7] if len(lead) > 7 else 'N/A',
-                    'status': lead[8] if len(lead) > 8 else 'New',  # status from database
-                    'city': lead[9] if len(lead) > 9 else None  # city/location from database
-                }
-                for lead in leads
-            ]
+            'changes': [
+                {'seq': seq, 'leadId': lead_id, 'event': event, 'at': created_at}
+                for seq, lead_id, event, created_at in changes['events']
+            ],
+            'leads': [lead_to_json(lead) for lead in changes['leads']],
+            'nextSince': changes['last_seq'],
+            'hasMore': changes['has_more'],
+            'reset': changes['reset']
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/leads/<profile_id>/search', methods=['GET'])
+def search_leads(profile_id):
+    """
+    Full-text lead search (prefix matching, best match first).
+
+    Query params: q, plus the zip/category/status/city filters and limit
+    accepted by /api/leads.
+    """
+    try:
+        profile = profile_manager.get_profile(profile_id)
+        if not profile:
+            return jsonify({'success': False, 'error': 'Profile not found'}), 404
+
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': 'q parameter is required'}), 400
+
+        filters = {
+            'zip_code': request.args.get('zip'),
+            'category': request.args.get('category'),
+            'status': request.args.get('status'),
+            'city': request.args.get('city'),
+        }
+        limit = max(1, min(request.args.get('limit', 50, type=int), MAX_LEADS_PAGE_SIZE))
+
+        db = LeadsDatabase(profile.get_database_path())
+        leads = db.search_leads(query, filters, limit=limit)
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'leads': [lead_to_json(lead) for lead in leads]
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -401,14 +572,10 @@ def bulk_update_lead_status(profile_id):
             return jsonify({'success': False, 'error': 'Invalid status'}), 400
 
         db = LeadsDatabase(profile.get_database_path())
-        updated_count = 0
-
-        for lead_id in lead_ids:
-            try:
-                db.update_lead_status(lead_id, new_status)
-                updated_count += 1
-            except Exception as e:
-                print(f"[Bulk Update] Failed to update lead {lead_id}: {e}")
+        try:
+            updated_count = db.update_lead_status_bulk(lead_ids, new_status)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Lead IDs must be integers'}), 400
 
         return jsonify({
             'success': True,
@@ -428,14 +595,14 @@ def get_scraped_combos(profile_id):
 
         db = LeadsDatabase(profile.get_database_path())
 
-        # Query unique ZIP + Category combinations from leads
+        # Query unique ZIP + Category combinations from leads (hot and archived)
         import sqlite3
         conn = sqlite3.connect(profile.get_database_path())
         cursor = conn.cursor()
 
         cursor.execute('''
             SELECT DISTINCT zip_code, category, COUNT(*) as lead_count
-            FROM leads
+            FROM all_leads
             WHERE zip_code IS NOT NULL AND zip_code != '' AND zip_code != 'N/A'
               AND category IS NOT NULL AND category != '' AND category != 'N/A'
             GROUP BY zip_code, category
@@ -474,11 +641,25 @@ def export_leads(profile_id):
 
         data = request.json
         lead_ids = data.get('leadIds')  # None for all leads
+        # /api/leads filter params (zip, category, status, city) for "current view";
+        # exports every matching lead, not just the pages the UI has loaded
+        lead_filter = data.get('filter')
         file_format = data.get('format', 'csv')
         filename = data.get('filename', 'leads_export')
 
         db = LeadsDatabase(profile.get_database_path())
-        all_leads = db.get_all_leads()
+        # Read from a snapshot so a running scrape and the export don't wait on each other
+        with db.snapshot() as snapshot:
+            if lead_filter is not None and not lead_ids:
+                filters = {
+                    'zip_code': lead_filter.get('zip'),
+                    'category': lead_filter.get('category'),
+                    'status': lead_filter.get('status'),
+                    'city': lead_filter.get('city'),
+                }
+                all_leads, _ = snapshot.query_leads(filters, limit=None)
+            else:
+                all_leads = snapshot.get_all_leads(include_archived=True)
 
         # Filter leads if specific IDs requested
         if lead_ids:
@@ -487,6 +668,9 @@ def export_leads(profile_id):
         else:
             filtered_leads = all_leads
 
+        if not filtered_leads:
+            return jsonify({'success': False, 'error': 'No leads to export'}), 400
+
         # Prepare data
         headers = ['ID', 'Name', 'Phone', 'Address', 'Website', 'Email', 'Category', 'ZIP Code', 'Status']
         rows = []
@@ -633,10 +817,17 @@ def run_scrape_job(profile_id, zip_code, category, max_pages):
         scraping_state['progress'] = 10
         scraping_state['current_page'] = 0
 
-        # Use UNIVERSAL scraper - tries Google Maps with advanced anti-detection
-        from src.scraper_universal import scrape_with_selenium
-        max_results = max_pages * 25
-        leads = scrape_with_selenium(zip_code, category, max_results)
+        # Shared store mode: reuse a combo another profile already scraped
+        shared_store = get_shared_store()
+        leads = shared_store.claim_combo(profile_id, zip_code, category) if shared_store else []
+        reused_shared = bool(leads)
+        if reused_shared:
+            add_log(f"[SHARED] {len(leads)} businesses already scraped by another profile, skipping the scrape", 'info')
+        else:
+            # Use UNIVERSAL scraper - tries Google Maps with advanced anti-detection
+            from src.scraper_universal import scrape_with_selenium
+            max_results = max_pages * 25
+            leads = scrape_with_selenium(zip_code, category, max_results)
 
         scraping_state['total_leads'] = len(leads)
         scraping_state['progress'] = 85
@@ -660,24 +851,26 @@ def run_scrape_job(profile_id, zip_code, category, max_pages):
             except Exception as e:
                 add_log(f"[WARNING] Could not lookup city for ZIP {zip_code}: {e}", 'info')
 
+            invalid_count = 0
+            skip_validation = reused_shared
+            if shared_store and not reused_shared:
+                # Validated once in the shared store; the profile DB gets the valid ones
+                shared = shared_store.add_leads(profile_id, leads, zip_code=zip_code, category=category, city=city_name)
+                add_log(f"[SHARED] {shared['inserted']} new, {shared['reused']} already in the shared store", 'info')
+                leads, invalid_count, skip_validation = shared['valid_leads'], shared['invalid'], True
+
             db = LeadsDatabase(profile.get_database_path())
-            saved_count = 0
-            for lead in leads:
-                success, reason = db.add_lead(
-                    name=lead['name'],
-                    address=lead['address'],
-                    phone=lead['phone_number'],
-                    email=lead.get('email'),
-                    website=lead.get('website'),
-                    category=category,
-                    zip_code=zip_code,
-                    location=city_name
-                )
-                if success:
-                    saved_count += 1
+            # Written by the profile's writer thread. A job is a single combo, so this is
+            # the job-end wait: the UI reads the counts below once 'active' drops
+            ticket = get_lead_writer(db).submit(leads, zip_code=zip_code, category=category, location=city_name,
+                                                skip_validation=skip_validation)
+            result = ticket.wait()
+            saved_count = result['inserted']
+            result['invalid'] = result.get('invalid', 0) + invalid_count
 
             scraping_state['progress'] = 95
-            add_log(f"[INFO] Saved {saved_count} unique leads to database", 'info')
+            add_log(f"[INFO] Saved {saved_count} unique leads to database "
+                    f"({result['duplicates']} duplicates, {result['invalid']} invalid)", 'info')
 
             profile_manager.update_profile_leads(profile_id, db.get_total_leads())
             add_log(f"[COMPLETE] Total unique businesses: {len(leads)}", 'success')
@@ -695,6 +888,21 @@ def run_scrape_job(profile_id, zip_code, category, max_pages):
         scraping_state['active'] = False
         scraping_state['paused'] = False
 
+def run_archive_compaction():
+    """Background job: keep every profile's hot leads table free of Archived leads"""
+    while True:
+        time.sleep(ARCHIVE_COMPACT_INTERVAL_MIN * 60)
+        for profile in profile_manager.get_all_profiles():
+            db_path = profile.get_database_path()
+            if not os.path.exists(db_path):
+                continue
+            try:
+                moved = LeadsDatabase(db_path).compact_archive()
+                if moved:
+                    print(f"[Archive] {profile.profile_id}: moved {moved} lead(s) to leads_archive")
+            except Exception as e:
+                print(f"[Archive] {profile.profile_id}: compaction failed: {e}")
+
 # === SERVER STARTUP ===
 
 if __name__ == '__main__':
@@ -702,6 +910,9 @@ if __name__ == '__main__':
     print(f"[API Server] Starting on http://localhost:{port}")
     print("[API Server] Press Ctrl+C to stop")
 
+    if ARCHIVE_COMPACT_INTERVAL_MIN > 0:
+        threading.Thread(target=run_archive_compaction, name='archive-compaction', daemon=True).start()
+
     app.run(
         host='127.0.0.1',  # Localhost only for security
         port=port,
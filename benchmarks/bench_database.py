@@ -0,0 +1,157 @@
+"""
+LeadsDatabase micro-benchmark.
+
+Builds a throwaway DB with N synthetic leads, then measures the hot paths
+the scrapers hit: add_lead, is_duplicate, the clean_and_dedupe loop
+(is_duplicate + add_lead per lead) and the dashboard/lead-list reads.
+
+    python benchmarks/bench_database.py --leads 100000 --ops 2000
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import LeadsDatabase
+
+CATEGORIES = ["Pet Groomers", "Dog Trainers", "Veterinarians", "Pet Sitters", "Kennels"]
+STREETS = ["Main St", "Oak Ave", "Pine Rd", "Maple Dr", "Cedar Ln", "Elm St"]
+
+
+def make_lead(i: int, rng: random.Random) -> dict:
+    return {
+        'name': f"Business {i} {rng.choice(CATEGORIES)}",
+        'phone': f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{i % 10000:04d}",
+        'address': f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+        'email': 'N/A',
+        'website': f"https://business{i}.com",
+        'zip_code': f"{33000 + i % 500}",
+        'category': rng.choice(CATEGORIES),
+        'location': 'Benchmark City',
+    }
+
+
+def seed_database(db: LeadsDatabase, count: int, rng: random.Random) -> list:
+    """Bulk-load count leads with one raw transaction (setup, not measured)"""
+    leads = [make_lead(i, rng) for i in range(count)]
+    # First lead through the public API so any lazily added columns exist
+    first = leads[0]
+    db.add_lead(first['name'], first['address'], first['phone'], first['email'], first['website'],
+                first['zip_code'], first['category'], first['location'])
+    rows = [
+        (db._generate_hash(l['name'], l['phone'], l['address']), l['name'], l['address'], l['phone'],
+         l['email'], l['website'], l['zip_code'], l['category'], l['location'])
+        for l in leads
+    ]
+    conn = sqlite3.connect(db.db_path)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(leads)')}
+    if 'is_valid' in columns:
+        # Synthetic leads all have a phone and a clean name
+        conn.executemany('''
+            INSERT OR IGNORE INTO leads
+            (business_hash, name, address, phone, email, website, zip_code, category, location, is_valid)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+        ''', rows)
+    else:
+        conn.executemany('''
+            INSERT OR IGNORE INTO leads
+            (business_hash, name, address, phone, email, website, zip_code, category, location)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    conn.commit()
+    conn.close()
+    return leads
+
+
+def timed(label: str, ops: int, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    rate = ops / elapsed if elapsed else float('inf')
+    print(f"   {label:<32} {ops:>7} ops  {elapsed:8.3f}s  {rate:>10,.0f} ops/s")
+    return rate
+
+
+def run(lead_count: int, ops: int, workdir: str):
+    rng = random.Random(1234)
+    db_path = os.path.join(workdir, "bench_leads.db")
+    db = LeadsDatabase(db_path)
+
+    print(f"📦 Seeding {lead_count:,} leads...")
+    started = time.perf_counter()
+    existing = seed_database(db, lead_count, rng)
+    print(f"   done in {time.perf_counter() - started:.1f}s\n")
+
+    new_leads = [make_lead(lead_count + i, rng) for i in range(ops * 2)]
+    probes = [rng.choice(existing) for _ in range(ops * 5)]
+
+    print("⏱️  Results")
+
+    def insert_leads():
+        for lead in new_leads[:ops]:
+            db.add_lead(lead['name'], lead['address'], lead['phone'], lead['email'], lead['website'],
+                        lead['zip_code'], lead['category'], lead['location'])
+
+    def dedupe_checks():
+        for lead in probes:
+            db.is_duplicate(lead['name'], lead['phone'], lead['address'])
+
+    def clean_and_dedupe_loop(batch):
+        # Same call pattern as leadgen_cli.clean_and_dedupe: half new, half known
+        for lead in batch:
+            if db.is_duplicate(lead['name'], lead['phone'], lead['address']):
+                continue
+            db.add_lead(lead['name'], lead['address'], lead['phone'], lead['email'], lead['website'],
+                        lead['zip_code'], lead['category'], lead['location'])
+
+    timed("add_lead (inserts)", ops, insert_leads)
+    if hasattr(db, 'add_leads_bulk'):
+        bulk = [make_lead(lead_count + ops * 2 + i, rng) for i in range(ops)]
+        for lead in bulk:
+            lead['phone_number'] = lead.pop('phone')
+        timed("add_leads_bulk (inserts)", ops, lambda: db.add_leads_bulk(bulk, location='Benchmark City'))
+    timed("is_duplicate (dedupe checks)", len(probes), dedupe_checks)
+    half = ops // 2
+    timed("clean_and_dedupe loop", ops,
+          lambda: clean_and_dedupe_loop(new_leads[ops:ops + half] + probes[:half]))
+    if hasattr(db, 'transaction'):
+        def batched_loop():
+            with db.transaction():
+                clean_and_dedupe_loop(new_leads[ops + half:ops * 2] + probes[half:ops])
+        timed("clean_and_dedupe loop (1 tx)", ops, batched_loop)
+    if hasattr(db, 'find_existing_leads'):
+        batch_leads = [make_lead(lead_count + ops * 3 + i, rng) for i in range(half)] + probes[ops:ops + half]
+
+        def batched_probe():
+            # leadgen_cli.clean_and_dedupe now: one probe query, one bulk insert
+            records = [{**lead, 'phone_number': lead['phone']} for lead in batch_leads]
+            existing = db.find_existing_leads(records)
+            db.add_leads_bulk([r for r, known in zip(records, existing) if not known], location='Benchmark City')
+        timed("clean_and_dedupe (batched)", ops, batched_probe)
+    timed("get_all_leads", 5, lambda: [db.get_all_leads() for _ in range(5)])
+    timed("get_dashboard_stats", 5, lambda: [db.get_dashboard_stats() for _ in range(5)])
+
+    if hasattr(db, 'close'):
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LeadsDatabase hot paths")
+    parser.add_argument('--leads', type=int, default=100000, help='Leads to seed before measuring')
+    parser.add_argument('--ops', type=int, default=2000, help='Operations per measured step')
+    parser.add_argument('--keep', help='Directory to build the DB in (kept afterwards)')
+    args = parser.parse_args()
+
+    workdir = args.keep or tempfile.mkdtemp(prefix="leads_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        run(args.leads, args.ops, workdir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,129 @@
+"""
+Concurrent reader/writer stress test for LeadsDatabase.
+
+Mimics the API server during a scrape: one writer thread ingests leads in
+batches (like run_scrape_job) while several reader threads hit the lead
+list and dashboard queries (like /api/leads and /api/dashboard).
+Reports per-operation latencies and "database is locked" errors.
+
+    python benchmarks/stress_concurrency.py --seconds 10 --readers 4
+    python benchmarks/stress_concurrency.py --journal-mode DELETE   # old behaviour
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label: str, latencies: list, errors: int):
+    print(f"   {label:<22} {len(latencies):>6} ops  "
+          f"p50 {percentile(latencies, 50) * 1000:7.1f}ms  "
+          f"p95 {percentile(latencies, 95) * 1000:7.1f}ms  "
+          f"max {max(latencies, default=0) * 1000:7.1f}ms  "
+          f"errors {errors}")
+
+
+def run(seconds: float, readers: int, seed_leads: int, batch_size: int, workdir: str):
+    from src.database import LeadsDatabase, JOURNAL_MODE
+    from benchmarks.bench_database import make_lead, seed_database
+
+    rng = random.Random(99)
+    db_path = os.path.join(workdir, "stress_leads.db")
+    db = LeadsDatabase(db_path)
+    print(f"📦 Seeding {seed_leads:,} leads (journal_mode={JOURNAL_MODE})...")
+    seed_database(db, seed_leads, rng)
+
+    stop = threading.Event()
+    results = {'write': [], 'list': [], 'dashboard': []}
+    errors = {'write': 0, 'list': 0, 'dashboard': 0}
+    lock = threading.Lock()
+
+    def record(kind, started, failed=False):
+        elapsed = time.perf_counter() - started
+        with lock:
+            if failed:
+                errors[kind] += 1
+            else:
+                results[kind].append(elapsed)
+
+    def writer():
+        local_db = LeadsDatabase(db_path)
+        next_id = seed_leads
+        while not stop.is_set():
+            batch = []
+            for _ in range(batch_size):
+                lead = make_lead(next_id, rng)
+                lead['phone_number'] = lead.pop('phone')
+                batch.append(lead)
+                next_id += 1
+            started = time.perf_counter()
+            try:
+                local_db.add_leads_bulk(batch, location='Stress City')
+                record('write', started)
+            except sqlite3.OperationalError:
+                record('write', started, failed=True)
+            time.sleep(0.01)
+
+    def reader(index: int):
+        local_db = LeadsDatabase(db_path)
+        while not stop.is_set():
+            kind = 'list' if index % 2 == 0 else 'dashboard'
+            started = time.perf_counter()
+            try:
+                if kind == 'list':
+                    local_db.get_all_leads()
+                else:
+                    local_db.get_dashboard_stats()
+                record(kind, started)
+            except sqlite3.OperationalError:
+                record(kind, started, failed=True)
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+
+    print(f"⏱️  Running 1 writer + {readers} readers for {seconds:.0f}s...")
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print("\n📊 Latencies")
+    report(f"write ({batch_size}-lead batch)", results['write'], errors['write'])
+    report("get_all_leads", results['list'], errors['list'])
+    report("get_dashboard_stats", results['dashboard'], errors['dashboard'])
+    print(f"\n   Leads written: {len(results['write']) * batch_size:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent reader/writer stress test")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--leads', type=int, default=20000, help='Leads to seed before the run')
+    parser.add_argument('--batch-size', type=int, default=50, help='Leads per writer transaction')
+    parser.add_argument('--journal-mode', help='Override LEADS_DB_JOURNAL_MODE (e.g. DELETE for the old behaviour)')
+    args = parser.parse_args()
+
+    if args.journal_mode:
+        os.environ["LEADS_DB_JOURNAL_MODE"] = args.journal_mode
+
+    workdir = tempfile.mkdtemp(prefix="leads_stress_")
+    try:
+        run(args.seconds, args.readers, args.leads, args.batch_size, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
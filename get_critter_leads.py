@@ -8,9 +8,11 @@ import os
 from datetime import datetime
 from dotenv import load_dotenv
 from crawl4ai import AsyncWebCrawler
-from src.scraper import get_browser_config, get_llm_strategy, fetch_and_process_page
+from src.scraper import (
+    build_search_url, get_browser_config, get_batch_llm_strategy, fetch_and_process_page, extraction_stats
+)
 from src.database import LeadsDatabase
-from models.business import BusinessData
+from src.llm_scheduler import get_scheduler
 
 # Load environment variables
 load_dotenv(override=True)
@@ -29,11 +31,6 @@ AVAILABLE_CATEGORIES = [
 
 MAX_PAGES_PER_SEARCH = 2
 
-SCRAPER_INSTRUCTIONS = (
-    "Extract all business information: 'name', 'address', 'website', 'phone_number', "
-    "'email' (if available, otherwise 'N/A') from the following content."
-)
-
 
 def show_menu():
     """Display interactive menu"""
@@ -137,14 +134,11 @@ async def scrape_zip_category(zip_code: str, category: str, db: LeadsDatabase):
     print(f"\n🔍 Scraping: {category} in ZIP {zip_code}")
     
     # Build URL
-    base_url = f"https://www.yellowpages.com/search?search_terms={category.replace(' ', '+')}&geo_location_terms={zip_code}&page={{page_number}}"
+    base_url = build_search_url(category, zip_code)
     css_selector = ".result"
     
     browser_config = get_browser_config()
-    llm_strategy = get_llm_strategy(
-        llm_instructions=SCRAPER_INSTRUCTIONS,
-        output_format=BusinessData
-    )
+    llm_strategy = get_batch_llm_strategy()
     session_id = f"critter_{zip_code}_{category}".replace(" ", "_")
     
     all_records = []
@@ -160,6 +154,7 @@ async def scrape_zip_category(zip_code: str, category: str, db: LeadsDatabase):
                 llm_strategy,
                 session_id,
                 seen_names,
+                db,
             )
             
             if no_results_found or not records:
@@ -213,46 +208,9 @@ def save_leads(leads, zip_code, category, lead_number):
 
 def clean_leads(leads, db: LeadsDatabase):
     """Remove duplicates using database"""
-    clean_leads = []
-    session_dupes = 0
-    db_dupes = 0
-    seen_session = set()
-    
-    for lead in leads:
-        if not lead.get('name') or not lead.get('phone_number'):
-            continue
-        
-        name = lead['name'].strip()
-        phone = lead['phone_number'].strip()
-        address = lead.get('address', '').strip()
-        
-        # Check session duplicates
-        key = (name.lower(), phone)
-        if key in seen_session:
-            session_dupes += 1
-            continue
-        
-        # Check database duplicates
-        if db.is_duplicate(name, phone, address):
-            db_dupes += 1
-            continue
-        
-        # New unique lead
-        seen_session.add(key)
-        clean_leads.append(lead)
-        
-        # Add to database
-        db.add_lead(
-            name=name,
-            address=address,
-            phone=phone,
-            email=lead.get('email', 'N/A'),
-            website=lead.get('website', 'N/A'),
-            zip_code=lead.get('zip_code', ''),
-            category=lead.get('category', ''),
-            location="Tampa Bay Area",
-            source_file="get_critter_leads.py"
-        )
+    clean_leads, session_dupes, db_dupes = db.add_new_leads(
+        leads, location="Tampa Bay Area", source_file="get_critter_leads.py"
+    )
     
     total_removed = len(leads) - len(clean_leads)
     if total_removed > 0:
@@ -305,6 +263,8 @@ async def run_scraper():
     print(f"   📊 Total leads scraped: {len(all_leads)}")
     print(f"   ✨ NEW unique leads: {new_leads}")
     print(f"   💾 Total in database: {final_count}")
+    print(f"   🧠 Extraction: {extraction_stats.summary()}")
+    print(f"   🚦 Scheduler: {get_scheduler().summary()}")
     print("\n   📁 Check data/leads/ folder for your CSV files!")
     print("=" * 60)
 
@@ -11,6 +11,7 @@ import threading
 import time
 import select
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
@@ -28,11 +29,15 @@ import nest_asyncio
 nest_asyncio.apply()
 
 from crawl4ai import AsyncWebCrawler
-from src.scraper import get_browser_config, get_llm_strategy, fetch_and_process_page
+from src.scraper import (
+    build_search_url, get_browser_config, get_batch_llm_strategy, fetch_and_process_page,
+    queue_page_for_batch, filter_new_businesses, extract_business_from_html, extraction_stats
+)
+from src.llm_batcher import LLMBatcher
+from src.llm_scheduler import get_scheduler
 from src.database import LeadsDatabase
 from src.zip_lookup import get_zips_in_radius
 from src.tracking import ZipTracker
-from models.business import BusinessData
 
 # Load environment variables
 load_dotenv(override=True)
@@ -52,11 +57,6 @@ CATEGORIES = [
 
 MAX_PAGES_PER_SEARCH = 2
 
-SCRAPER_INSTRUCTIONS = (
-    "Extract all business information: 'name', 'address', 'website', 'phone_number', "
-    "'email' (if available, otherwise 'N/A') from the following content."
-)
-
 # Global autopilot state
 AUTOPILOT_STATE = {
     'running': False,
@@ -323,15 +323,12 @@ async def autopilot_scrape_zip_category(zip_code: str, category: str, tracker: Z
     print(f"\n🚀 Auto-scraping {zip_code} - {category}")
     
     # Build URL
-    base_url = f"https://www.yellowpages.com/search?search_terms={category.replace(' ', '+')}&geo_location_terms={zip_code}&page={{page_number}}"
+    base_url = build_search_url(category, zip_code)
     css_selector = ".result"
     
     try:
         browser_config = get_browser_config()
-        llm_strategy = get_llm_strategy(
-            llm_instructions=SCRAPER_INSTRUCTIONS,
-            output_format=BusinessData
-        )
+        llm_strategy = get_batch_llm_strategy()
         session_id = f"critter_{zip_code}_{category}".replace(" ", "_")
         
         all_records = []
@@ -357,6 +354,7 @@ async def autopilot_scrape_zip_category(zip_code: str, category: str, tracker: Z
                         llm_strategy,
                         session_id,
                         seen_names,
+                        db,
                     )
                     
                     if no_results_found:
@@ -384,53 +382,7 @@ async def autopilot_scrape_zip_category(zip_code: str, category: str, tracker: Z
                         print(f"   ❌ Error on page {page_number}: {e}")
                         continue
         
-        # Clean and dedupe with error handling
-        if all_records:
-            try:
-                clean_leads = clean_and_dedupe(all_records, db)
-                
-                # Save leads
-                if clean_leads:
-                    # Generate lead number
-                    existing_leads = []
-                    if os.path.exists("data/leads"):
-                        for category_folder in os.listdir("data/leads"):
-                            cat_path = os.path.join("data/leads", category_folder)
-                            if os.path.isdir(cat_path):
-                                for lead_folder in os.listdir(cat_path):
-                                    if lead_folder.startswith("lead_") and "_zip_" in lead_folder:
-                                        try:
-                                            num = int(lead_folder.split("_")[1])
-                                            existing_leads.append(num)
-                                        except:
-                                            pass
-                    
-                    lead_number = max(existing_leads) + 1 if existing_leads else 1
-                    
-                    # Save to CSV
-                    output_file = save_leads(clean_leads, zip_code, category, lead_number, tracker)
-                    
-                    if output_file:
-                        # Mark as used in tracker
-                        tracker.mark_used(
-                            zip_code=zip_code,
-                            category=category,
-                            leads_count=len(clean_leads),
-                            output_file=output_file
-                        )
-                        
-                        # Update total leads count
-                        AUTOPILOT_STATE['total_leads'] += len(clean_leads)
-                        
-                        print(f"   ✅ Saved {len(clean_leads)} leads")
-                    else:
-                        print(f"   ❌ Failed to save leads")
-                else:
-                    print(f"   ⚠️ No valid leads after cleaning")
-            except Exception as e:
-                print(f"   ⚠️ Error processing leads: {e}")
-        else:
-            print(f"   ⚠️ No leads found")
+        save_combo_leads(all_records, zip_code, category, tracker, db)
         
         return all_records
         
@@ -443,6 +395,131 @@ async def autopilot_scrape_zip_category(zip_code: str, category: str, tracker: Z
         return []
 
 
+async def autopilot_queue_zip_category(zip_code: str, category: str, llm_batcher: LLMBatcher,
+                                      db: Optional[LeadsDatabase] = None) -> bool:
+    """
+    Fetch the pages for a ZIP + category combo and queue their cards on the
+    shared batcher. Extraction happens later in one request for many combos.
+    Returns True if any cards were queued.
+    """
+    global AUTOPILOT_STATE
+
+    AUTOPILOT_STATE['current_zip'] = zip_code
+    AUTOPILOT_STATE['current_category'] = category
+    update_status_display()
+
+    await wait_for_resume()
+    if AUTOPILOT_STATE['should_quit']:
+        return False
+
+    print(f"\n🚀 Auto-scraping {zip_code} - {category} (batched)")
+
+    base_url = build_search_url(category, zip_code)
+    session_id = f"critter_{zip_code}_{category}".replace(" ", "_")
+    combo_key = f"{zip_code}|{category}"
+    total_queued = 0
+
+    try:
+        async with AsyncWebCrawler(config=get_browser_config()) as crawler:
+            for page_number in range(1, MAX_PAGES_PER_SEARCH + 1):
+                if AUTOPILOT_STATE['should_quit']:
+                    break
+                await wait_for_resume()
+                if AUTOPILOT_STATE['should_quit']:
+                    break
+
+                queued, no_results_found = await queue_page_for_batch(
+                    crawler,
+                    page_number,
+                    base_url,
+                    session_id,
+                    llm_batcher,
+                    combo_key,
+                    db,
+                )
+                if no_results_found or not queued:
+                    break
+
+                total_queued += queued
+                await asyncio.sleep(2)  # Be respectful
+    except Exception as e:
+        print(f"   ❌ Scraping error: {e}")
+
+    return total_queued > 0
+
+
+async def finalize_batched_combos(pending_combos, llm_batcher: LLMBatcher, tracker: ZipTracker, db: LeadsDatabase):
+    """Run the queued batch extraction and save results for every pending combo"""
+    if not pending_combos:
+        return
+
+    print(f"\n🤖 Batch extracting {len(pending_combos)} combo(s)...")
+    await llm_batcher.flush()
+    print(f"   📊 {llm_batcher.summary()}")
+
+    for zip_code, category in pending_combos:
+        records = filter_new_businesses(llm_batcher.take(f"{zip_code}|{category}"), set())
+        for record in records:
+            record['category'] = category
+            record['zip_code'] = zip_code
+
+        print(f"\n📦 {zip_code} - {category}: {len(records)} leads")
+        save_combo_leads(records, zip_code, category, tracker, db)
+
+    pending_combos.clear()
+
+
+def save_combo_leads(all_records, zip_code: str, category: str, tracker: ZipTracker, db: LeadsDatabase):
+    """Clean, dedupe and save the records scraped for one ZIP + category combo"""
+    # Clean and dedupe with error handling
+    if all_records:
+        try:
+            clean_leads = clean_and_dedupe(all_records, db)
+            
+            # Save leads
+            if clean_leads:
+                # Generate lead number
+                existing_leads = []
+                if os.path.exists("data/leads"):
+                    for category_folder in os.listdir("data/leads"):
+                        cat_path = os.path.join("data/leads", category_folder)
+                        if os.path.isdir(cat_path):
+                            for lead_folder in os.listdir(cat_path):
+                                if lead_folder.startswith("lead_") and "_zip_" in lead_folder:
+                                    try:
+                                        num = int(lead_folder.split("_")[1])
+                                        existing_leads.append(num)
+                                    except:
+                                        pass
+                
+                lead_number = max(existing_leads) + 1 if existing_leads else 1
+                
+                # Save to CSV
+                output_file = save_leads(clean_leads, zip_code, category, lead_number, tracker)
+                
+                if output_file:
+                    # Mark as used in tracker
+                    tracker.mark_used(
+                        zip_code=zip_code,
+                        category=category,
+                        leads_count=len(clean_leads),
+                        output_file=output_file
+                    )
+                    
+                    # Update total leads count
+                    AUTOPILOT_STATE['total_leads'] += len(clean_leads)
+                    
+                    print(f"   ✅ Saved {len(clean_leads)} leads")
+                else:
+                    print(f"   ❌ Failed to save leads")
+            else:
+                print(f"   ⚠️ No valid leads after cleaning")
+        except Exception as e:
+            print(f"   ⚠️ Error processing leads: {e}")
+    else:
+        print(f"   ⚠️ No leads found")
+
+
 def display_automation_status(zip_code, city, category, zip_index, total_zips, cat_index, total_categories, total_leads):
     """Display automation status"""
     print("\n" + "=" * 60)
@@ -538,6 +615,11 @@ async def run_automation_mode():
     
     # Show initial status
     print_automation_status()
+
+    # Batch card extraction across combos when an LLM is configured
+    batch_strategy = get_batch_llm_strategy()
+    llm_batcher = LLMBatcher(batch_strategy, fallback_extractor=extract_business_from_html) if batch_strategy else None
+    pending_combos = []
     
     try:
         # Loop through each ZIP
@@ -581,7 +663,13 @@ async def run_automation_mode():
                 
                 # Scrape this ZIP + category combination with error handling
                 try:
-                    leads = await autopilot_scrape_zip_category(zip_code, category, tracker, db)
+                    if llm_batcher:
+                        if await autopilot_queue_zip_category(zip_code, category, llm_batcher, db):
+                            pending_combos.append((zip_code, category))
+                        if llm_batcher.ready:
+                            await finalize_batched_combos(pending_combos, llm_batcher, tracker, db)
+                    else:
+                        leads = await autopilot_scrape_zip_category(zip_code, category, tracker, db)
                 except Exception as e:
                     print(f"\n⚠️ Error scraping {zip_code} - {category}: {e}")
                     print("   Continuing to next category...")
@@ -593,6 +681,10 @@ async def run_automation_mode():
                 # Small delay between categories
                 await asyncio.sleep(1)
         
+        # Extract whatever is still queued (also runs when the user quits)
+        if llm_batcher:
+            await finalize_batched_combos(pending_combos, llm_batcher, tracker, db)
+
         # Completion
         if not AUTOPILOT_STATE['should_quit']:
             print(f"\n\n✅ Automation complete — all ZIPs and categories scraped. Total leads collected: {AUTOPILOT_STATE['total_leads']}")
@@ -604,6 +696,10 @@ async def run_automation_mode():
     finally:
         # Clean up
         stop_keyboard_listener()
+        print(f"\n🧠 Extraction: {extraction_stats.summary()}")
+        if llm_batcher:
+            print(f"   {llm_batcher.summary()}")
+        print(f"🚦 Scheduler: {get_scheduler().summary()}")
         print(f"\n💾 Progress saved to tracker.")
 
 
@@ -720,7 +816,7 @@ def select_category(zip_code: str, tracker: ZipTracker):
     return selected
 
 
-async def scrape_zip_category(zip_code: str, category: str):
+async def scrape_zip_category(zip_code: str, category: str, db: Optional[LeadsDatabase] = None):
     """Scrape a single ZIP + category combination with network resilience"""
     print(f"\n{'='*60}")
     print(f"🚀 Starting scrape...")
@@ -729,15 +825,12 @@ async def scrape_zip_category(zip_code: str, category: str):
     print(f"{'='*60}\n")
     
     # Build URL
-    base_url = f"https://www.yellowpages.com/search?search_terms={category.replace(' ', '+')}&geo_location_terms={zip_code}&page={{page_number}}"
+    base_url = build_search_url(category, zip_code)
     css_selector = ".result"
     
     try:
         browser_config = get_browser_config()
-        llm_strategy = get_llm_strategy(
-            llm_instructions=SCRAPER_INSTRUCTIONS,
-            output_format=BusinessData
-        )
+        llm_strategy = get_batch_llm_strategy()
         session_id = f"critter_{zip_code}_{category}".replace(" ", "_")
 
         all_records = []
@@ -756,6 +849,7 @@ async def scrape_zip_category(zip_code: str, category: str):
                         llm_strategy,
                         session_id,
                         seen_names,
+                        db,
                     )
 
                     if no_results_found:
@@ -786,6 +880,8 @@ async def scrape_zip_category(zip_code: str, category: str):
                         continue
 
         print(f"\n   📊 Total leads found: {len(all_records)}")
+        print(f"   🧠 Extraction: {extraction_stats.summary()}")
+        print(f"   🚦 Scheduler: {get_scheduler().summary()}")
         return all_records
 
     except Exception as e:
@@ -805,46 +901,9 @@ def clean_and_dedupe(leads, db: LeadsDatabase):
     
     print(f"\n🧹 Cleaning and deduplicating {len(leads)} leads...")
     
-    clean_leads = []
-    session_dupes = 0
-    db_dupes = 0
-    seen_session = set()
-    
-    for lead in leads:
-        if not lead.get('name') or not lead.get('phone_number'):
-            continue
-        
-        name = lead['name'].strip()
-        phone = lead['phone_number'].strip()
-        address = lead.get('address', '').strip()
-        
-        # Check session duplicates
-        key = (name.lower(), phone)
-        if key in seen_session:
-            session_dupes += 1
-            continue
-        
-        # Check database duplicates
-        if db.is_duplicate(name, phone, address):
-            db_dupes += 1
-            continue
-        
-        # New unique lead
-        seen_session.add(key)
-        clean_leads.append(lead)
-        
-        # Add to database
-        db.add_lead(
-            name=name,
-            address=address,
-            phone=phone,
-            email=lead.get('email', 'N/A'),
-            website=lead.get('website', 'N/A'),
-            zip_code=lead.get('zip_code', ''),
-            category=lead.get('category', ''),
-            location="Tampa Bay Area",
-            source_file="leadgen_cli.py"
-        )
+    clean_leads, session_dupes, db_dupes = db.add_new_leads(
+        leads, location="Tampa Bay Area", source_file="leadgen_cli.py"
+    )
     
     total_removed = len(leads) - len(clean_leads)
     if total_removed > 0:
@@ -1039,7 +1098,7 @@ async def run_interactive_flow():
     
     # Run scraper with error handling
     try:
-        leads = await scrape_zip_category(selected_zip, selected_category)
+        leads = await scrape_zip_category(selected_zip, selected_category, db)
     except Exception as e:
         print(f"\n❌ Scraping failed: {e}")
         print("\n❌ Persistent network issue — please check your internet or try again later.")
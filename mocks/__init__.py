@@ -0,0 +1,8 @@
+"""
+Local stand-ins for the external services the scrapers depend on, so the
+CLIs, fetch_and_process_page and the API server can be benchmarked offline.
+
+    python -m mocks            # start both servers and print the env to use
+"""
+from mocks.listing_server import ListingConfig, start_listing_server
+from mocks.llm_server import LLMConfig, start_llm_server, extract_records
@@ -0,0 +1,43 @@
+"""
+Start the mock listing site and mock LLM endpoint together.
+
+    python -m mocks --pages 5 --llm-latency 1.0 --rate-limit-every 10
+"""
+import argparse
+import time
+
+from mocks.listing_server import add_listing_arguments, listing_config_from_args, start_listing_server
+from mocks.llm_server import add_llm_arguments, llm_config_from_args, start_llm_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline mocks for listing sites and the LLM provider")
+    add_listing_arguments(parser)
+    add_llm_arguments(parser)
+    args = parser.parse_args()
+
+    listing = start_listing_server(port=args.listing_port, config=listing_config_from_args(args))
+    llm = start_llm_server(port=args.llm_port, config=llm_config_from_args(args))
+
+    print("=" * 60)
+    print("🧪 Mock servers running (Ctrl+C to stop)")
+    print("=" * 60)
+    print("Set these before starting a scraper / the API server:\n")
+    print(f"  LISTING_BASE_URL=http://127.0.0.1:{args.listing_port}")
+    print(f"  MAPS_BASE_URL=http://127.0.0.1:{args.listing_port}/maps")
+    print(f"  LLM_BASE_URL=http://127.0.0.1:{args.llm_port}/v1")
+    print("  LLM_MODEL=openai/mock-extractor")
+    print("  GEMINI_API_KEY=mock-key")
+    print("\nSpecial ZIPs: 00000 = No Results Found, 99999 = challenge page")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping mock servers...")
+        listing.shutdown()
+        llm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Mock listing site (YellowPages search + Google Maps search) for offline runs.
+
+Routes:
+    /search?search_terms=<category>&geo_location_terms=<zip>&page=<n>
+        YellowPages-style results page, "No Results Found" past the last page
+    /maps/search/<query>
+        Google Maps-style results feed
+
+Special cases:
+    - ZIP 00000 (or a category containing "noresults") -> "No Results Found"
+    - ZIP 99999 (or every Nth request with --challenge-every) -> challenge page (503)
+
+Point the scrapers at it with:
+    LISTING_BASE_URL=http://127.0.0.1:8765
+    MAPS_BASE_URL=http://127.0.0.1:8765/maps
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlparse
+
+from mocks.pages import (
+    CHALLENGE_PAGE, generate_businesses, render_maps_feed,
+    render_no_results_page, render_yellowpages_page,
+)
+
+DEFAULT_PORT = 8765
+
+
+class ListingConfig:
+    """Behaviour knobs shared by all handler threads"""
+
+    def __init__(self, pages: int = 3, results_per_page: int = 30, latency: float = 0.0,
+                 challenge_every: int = 0, incomplete_rate: float = 0.2):
+        self.pages = pages
+        self.results_per_page = results_per_page
+        self.latency = latency
+        self.challenge_every = challenge_every
+        self.incomplete_rate = incomplete_rate
+
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'pages': 0, 'no_results': 0, 'challenges': 0}
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            self.stats[key] += 1
+            return self.stats[key]
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    config = ListingConfig()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_html(self, body: str, status: int = 200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _is_challenged(self, location: str, request_number: int) -> bool:
+        every = self.config.challenge_every
+        return location == '99999' or bool(every and request_number % every == 0)
+
+    def do_GET(self):
+        request_number = self.config.count('requests')
+        if self.config.latency:
+            time.sleep(self.config.latency)
+
+        parsed = urlparse(self.path)
+        if parsed.path == '/search':
+            self._search(parse_qs(parsed.query), request_number)
+        elif parsed.path.startswith('/maps/search/'):
+            self._maps(unquote_plus(parsed.path[len('/maps/search/'):]), request_number)
+        elif parsed.path == '/stats':
+            self._send_html(str(self.config.stats))
+        else:
+            self._send_html('<html><body>Not Found</body></html>', 404)
+
+    def _search(self, query: dict, request_number: int):
+        category = query.get('search_terms', [''])[0]
+        location = query.get('geo_location_terms', [''])[0]
+        try:
+            page = int(query.get('page', ['1'])[0])
+        except ValueError:
+            page = 1
+
+        if self._is_challenged(location, request_number):
+            self.config.count('challenges')
+            self._send_html(CHALLENGE_PAGE.format(ray_id=f"{request_number:016x}"), 503)
+            return
+
+        if location == '00000' or 'noresults' in category.lower() or page > self.config.pages:
+            self.config.count('no_results')
+            self._send_html(render_no_results_page(category, location))
+            return
+
+        businesses = generate_businesses(category, location, page, self.config.results_per_page,
+                                         self.config.incomplete_rate)
+        self.config.count('pages')
+        self._send_html(render_yellowpages_page(category, location, page, businesses))
+
+    def _maps(self, query: str, request_number: int):
+        category, _, location = query.partition(' near ')
+        if self._is_challenged(location, request_number):
+            self.config.count('challenges')
+            self._send_html(CHALLENGE_PAGE.format(ray_id=f"{request_number:016x}"), 503)
+            return
+
+        businesses = generate_businesses(category, location, 1, self.config.results_per_page, 0)
+        self.config.count('pages')
+        self._send_html(render_maps_feed(query, businesses))
+
+
+def start_listing_server(host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                         config: ListingConfig = None) -> ThreadingHTTPServer:
+    """
+    Start the mock listing site on a background thread.
+
+    Returns:
+        The running server (call .shutdown() to stop it)
+    """
+    handler = type('ConfiguredListingHandler', (ListingHandler,), {'config': config or ListingConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_listing_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--listing-port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--pages', type=int, default=3, help='Result pages per search before "No Results Found"')
+    parser.add_argument('--results-per-page', type=int, default=30)
+    parser.add_argument('--listing-latency', type=float, default=0.0, help='Seconds added to every page')
+    parser.add_argument('--challenge-every', type=int, default=0, help='Serve a challenge page every N requests')
+    parser.add_argument('--incomplete-rate', type=float, default=0.2,
+                        help='Share of cards the deterministic parser cannot fully read')
+
+
+def listing_config_from_args(args) -> ListingConfig:
+    return ListingConfig(
+        pages=args.pages,
+        results_per_page=args.results_per_page,
+        latency=args.listing_latency,
+        challenge_every=args.challenge_every,
+        incomplete_rate=args.incomplete_rate,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock YellowPages / Google Maps server")
+    add_listing_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_listing_server(port=args.listing_port, config=listing_config_from_args(args))
+    print(f"[MOCK] Listing site on http://127.0.0.1:{args.listing_port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,234 @@
+"""
+Mock LLM endpoint speaking the OpenAI and Gemini REST formats.
+
+Routes:
+    POST /v1/chat/completions                         (OpenAI-compatible)
+    POST /v1beta/models/<model>:generateContent       (Gemini)
+
+The "model" reads the listing cards in the prompt ('### CARD <id>' blocks
+from LLMBatcher, or a whole page as one card) and answers with the
+<blocks>[...]</blocks> JSON that crawl4ai's LLMExtractionStrategy parses.
+Latency and 429 responses are configurable to exercise the scheduler.
+
+Point the scrapers at it with:
+    LLM_BASE_URL=http://127.0.0.1:8766/v1
+    LLM_MODEL=openai/mock-extractor
+    GEMINI_API_KEY=mock-key
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8766
+
+CARD_HEADER_RE = re.compile(r'^### CARD (\d+)\s*$', re.MULTILINE)
+PHONE_RE = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+WEBSITE_RE = re.compile(r'\[Website\]\((https?://[^)\s]+)\)')
+ADDRESS_RE = re.compile(r'^\d+\s+(?!years?\b)\w.*$', re.MULTILINE | re.IGNORECASE)
+
+
+class LLMConfig:
+    """Behaviour knobs shared by all handler threads"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, rate_limit_every: int = 0,
+                 rate_limit_rate: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_rate = rate_limit_rate
+
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.stats = {'requests': 0, 'rate_limited': 0, 'cards': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def next_request(self) -> tuple:
+        """Count the request and decide (throttled, delay) for it"""
+        with self._lock:
+            self.stats['requests'] += 1
+            n = self.stats['requests']
+            throttled = bool(self.rate_limit_every and n % self.rate_limit_every == 0)
+            throttled = throttled or self._rng.random() < self.rate_limit_rate
+            if throttled:
+                self.stats['rate_limited'] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        return throttled, delay
+
+    def add(self, key: str, value: int):
+        with self._lock:
+            self.stats[key] += value
+
+
+def _content_section(prompt: str) -> str:
+    """crawl4ai wraps the page in <url_content> tags; fall back to the whole prompt"""
+    match = re.search(r'<url_content>(.*?)</url_content>', prompt, re.DOTALL)
+    return match.group(1) if match else prompt
+
+
+def _parse_card(text: str) -> dict:
+    lines = [line.strip() for line in text.strip().split("\n") if line.strip()]
+    # First line that looks like a name (skip "1." style counters)
+    name = next((line for line in lines if not re.fullmatch(r'[\d.\s]+', line)), 'N/A')
+    phone = PHONE_RE.search(text)
+    email = EMAIL_RE.search(text)
+    website = WEBSITE_RE.search(text)
+    address = ADDRESS_RE.search(text)
+    return {
+        'name': name,
+        'address': address.group(0).strip() if address else 'N/A',
+        'website': website.group(1) if website else 'N/A',
+        'phone_number': phone.group(0) if phone else 'N/A',
+        'email': email.group(0) if email else 'N/A',
+        'error': False,
+    }
+
+
+def extract_records(prompt: str) -> list:
+    """What the mock model 'extracts' from a prompt"""
+    content = _content_section(prompt)
+    headers = list(CARD_HEADER_RE.finditer(content))
+    if not headers:
+        return [_parse_card(content)] if content.strip() else []
+
+    records = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+        record = _parse_card(content[header.end():end])
+        record['card_id'] = int(header.group(1))
+        records.append(record)
+    return records
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class LLMHandler(BaseHTTPRequestHandler):
+    config = LLMConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('/stats', '/v1/stats'):
+            self._send_json(self.config.stats)
+        else:
+            self._send_json({'error': {'message': 'Not found'}}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json({'error': {'message': 'Invalid JSON body'}}, 400)
+            return
+
+        if self.path.endswith('/chat/completions'):
+            gemini = False
+            prompt = "\n".join(str(m.get('content', '')) for m in body.get('messages', []))
+        elif ':generateContent' in self.path:
+            gemini = True
+            prompt = "\n".join(
+                part.get('text', '')
+                for item in body.get('contents', [])
+                for part in item.get('parts', [])
+            )
+        else:
+            self._send_json({'error': {'message': f'Unknown route {self.path}'}}, 404)
+            return
+
+        throttled, delay = self.config.next_request()
+        if throttled:
+            if gemini:
+                self._send_json({'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                                           'message': 'Resource has been exhausted (e.g. check quota).'}}, 429)
+            else:
+                self._send_json({'error': {'type': 'rate_limit_exceeded', 'code': 'rate_limit_exceeded',
+                                           'message': 'Rate limit reached for requests'}}, 429)
+            return
+
+        time.sleep(delay)
+
+        records = extract_records(prompt)
+        text = f"<blocks>{json.dumps(records)}</blocks>"
+        prompt_tokens = _estimate_tokens(prompt)
+        completion_tokens = _estimate_tokens(text)
+        self.config.add('cards', len(records))
+        self.config.add('prompt_tokens', prompt_tokens)
+        self.config.add('completion_tokens', completion_tokens)
+
+        if gemini:
+            self._send_json({
+                'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+                'usageMetadata': {'promptTokenCount': prompt_tokens, 'candidatesTokenCount': completion_tokens,
+                                  'totalTokenCount': prompt_tokens + completion_tokens},
+            })
+        else:
+            self._send_json({
+                'id': f"chatcmpl-mock-{self.config.stats['requests']}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'mock-extractor'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                          'total_tokens': prompt_tokens + completion_tokens},
+            })
+
+
+def start_llm_server(host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                     config: LLMConfig = None) -> ThreadingHTTPServer:
+    """
+    Start the mock LLM endpoint on a background thread.
+
+    Returns:
+        The running server (call .shutdown() to stop it)
+    """
+    handler = type('ConfiguredLLMHandler', (LLMHandler,), {'config': config or LLMConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_llm_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--llm-port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='Seconds per completion')
+    parser.add_argument('--llm-jitter', type=float, default=0.0, help='Extra random 0..N seconds per completion')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='Answer 429 to every Nth request')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Probability of a 429 per request')
+
+
+def llm_config_from_args(args) -> LLMConfig:
+    return LLMConfig(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        rate_limit_every=args.rate_limit_every,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI/Gemini-compatible LLM server")
+    add_llm_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_llm_server(port=args.llm_port, config=llm_config_from_args(args))
+    print(f"[MOCK] LLM endpoint on http://127.0.0.1:{args.llm_port}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,175 @@
+"""
+Synthetic listing data and page markup for the mock listing server.
+Pages are generated from a seed derived from the query, so the same
+search always returns the same businesses (stable benchmarks, real
+cross-run duplicates).
+"""
+import hashlib
+import html
+import random
+from typing import Dict, List
+
+FIRST_WORDS = [
+    "Sunny", "Oak", "Happy", "Pine", "Golden", "Blue", "Maple", "River",
+    "Lakeside", "Summit", "Cedar", "Harbor", "Willow", "Evergreen", "Liberty",
+    "Prairie", "Canyon", "Meadow", "Coastal", "Heritage",
+]
+LAST_WORDS = [
+    "Paws", "Tails", "Care", "Clinic", "Services", "Group", "Partners",
+    "Studio", "Center", "Co", "Pros", "Experts", "& Sons", "Works", "Depot",
+]
+STREETS = [
+    "Main St", "Oak Ave", "Pine Rd", "Maple Dr", "Cedar Ln", "Elm St",
+    "Lake Blvd", "Park Way", "River Rd", "Hill Ct", "Sunset Blvd", "2nd Ave",
+]
+CITIES = [
+    ("Austin", "TX"), ("Tampa", "FL"), ("Denver", "CO"), ("Phoenix", "AZ"),
+    ("Columbus", "OH"), ("Raleigh", "NC"), ("Portland", "OR"), ("Nashville", "TN"),
+]
+BLURBS = [
+    "Family owned and operated since 1998. We pride ourselves on friendly service, "
+    "honest pricing and a team that treats every customer like a neighbor. Call today "
+    "to schedule your first visit and ask about our seasonal specials.",
+    "Serving the greater metro area with fast, reliable and affordable service. "
+    "Licensed, bonded and insured. Free estimates, senior and military discounts, "
+    "weekend appointments available on request.",
+]
+
+CHALLENGE_PAGE = """<!DOCTYPE html>
+<html><head><title>Just a moment...</title></head>
+<body><div id="challenge-running">Checking if the site connection is secure</div>
+<div>Cloudflare Ray ID: {ray_id}</div>
+<noscript>Enable JavaScript and cookies to continue</noscript></body></html>"""
+
+
+def _rng(*parts) -> random.Random:
+    seed = hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+    return random.Random(int(seed[:12], 16))
+
+
+def generate_businesses(category: str, location: str, page: int, count: int,
+                        incomplete_rate: float = 0.2) -> List[Dict[str, str]]:
+    """
+    Build the businesses shown on one results page.
+
+    Args:
+        category: Search terms (used in names and as part of the seed)
+        location: ZIP code / geo terms
+        page: 1-based page number
+        count: Number of listings on the page
+        incomplete_rate: Share of listings whose phone is rendered outside
+            the usual markup, so the parser misses it and the LLM path runs
+
+    Returns:
+        List of business dicts (name, phone_number, address, locality,
+        website, email, incomplete, blurb)
+    """
+    rng = _rng(category.lower(), location, page)
+    word = category.strip().split()[-1].title() if category.strip() else "Services"
+    city, state = rng.choice(CITIES)
+
+    businesses = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_WORDS)} {word} {rng.choice(LAST_WORDS)}"
+        if rng.random() < 0.3:
+            name = f"{name} #{(page - 1) * count + i + 1}"
+        slug = "".join(ch for ch in name.lower() if ch.isalnum())
+        businesses.append({
+            'name': name,
+            'phone_number': f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            'address': f"{rng.randint(10, 9999)} {rng.choice(STREETS)}",
+            'locality': f"{city}, {state} {location if location.isdigit() else ''}".strip(),
+            'website': f"https://www.{slug}.com" if rng.random() < 0.6 else 'N/A',
+            'email': f"info@{slug}.com" if rng.random() < 0.25 else 'N/A',
+            'incomplete': rng.random() < incomplete_rate,
+            'blurb': rng.choice(BLURBS) if rng.random() < 0.5 else '',
+        })
+    return businesses
+
+
+def render_yellowpages_card(index: int, business: dict) -> str:
+    """One YellowPages-style `.result` card"""
+    e = html.escape
+    website = ''
+    if business['website'] != 'N/A':
+        website = f'<a class="track-visit-website" href="{e(business["website"])}">Website</a>'
+
+    if business['incomplete']:
+        # Phone only appears in free text - the deterministic parser misses it
+        phone = f'<p class="call-now">Call us today at {e(business["phone_number"])}</p>'
+    else:
+        phone = f'<div class="phones phone primary">{e(business["phone_number"])}</div>'
+
+    email = f'<p class="email-business">{e(business["email"])}</p>' if business['email'] != 'N/A' else ''
+    blurb = f'<p class="snippet">{e(business["blurb"])}</p>' if business['blurb'] else ''
+
+    return f"""
+<div class="result" id="lid-{index}">
+  <div class="srp-listing">
+    <div class="v-card">
+      <div class="info">
+        <div class="info-section info-primary">
+          <h2 class="n">{index}. <a class="business-name" href="/biz/{index}"><span>{e(business['name'])}</span></a></h2>
+          <div class="ratings"><span class="count">({index % 17 + 1} reviews)</span></div>
+          <div class="years-in-business">{index % 30 + 1} Years in Business</div>
+          {blurb}
+        </div>
+        <div class="info-section info-secondary">
+          {phone}
+          <div class="adr"><div class="street-address">{e(business['address'])}</div>
+          <div class="locality">{e(business['locality'])}</div></div>
+          {email}
+          <div class="links">{website}<a class="directions" href="#">Directions</a><a class="menu" href="#">More Info</a></div>
+        </div>
+      </div>
+    </div>
+  </div>
+</div>"""
+
+
+def render_yellowpages_page(category: str, location: str, page: int,
+                            businesses: List[dict]) -> str:
+    """Full results page with the listing cards and pagination"""
+    cards = "".join(
+        render_yellowpages_card((page - 1) * len(businesses) + i + 1, b)
+        for i, b in enumerate(businesses)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(category)} in {html.escape(location)} | YellowPages</title></head>
+<body>
+<header><nav><a href="/">Home</a> <a href="#">About Search Results</a></nav></header>
+<div class="search-results organic">{cards}</div>
+<div class="pagination"><a class="prev" href="#">Previous</a> <span>{page}</span> <a class="next" href="#">Next</a></div>
+</body></html>"""
+
+
+def render_no_results_page(category: str, location: str) -> str:
+    return f"""<!DOCTYPE html>
+<html><head><title>YellowPages</title></head>
+<body><div class="search-results organic">
+<div class="no-results"><h1>No Results Found</h1>
+<p>We couldn't find any matches for "{html.escape(category)}" near {html.escape(location)}.</p></div>
+</div></body></html>"""
+
+
+def render_maps_feed(query: str, businesses: List[dict]) -> str:
+    """
+    Google Maps search results panel.
+    The name div sits six levels below the card so walking up from it (as
+    scraper_universal does) lands on the card, not the whole feed.
+    """
+    e = html.escape
+    items = []
+    for b in businesses:
+        items.append(f"""
+<div class="Nv2PK">
+  <div class="bfdHYd"><div class="lI9IFe"><div class="y7PRA"><div class="NrDZNb"><div class="NrDZNb-inner">
+    <div class="qBF1Pd fontHeadlineSmall">{e(b['name'])}</div>
+  </div></div></div></div></div>
+  <div class="W4Efsd"><span>{e(b['address'])} · {e(b['locality'])}</span></div>
+  <div class="W4Efsd"><span class="UsdlK">{e(b['phone_number'])}</span></div>
+</div>""")
+
+    return f"""<!DOCTYPE html>
+<html><head><title>{e(query)} - Google Maps</title></head>
+<body><div role="feed" aria-label="Results for {e(query)}" class="m6QErb">{''.join(items)}</div></body></html>"""
@@ -6,4 +6,7 @@ class BusinessData(BaseModel):
     address: str = Field(..., description="The address of the business or entity.")
     phone_number: str = Field(..., description="The phone number of the business or entity.")
     website: str = Field(..., description="The website URL of the business or entity.")
-    email: Optional[str] = Field(default="N/A", description="The email address of the business or entity if available.")
\ No newline at end of file
+    email: Optional[str] = Field(default="N/A", description="The email address of the business or entity if available.")
+
+class BatchedBusinessData(BusinessData):
+    card_id: int = Field(..., description="The number from the '### CARD <id>' header the business was extracted from.")
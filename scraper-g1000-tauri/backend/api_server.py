@@ -14,9 +14,12 @@ from flask_cors import CORS
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 sys.path.insert(0, os.path.join(parent_dir, 'python-src'))
+# Repository root last, for the shared src package (schema migrations, lead writer)
+sys.path.append(os.path.dirname(parent_dir))
 
 from profile_manager import ProfileManager
 from database import LeadsDatabase
+from src.lead_writer import get_lead_writer, writer_metrics
 from scraper_free_bypass import scrape_yellowpages_free
 
 app = Flask(__name__)
@@ -203,7 +206,8 @@ def get_scrape_status():
     """Get current scraping status"""
     return jsonify({
         'success': True,
-        'status': scraping_state
+        'status': scraping_state,
+        'writers': writer_metrics()
     }), 200
 
 @app.route('/api/scrape/automation/start', methods=['POST'])
@@ -334,11 +338,10 @@ def bulk_update_lead_status(profile_id):
             return jsonify({'success': False, 'error': 'Profile not found'}), 404
 
         db = LeadsDatabase(profile.get_database_path())
-        updated_count = 0
-        
-        for lead_id in lead_ids:
-            if db.update_lead_status(lead_id, new_status):
-                updated_count += 1
+        try:
+            updated_count = db.update_lead_status_bulk(lead_ids, new_status)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Lead IDs must be integers'}), 400
         
         return jsonify({
             'success': True, 
@@ -374,17 +377,7 @@ def run_scrape_job(profile_id, zip_code, category, max_pages):
         profile = profile_manager.get_profile(profile_id)
         if profile and leads:
             db = LeadsDatabase(profile.get_database_path())
-            for lead in leads:
-                db.add_lead(
-                    name=lead['name'],
-                    phone=lead['phone_number'],
-                    address=lead['address'],
-                    website=lead['website'],
-                    email=lead['email'],
-                    zip_code=zip_code,
-                    category=category,
-                    city=lead.get('city', '')
-                )
+            get_lead_writer(db).submit(leads, zip_code=zip_code, category=category).wait()
             profile_manager.update_profile_leads(profile_id, db.get_total_leads())
 
         print(f"[Scrape Job] Complete: {len(leads)} leads")
@@ -397,6 +390,16 @@ def run_scrape_job(profile_id, zip_code, category, max_pages):
         scraping_state['active'] = False
         scraping_state['paused'] = False
 
+def log_saved_leads(zip_code, category):
+    """Writer callback that logs a combo's save result"""
+    def callback(ticket):
+        if ticket.error:
+            scraping_state['logs'].append({'type': 'error', 'message': f'  ✗ Save failed for {zip_code} - {category}: {ticket.error}'})
+        else:
+            scraping_state['logs'].append({'type': 'info', 'message': f'  💾 {zip_code} - {category}: '
+                                           f'{ticket.result["inserted"]} new, {ticket.result["duplicates"]} duplicates'})
+    return callback
+
 def run_automation_job(profile_id, zips, categories, max_pages, skip_scraped):
     """Run automation job (batch scraping) in background thread"""
     global scraping_state
@@ -412,6 +415,7 @@ def run_automation_job(profile_id, zips, categories, max_pages, skip_scraped):
             return
 
         db = LeadsDatabase(profile.get_database_path())
+        writer = get_lead_writer(db)
 
         # Generate all jobs
         jobs = []
@@ -445,21 +449,11 @@ def run_automation_job(profile_id, zips, categories, max_pages, skip_scraped):
                     scrape_yellowpages_free(zip_code, category, max_pages)
                 )
 
-                # Save leads to database
+                # Save leads in the background and move on to the next combo
                 if leads:
-                    for lead in leads:
-                        db.add_lead(
-                            name=lead['name'],
-                            phone=lead['phone_number'],
-                            address=lead['address'],
-                            website=lead['website'],
-                            email=lead['email'],
-                            zip_code=zip_code,
-                            category=category,
-                            city=lead.get('city', '')
-                        )
-
                     scraping_state['total_leads'] += len(leads)
+                    writer.submit(leads, callback=log_saved_leads(zip_code, category),
+                                  zip_code=zip_code, category=category)
                     scraping_state['logs'].append({'type': 'success', 'message': f'  ✓ Found {len(leads)} leads'})
                 else:
                     scraping_state['logs'].append({'type': 'info', 'message': '  No leads found'})
@@ -470,7 +464,8 @@ def run_automation_job(profile_id, zips, categories, max_pages, skip_scraped):
             # Update progress
             scraping_state['progress'] = int(((idx + 1) / len(jobs)) * 100)
 
-        # Update profile lead count
+        # Wait for queued saves, then update profile lead count
+        writer.flush()
         profile_manager.update_profile_leads(profile_id, db.get_total_leads())
 
         scraping_state['logs'].append({'type': 'success', 'message': f'✓ Automation complete! Total: {scraping_state["total_leads"]} leads'})
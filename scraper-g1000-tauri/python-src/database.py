@@ -1,9 +1,61 @@
 import sqlite3
-import hashlib
-from datetime import datetime
-from typing import Optional
+import json
+from typing import Dict, List, Optional
 import os
 
+# Schema, migrations and insert/dedupe helpers live in the CLI's src/database.py:
+# both apps open the same profile files, so they must share one MIGRATIONS list
+from src.database import (
+    CONNECTION_PRAGMAS, INSERT_LEAD_SQL, JOURNAL_MODE, MIGRATIONS, NEXT_COMBO_NUMBER_SQL,
+    SCHEMA_VERSION, business_hash, get_schema_version, lead_insert_params, unarchive_leads,
+)
+from src.validators import canonical_name, normalize_phone
+
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    """Open a connection with the shared pragmas applied"""
+    conn = sqlite3.connect(db_path, timeout=30.0, **kwargs)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def apply_migrations(db_path: str) -> int:
+    """
+    Apply pending migrations, each in its own transaction.
+    Returns the number of migrations applied.
+    """
+    conn = connect(db_path, isolation_level=None)
+    applied = 0
+    try:
+        # Persistent in the file; must run outside a transaction
+        conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return 0
+
+        for version, description, migrate in MIGRATIONS:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Re-read under the write lock so a step never runs twice
+                if get_schema_version(conn) >= version:
+                    conn.execute('COMMIT')
+                    continue
+                cursor = conn.cursor()
+                migrate(cursor)
+                cursor.execute(
+                    'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                    (version, description)
+                )
+                conn.execute('COMMIT')
+                applied += 1
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+    finally:
+        conn.close()
+    return applied
+
+
 class LeadsDatabase:
     """Persistent database for tracking scraped leads and preventing duplicates"""
 
@@ -14,78 +66,33 @@ class LeadsDatabase:
         self._init_database()
 
     def _init_database(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Table for tracking all scraped leads
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS leads (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                business_hash TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                address TEXT,
-                phone TEXT,
-                email TEXT,
-                website TEXT,
-                zip_code TEXT,
-                location TEXT,
-                scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                source_file TEXT,
-                category TEXT,
-                city TEXT,
-                status TEXT DEFAULT 'New'
-            )
-        ''')
-
-        # Table for tracking scraped zip+category combos (prevents re-scraping)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scraped_combos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                zip_code TEXT NOT NULL,
-                category TEXT NOT NULL,
-                scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                lead_number INTEGER NOT NULL,
-                UNIQUE(zip_code, category)
-            )
-        ''')
-
-        # Index for fast duplicate checking
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_business_hash
-            ON leads(business_hash)
-        ''')
-
-        # Index for searching by location/zip
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_location
-            ON leads(location, zip_code)
-        ''')
-
-        conn.commit()
-        conn.close()
+        """Bring the database up to the current schema version"""
+        applied = apply_migrations(self.db_path)
+        if applied:
+            print(f"[DB] Schema migrated to v{SCHEMA_VERSION} ({applied} step(s)): {self.db_path}")
 
     def _generate_hash(self, name: str, phone: str, address: str) -> str:
         """Generate a unique hash for a business based on name + phone + address"""
-        # Normalize the data (lowercase, strip whitespace)
-        normalized = f"{name.lower().strip()}|{phone.strip()}|{address.lower().strip()}"
-        return hashlib.md5(normalized.encode()).hexdigest()
+        return business_hash(name, phone, address)
 
     def is_duplicate(self, name: str, phone: str, address: str) -> bool:
         """Check if a business already exists in the database"""
         business_hash = self._generate_hash(name, phone, address)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
-        cursor.execute(
-            'SELECT COUNT(*) FROM leads WHERE business_hash = ?',
-            (business_hash,)
-        )
-        count = cursor.fetchone()[0]
+        # Exact hash, or the same normalized phone + canonical name (hot or archived)
+        cursor.execute('''
+            SELECT 1 FROM all_leads WHERE business_hash = ?
+            UNION ALL
+            SELECT 1 FROM all_leads WHERE phone_norm = ? AND name_key = ?
+            LIMIT 1
+        ''', (business_hash, normalize_phone(phone), canonical_name(name)))
+        found = cursor.fetchone() is not None
         conn.close()
 
-        return count > 0
+        return found
 
     def add_lead(self, name: str, address: str, phone: str,
                  email: Optional[str] = None, website: Optional[str] = None,
@@ -98,40 +105,63 @@ class LeadsDatabase:
         """
         business_hash = self._generate_hash(name, phone, address)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
-        # Check if category, city, and status columns exist, if not add them
-        cursor.execute("PRAGMA table_info(leads)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'category' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN category TEXT')
-            conn.commit()
-        if 'city' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN city TEXT')
-            conn.commit()
-        if 'status' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN status TEXT DEFAULT "New"')
-            conn.commit()
-
         try:
-            cursor.execute('''
-                INSERT INTO leads
-                (business_hash, name, address, phone, email, website, zip_code, category, location, source_file, city)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (business_hash, name, address, phone, email, website, zip_code, category, location, source_file, city))
+            cursor.execute(INSERT_LEAD_SQL.format(conflict=''), lead_insert_params(
+                business_hash, name, address, phone, email, website,
+                zip_code, category, location, source_file, city
+            ))
+            added = cursor.rowcount > 0  # 0: same business, differently formatted
 
             conn.commit()
             conn.close()
-            return True
+            return added
         except sqlite3.IntegrityError:
             # Duplicate entry
             conn.close()
             return False
 
+    def add_leads_bulk(self, leads: List[dict], zip_code: Optional[str] = None,
+                       category: Optional[str] = None, city: Optional[str] = None,
+                       location: Optional[str] = None, source_file: Optional[str] = None) -> Dict[str, int]:
+        """
+        Insert many scraped leads in a single transaction.
+        A record's own zip_code/category/city take precedence over the defaults.
+        Returns {'inserted': n, 'duplicates': n}
+        """
+        rows = []
+        for lead in leads:
+            name = lead.get('name') or ''
+            phone = lead.get('phone_number') or lead.get('phone') or ''
+            address = lead.get('address') or ''
+            rows.append(lead_insert_params(
+                self._generate_hash(name, phone, address), name, address, phone,
+                lead.get('email'), lead.get('website'),
+                lead.get('zip_code') or zip_code, lead.get('category') or category,
+                location, source_file, lead.get('city') or city
+            ))
+
+        if not rows:
+            return {'inserted': 0, 'duplicates': 0}
+
+        conn = connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            # OR IGNORE: duplicates are skipped by the business_hash UNIQUE index,
+            # reformatted duplicates by the phone_norm/name_key check
+            cursor.executemany(INSERT_LEAD_SQL.format(conflict='OR IGNORE'), rows)
+            inserted = max(cursor.rowcount, 0)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return {'inserted': inserted, 'duplicates': len(rows) - inserted}
+
     def get_leads_by_location(self, location: str, zip_code: Optional[str] = None):
         """Retrieve all leads for a specific location"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         if zip_code:
@@ -151,18 +181,19 @@ class LeadsDatabase:
 
     def get_total_leads(self) -> int:
         """Get total number of unique leads in database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM leads')
-        count = cursor.fetchone()[0]
+        # Trigger-maintained, see COUNTER_DIMENSIONS
+        cursor.execute("SELECT count FROM lead_counters WHERE dimension = 'all' AND value = ''")
+        row = cursor.fetchone()
         conn.close()
-        return count
+        return row[0] if row else 0
 
     def is_combo_scraped(self, zip_code: str, category: str):
         """Check if a zip+category combo has already been scraped
         Returns (is_scraped, scraped_date, lead_number) tuple
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -178,45 +209,43 @@ class LeadsDatabase:
 
     def mark_combo_scraped(self, zip_code: str, category: str) -> int:
         """Mark a zip+category combo as scraped and return its lead number"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get the next lead number
-        cursor.execute('SELECT MAX(lead_number) FROM scraped_combos')
-        max_lead = cursor.fetchone()[0]
-        next_lead_number = (max_lead or 0) + 1
-
+        conn = connect(self.db_path)
         try:
-            cursor.execute('''
-                INSERT INTO scraped_combos (zip_code, category, lead_number)
-                VALUES (?, ?, ?)
-            ''', (zip_code, category, next_lead_number))
+            cursor = conn.cursor()
+            row = cursor.execute(NEXT_COMBO_NUMBER_SQL, (zip_code, category)).fetchone()
+            if row is None:
+                # Already exists, get existing number
+                cursor.execute(
+                    'SELECT lead_number FROM scraped_combos WHERE zip_code = ? AND category = ?',
+                    (zip_code, category)
+                )
+                lead_number = cursor.fetchone()[0]
+            else:
+                lead_number = row[0]
+                cursor.execute('''
+                    INSERT INTO scraped_combos (zip_code, category, lead_number)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(zip_code, category) DO NOTHING
+                ''', (zip_code, category, lead_number))
             conn.commit()
+        finally:
             conn.close()
-            return next_lead_number
-        except sqlite3.IntegrityError:
-            # Already exists, get existing number
-            cursor.execute(
-                'SELECT lead_number FROM scraped_combos WHERE zip_code = ? AND category = ?',
-                (zip_code, category)
-            )
-            lead_number = cursor.fetchone()[0]
-            conn.close()
-            return lead_number
+        return lead_number
 
     def get_stats(self):
         """Get statistics about the database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
-        # Total leads
-        cursor.execute('SELECT COUNT(*) FROM leads')
-        total = cursor.fetchone()[0]
+        # Total leads (trigger-maintained counter)
+        cursor.execute("SELECT count FROM lead_counters WHERE dimension = 'all' AND value = ''")
+        row = cursor.fetchone()
+        total = row[0] if row else 0
 
         # Leads by location
         cursor.execute('''
             SELECT location, COUNT(*) as count
-            FROM leads
+            FROM all_leads
             GROUP BY location
             ORDER BY count DESC
         ''')
@@ -225,7 +254,7 @@ class LeadsDatabase:
         # Leads by zip code
         cursor.execute('''
             SELECT zip_code, COUNT(*) as count
-            FROM leads
+            FROM all_leads
             WHERE zip_code IS NOT NULL
             GROUP BY zip_code
             ORDER BY count DESC
@@ -242,40 +271,44 @@ class LeadsDatabase:
         }
 
     def get_all_leads(self):
-        """Get all leads from the database"""
-        conn = sqlite3.connect(self.db_path)
+        """Get all leads from the database, archived ones included"""
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
-        # Check if status column exists, if not add it
-        cursor.execute("PRAGMA table_info(leads)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'status' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN status TEXT DEFAULT "New"')
-            conn.commit()
-        if 'city' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN city TEXT')
-            conn.commit()
-        
-        cursor.execute('SELECT * FROM leads ORDER BY id')
+        # Explicit columns: migrated and fresh databases order columns differently
+        cursor.execute('''
+            SELECT name, phone, address, website, email, category, zip_code, city, status
+            FROM all_leads ORDER BY id
+        ''')
         results = cursor.fetchall()
         conn.close()
         return results
 
     def update_lead_status(self, lead_id: int, status: str) -> bool:
         """Update a lead's status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check if status column exists, if not add it
-        cursor.execute("PRAGMA table_info(leads)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'status' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN status TEXT DEFAULT "New"')
+        return self.update_lead_status_bulk([lead_id], status) > 0
+
+    def update_lead_status_bulk(self, lead_ids: List[int], status: str) -> int:
+        """
+        Set the status of many leads in one transaction; returns the number updated.
+        Archived leads that get any other status move back from leads_archive.
+        """
+        if not lead_ids:
+            return 0
+        ids = json.dumps([int(lead_id) for lead_id in lead_ids])
+        conn = connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE leads SET status = ? WHERE id IN (SELECT value FROM json_each(?))', (status, ids))
+            rows_affected = cursor.rowcount
+            if status == 'Archived':
+                cursor.execute(
+                    'UPDATE leads_archive SET status = ? WHERE id IN (SELECT value FROM json_each(?))', (status, ids)
+                )
+                rows_affected += cursor.rowcount
+            else:
+                rows_affected += unarchive_leads(cursor, ids, status)
             conn.commit()
-        
-        cursor.execute('UPDATE leads SET status = ? WHERE id = ?', (status, lead_id))
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
-        return rows_affected > 0
+        finally:
+            conn.close()
+        return rows_affected
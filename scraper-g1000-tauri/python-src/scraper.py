@@ -1,5 +1,5 @@
-import json
 import re
+import time
 import asyncio
 from pydantic import BaseModel
 from typing import List, Set, Tuple, Optional
@@ -12,8 +12,62 @@ from crawl4ai import (
 )
 from bs4 import BeautifulSoup
 from src.utils import is_duplicated
+from src.llm_batcher import (
+    LLMBatcher, CardChunk, BATCH_INSTRUCTIONS, split_result_cards, card_to_markdown, estimate_tokens
+)
+from src.llm_pretrim import trim_card_markdown, prepare_llm_chunks
+from src.validators import LeadValidator
+from models.business import BatchedBusinessData
 import os
 
+_validator = LeadValidator()
+
+# Overridable so runs can be pointed at the local mocks (python -m mocks)
+LISTING_BASE_URL = os.getenv("LISTING_BASE_URL", "https://www.yellowpages.com").rstrip("/")
+
+
+class ExtractionStats:
+    """Tracks how much work the hybrid extractor sent to the LLM"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.pages = 0
+        self.cards = 0
+        self.llm_cards = 0
+        self.llm_calls = 0
+        self.page_seconds = []
+        self.raw_tokens = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def record_page(self, cards: int, llm_cards: int, llm_calls: int, seconds: float,
+                    raw_tokens: int = 0, tokens_in: int = 0, tokens_out: int = 0):
+        self.pages += 1
+        self.cards += cards
+        self.llm_cards += llm_cards
+        self.llm_calls += llm_calls
+        self.page_seconds.append(seconds)
+        self.raw_tokens += raw_tokens
+        self.tokens_in += tokens_in
+        self.tokens_out += tokens_out
+
+    @property
+    def llm_rate(self) -> float:
+        """Fraction of cards that needed the LLM"""
+        return self.llm_cards / self.cards if self.cards else 0.0
+
+    def summary(self) -> str:
+        avg = sum(self.page_seconds) / len(self.page_seconds) if self.page_seconds else 0.0
+        return (f"{self.pages} pages, {self.cards} cards, {self.llm_cards} sent to LLM "
+                f"({self.llm_rate:.0%}) in {self.llm_calls} call(s), avg {avg:.2f}s/page, "
+                f"~{self.tokens_in} tokens in vs ~{self.raw_tokens} raw, {self.tokens_out} out")
+
+
+# Process-wide counters, printed by the CLIs at the end of a run
+extraction_stats = ExtractionStats()
+
 
 def get_browser_config() -> BrowserConfig:
     """
@@ -30,6 +84,16 @@ def get_browser_config() -> BrowserConfig:
     )
 
 
+def build_search_url(category: str, zip_code: str) -> str:
+    """
+    Returns the YellowPages search URL template for a category + ZIP.
+
+    Returns:
+        str: URL with a {page_number} placeholder for fetch_and_process_page.
+    """
+    return f"{LISTING_BASE_URL}/search?search_terms={category.replace(' ', '+')}&geo_location_terms={zip_code}&page={{page_number}}"
+
+
 def get_llm_strategy(llm_instructions: str, output_format: BaseModel, llm_model: str = None, api_token: str = None) -> Optional[LLMExtractionStrategy]:
     """
     Returns the configuration for the language model extraction strategy.
@@ -63,6 +127,7 @@ def get_llm_strategy(llm_instructions: str, output_format: BaseModel, llm_model:
             extraction_type="schema",  # Type of extraction to perform
             instruction=llm_instructions,  # Instructions for the LLM
             input_format="markdown",  # Format of the input content
+            base_url=os.getenv("LLM_BASE_URL"),  # Custom endpoint (e.g. the local mock), None for the provider default
             verbose=False,  # Reduce verbosity
         )
     except Exception as e:
@@ -70,6 +135,19 @@ def get_llm_strategy(llm_instructions: str, output_format: BaseModel, llm_model:
         return None
 
 
+def get_batch_llm_strategy(llm_model: str = None, api_token: str = None) -> Optional[LLMExtractionStrategy]:
+    """
+    Returns an LLM strategy for card-level batch extraction (see LLMBatcher).
+    Each returned record carries the 'card_id' it was extracted from.
+    """
+    return get_llm_strategy(
+        llm_instructions=BATCH_INSTRUCTIONS,
+        output_format=BatchedBusinessData,
+        llm_model=llm_model,
+        api_token=api_token,
+    )
+
+
 def extract_business_from_html(html_content: str) -> List[dict]:
     """
     Fallback extraction using BeautifulSoup when LLM is unavailable or rate-limited.
@@ -162,27 +240,124 @@ def validate_business_data(business: dict) -> bool:
     return has_name and has_contact
 
 
-async def check_no_results_with_retry(
+def find_missing_fields(business: dict) -> List[str]:
+    """
+    List the fields the deterministic extractor failed to get right.
+    Name, phone and address are required; website/email only count when
+    present but malformed (many listings legitimately have neither).
+
+    Args:
+        business: Business dictionary from extract_business_from_html
+
+    Returns:
+        List of field names that should be filled in by the LLM
+    """
+    missing = []
+
+    if not business.get('name', '').strip():
+        missing.append('name')
+
+    phone_valid, _ = _validator.validate_phone(business.get('phone_number', ''))
+    if not phone_valid:
+        missing.append('phone_number')
+
+    address = business.get('address', '').strip()
+    if not address or address == 'N/A':
+        missing.append('address')
+
+    website = business.get('website', 'N/A')
+    if website and website != 'N/A' and not _validator.validate_website(website)[0]:
+        missing.append('website')
+
+    email = business.get('email', 'N/A')
+    if email and email != 'N/A' and not _validator.validate_email(email)[0]:
+        missing.append('email')
+
+    return missing
+
+
+def prepare_page_cards(html_content: str, combo_key: str = "",
+                       css_selector: str = "div.result") -> Tuple[List[dict], List[CardChunk], int]:
+    """
+    Run the deterministic extractor on every result card of a page.
+    Cards are the elements matching css_selector.
+
+    Returns:
+        Tuple[List[dict], List[CardChunk], int]:
+            - Records that are already complete.
+            - Trimmed chunks for cards that still need the LLM.
+            - Estimated tokens of the untrimmed page markdown (for logging savings).
+    """
+    complete = []
+    incomplete = []
+    raw_tokens = 0
+
+    for card_html in split_result_cards(html_content, css_selector):
+        markdown = card_to_markdown(card_html)
+        raw_tokens += estimate_tokens(markdown)
+
+        extracted = extract_business_from_html(card_html)
+        business = extracted[0] if extracted else {}
+
+        missing = find_missing_fields(business)
+        if not missing:
+            complete.append(business)
+            continue
+
+        incomplete.append(CardChunk(
+            combo_key,
+            trim_card_markdown(markdown),
+            card_html,
+            partial=business if business.get('name') else None,
+            missing=missing,
+        ))
+
+    return complete, incomplete, raw_tokens
+
+
+def filter_new_businesses(businesses: List[dict], seen_names: Set[str]) -> List[dict]:
+    """
+    Drop entries without essential data or already seen in this session.
+
+    Args:
+        businesses: Extracted business dictionaries
+        seen_names: Set of business names already seen (updated in place)
+
+    Returns:
+        List of valid, previously unseen businesses
+    """
+    new_businesses = []
+    for business in businesses:
+        if business.get("error") is False:
+            business.pop("error", None)
+
+        if not validate_business_data(business):
+            continue
+
+        name = business.get('name', '')
+        if is_duplicated(name, seen_names):
+            continue
+
+        seen_names.add(name)
+        new_businesses.append(business)
+
+    return new_businesses
+
+
+async def fetch_page_html_with_retry(
     crawler: AsyncWebCrawler,
     url: str,
     session_id: str,
     max_retries: int = 3
-) -> bool:
+) -> Optional[str]:
     """
-    Checks if the "No Results Found" message is present on the page with retry logic.
-
-    Args:
-        crawler (AsyncWebCrawler): The web crawler instance.
-        url (str): The URL to check.
-        session_id (str): The session identifier.
-        max_retries (int): Maximum number of retry attempts.
+    Fetches the raw HTML of a page with retry logic for network errors.
 
     Returns:
-        bool: True if "No Results Found" message is found, False otherwise.
+        str or None: The page HTML, or None if it could not be fetched.
     """
     for attempt in range(max_retries):
         try:
-            # Fetch the page without any CSS selector or extraction strategy
             result = await crawler.arun(
                 url=url,
                 config=CrawlerRunConfig(
@@ -191,38 +366,87 @@ async def check_no_results_with_retry(
                 ),
             )
 
-            if result.success:
-                if "No Results Found" in result.cleaned_html:
-                    return True
-                return False
+            if result.success and result.html:
+                return result.html
+
+            error_msg = str(result.error_message).lower()
+            if any(network_error in error_msg for network_error in ['net::err_network_changed', 'timeout', 'connection', 'network']):
+                if attempt < max_retries - 1:
+                    print(f"   ⚠️ Network issue, retrying page (attempt {attempt + 1}/{max_retries})...")
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                print(f"   ❌ Network error after {max_retries} attempts: {result.error_message}")
             else:
-                error_msg = str(result.error_message).lower()
-                if any(network_error in error_msg for network_error in ['net::err_network_changed', 'timeout', 'connection', 'network']):
-                    if attempt < max_retries - 1:
-                        print(f"   ⚠️ Network issue, retrying page check (attempt {attempt + 1}/{max_retries})...")
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                        continue
-                    else:
-                        print(f"   ❌ Network error after {max_retries} attempts: {result.error_message}")
-                        return False
-                else:
-                    print(f"   ⚠️ Error checking for results: {result.error_message}")
-                    return False
+                print(f"   ❌ Failed to fetch HTML: {result.error_message}")
+            return None
         except Exception as e:
             error_msg = str(e).lower()
             if any(network_error in error_msg for network_error in ['timeout', 'connection', 'network']):
                 if attempt < max_retries - 1:
-                    print(f"   ⚠️ Network issue, retrying page check (attempt {attempt + 1}/{max_retries})...")
+                    print(f"   ⚠️ Network issue, retrying page (attempt {attempt + 1}/{max_retries})...")
                     await asyncio.sleep(2 ** attempt)
                     continue
-                else:
-                    print(f"   ❌ Network error after {max_retries} attempts: {e}")
-                    return False
+                print(f"   ❌ Network error after {max_retries} attempts: {e}")
             else:
-                print(f"   ⚠️ Exception checking results: {e}")
-                return False
+                print(f"   ❌ Fetch error: {e}")
+            return None
 
-    return False
+    return None
+
+
+async def queue_page_for_batch(
+    crawler: AsyncWebCrawler,
+    page_number: int,
+    base_url: str,
+    session_id: str,
+    llm_batcher: LLMBatcher,
+    combo_key: str,
+    db=None,
+) -> Tuple[int, bool]:
+    """
+    Fetches a page once, extracts complete cards deterministically and queues
+    only the incomplete ones on a shared LLMBatcher instead of sending one LLM
+    request per page.
+
+    Args:
+        crawler (AsyncWebCrawler): The web crawler instance.
+        page_number (int): The page number to fetch.
+        base_url (str): The base URL of the website.
+        session_id (str): The session identifier.
+        llm_batcher (LLMBatcher): Batcher shared across pages and combos.
+        combo_key (str): Key the extracted records will be returned under.
+        db (LeadsDatabase, optional): Used to skip cards already stored.
+
+    Returns:
+        Tuple[int, bool]:
+            - int: Number of cards found on this page.
+            - bool: A flag indicating if the "No Results Found" message was encountered.
+    """
+    url = base_url.format(page_number=page_number)
+    print(f"   📄 Loading page {page_number}...")
+    started = time.perf_counter()
+
+    html = await fetch_page_html_with_retry(crawler, url, session_id)
+    if html is None:
+        return 0, False
+    if "No Results Found" in html:
+        return 0, True
+
+    complete, incomplete, raw_tokens = prepare_page_cards(html, combo_key)
+    send, over_budget, trim_stats = prepare_llm_chunks(incomplete, db=db)
+
+    llm_batcher.add_records(combo_key, complete)
+    llm_batcher.add_records(combo_key, [chunk.partial for chunk in over_budget if chunk.partial])
+    for chunk in send:
+        llm_batcher.add_chunk(chunk)
+
+    cards = len(complete) + len(incomplete)
+    # LLM calls and output tokens are counted by the batcher at flush time
+    extraction_stats.record_page(cards, len(send), 0, time.perf_counter() - started,
+                                 raw_tokens=raw_tokens, tokens_in=trim_stats['tokens_in'])
+    print(f"   📦 Page {page_number}: {len(complete)} cards parsed directly, {len(send)} queued for batch extraction "
+          f"({trim_stats['duplicates']} known, ~{trim_stats['tokens_in']}/{raw_tokens} tokens)")
+    return cards, False
 
 
 async def fetch_and_process_page(
@@ -233,19 +457,23 @@ async def fetch_and_process_page(
     llm_strategy: Optional[LLMExtractionStrategy],
     session_id: str,
     seen_names: Set[str],
+    db=None,
 ) -> Tuple[List[dict], bool]:
     """
     Fetches and processes a single page from yellowpages with network resilience.
-    Uses LLM if available, falls back to BeautifulSoup extraction.
+    Hybrid extraction: every card goes through the BeautifulSoup extractor first
+    and only cards with missing/invalid fields are sent to the LLM (one request
+    for the whole page, trimmed to the card text).
 
     Args:
         crawler (AsyncWebCrawler): The web crawler instance.
         page_number (int): The page number to fetch.
         base_url (str): The base URL of the website.
-        css_selector (str): The CSS selector to target the content.
-        llm_strategy (LLMExtractionStrategy or None): The LLM extraction strategy.
+        css_selector (str): The CSS selector matching one result card.
+        llm_strategy (LLMExtractionStrategy or None): Strategy from get_batch_llm_strategy().
         session_id (str): The session identifier.
         seen_names (Set[str]): Set of business names that have already been seen.
+        db (LeadsDatabase, optional): Used to skip cards already stored before calling the LLM.
 
     Returns:
         Tuple[List[dict], bool]:
@@ -254,165 +482,57 @@ async def fetch_and_process_page(
     """
     url = base_url.format(page_number=page_number)
     print(f"   📄 Loading page {page_number}...")
+    started = time.perf_counter()
 
-    # Check if "No Results Found" message is present with retry
-    try:
-        no_results = await check_no_results_with_retry(crawler, url, session_id)
-        if no_results:
-            return [], True  # No more results, signal to stop crawling
-    except Exception as e:
-        print(f"   ⚠️  Error checking results: {e}")
-
-    all_businesses = []
-    use_fallback = False
-
-    # Try LLM extraction first (if available) with retry logic
-    if llm_strategy:
-        for llm_attempt in range(3):  # Max 3 attempts for LLM
-            try:
-                result = await crawler.arun(
-                    url=url,
-                    config=CrawlerRunConfig(
-                        cache_mode=CacheMode.BYPASS,
-                        extraction_strategy=llm_strategy,
-                        css_selector=css_selector,
-                        session_id=session_id,
-                    ),
-                )
-
-                if result.success and result.extracted_content:
-                    # Parse extracted content
-                    extracted_data = json.loads(result.extracted_content)
-                    
-                    if extracted_data and isinstance(extracted_data, list):
-                        for business in extracted_data:
-                            # Use .get() to safely access fields
-                            if business.get("error") is False:
-                                business.pop("error", None)
-                            
-                            # Validate business data
-                            if not validate_business_data(business):
-                                print(f"   [WARN] Missing essential data - Skipped entry")
-                                continue
-                            
-                            # Check for duplicates
-                            name = business.get('name', '')
-                            if is_duplicated(name, seen_names):
-                                print(f"   [SKIP] Duplicate: '{name}'")
-                                continue
-                            
-                            seen_names.add(name)
-                            all_businesses.append(business)
-                        break  # Success, exit retry loop
-                    else:
-                        # LLM returned empty or invalid data, use fallback
-                        use_fallback = True
-                        break
-                else:
-                    # Check for specific error types
-                    error_msg = str(result.error_message).lower()
-                    if 'rate limit' in error_msg or '429' in error_msg or 'quota' in error_msg:
-                        print(f"   ⚠️ API quota or timeout — continuing with direct scrape.")
-                        use_fallback = True
-                        break
-                    elif any(network_error in error_msg for network_error in ['net::err_network_changed', 'timeout', 'connection', 'network']):
-                        if llm_attempt < 2:  # Retry network errors
-                            print(f"   ⚠️ Network issue, retrying LLM extraction (attempt {llm_attempt + 1}/3)...")
-                            await asyncio.sleep(2 ** llm_attempt)
-                            continue
-                        else:
-                            print(f"   ⚠️ Network error after 3 attempts - using fallback extraction")
-                            use_fallback = True
-                            break
-                    else:
-                        print(f"   ⚠️  LLM extraction failed: {result.error_message}")
-                        use_fallback = True
-                        break
-
-            except Exception as e:
-                error_msg = str(e).lower()
-                if 'rate limit' in error_msg or '429' in error_msg or 'quota' in error_msg:
-                    print(f"   ⚠️ API quota or timeout — continuing with direct scrape.")
-                    use_fallback = True
-                    break
-                elif any(network_error in error_msg for network_error in ['timeout', 'connection', 'network']):
-                    if llm_attempt < 2:
-                        print(f"   ⚠️ Network issue, retrying LLM extraction (attempt {llm_attempt + 1}/3)...")
-                        await asyncio.sleep(2 ** llm_attempt)
-                        continue
-                    else:
-                        print(f"   ⚠️ Network error after 3 attempts - using fallback extraction")
-                        use_fallback = True
-                        break
-                else:
-                    print(f"   ⚠️  LLM exception: {e}")
-                    use_fallback = True
-                    break
+    # One fetch serves the no-results check, the parser and the LLM snippets
+    html = await fetch_page_html_with_retry(crawler, url, session_id)
+    if html is None:
+        return [], False
+    if "No Results Found" in html:
+        return [], True  # No more results, signal to stop crawling
+
+    complete, incomplete, raw_tokens = prepare_page_cards(html, css_selector=css_selector)
+    all_businesses = list(complete)
+    llm_calls = 0
+    trim_stats = {'duplicates': 0, 'tokens_in': 0}
+    tokens_out = 0
+
+    if incomplete and llm_strategy:
+        send, over_budget, trim_stats = prepare_llm_chunks(incomplete, seen_names, db)
+        all_businesses.extend(chunk.partial for chunk in over_budget if chunk.partial)
+
+        if send:
+            usage = getattr(llm_strategy, 'total_usage', None)
+            completion_before = getattr(usage, 'completion_tokens', 0)
+
+            batcher = LLMBatcher(llm_strategy, token_budget=trim_stats['tokens_in'])
+            for chunk in send:
+                batcher.add_chunk(chunk)
+            await batcher.flush()
+            all_businesses.extend(batcher.take(""))
+            llm_calls = batcher.stats['requests']
+
+            tokens_out = getattr(usage, 'completion_tokens', 0) - completion_before
+        llm_cards = len(send)
     else:
-        # No LLM strategy provided, use fallback from start
-        use_fallback = True
-
-    # Fallback: Extract using BeautifulSoup with retry logic
-    if use_fallback or not all_businesses:
-        for fallback_attempt in range(3):  # Max 3 attempts for fallback
-            try:
-                print(f"   🔄 Using fallback extraction (BeautifulSoup)...")
-                
-                # Fetch raw HTML
-                result = await crawler.arun(
-                    url=url,
-                    config=CrawlerRunConfig(
-                        cache_mode=CacheMode.BYPASS,
-                        session_id=session_id,
-                    ),
-                )
-                
-                if result.success and result.html:
-                    fallback_businesses = extract_business_from_html(result.html)
-                    
-                    for business in fallback_businesses:
-                        # Validate and check duplicates
-                        if not validate_business_data(business):
-                            continue
-                        
-                        name = business.get('name', '')
-                        if is_duplicated(name, seen_names):
-                            continue
-                        
-                        seen_names.add(name)
-                        all_businesses.append(business)
-                    break  # Success, exit retry loop
-                else:
-                    error_msg = str(result.error_message).lower()
-                    if any(network_error in error_msg for network_error in ['net::err_network_changed', 'timeout', 'connection', 'network']):
-                        if fallback_attempt < 2:
-                            print(f"   ⚠️ Network issue, retrying page {page_number} (attempt {fallback_attempt + 1}/3)...")
-                            await asyncio.sleep(2 ** fallback_attempt)
-                            continue
-                        else:
-                            print(f"   ❌ Network error after 3 attempts: {result.error_message}")
-                            return [], False
-                    else:
-                        print(f"   ❌ Failed to fetch HTML: {result.error_message}")
-                        return [], False
-
-            except Exception as e:
-                error_msg = str(e).lower()
-                if any(network_error in error_msg for network_error in ['timeout', 'connection', 'network']):
-                    if fallback_attempt < 2:
-                        print(f"   ⚠️ Network issue, retrying page {page_number} (attempt {fallback_attempt + 1}/3)...")
-                        await asyncio.sleep(2 ** fallback_attempt)
-                        continue
-                    else:
-                        print(f"   ❌ Network error after 3 attempts: {e}")
-                        return [], False
-                else:
-                    print(f"   ❌ Fallback extraction error: {e}")
-                    return [], False
-
-    if not all_businesses:
+        # No LLM available - keep whatever the parser found
+        all_businesses.extend(chunk.partial for chunk in incomplete if chunk.partial)
+        llm_cards = 0
+
+    businesses = filter_new_businesses(all_businesses, seen_names)
+
+    elapsed = time.perf_counter() - started
+    cards = len(complete) + len(incomplete)
+    extraction_stats.record_page(cards, llm_cards, llm_calls, elapsed,
+                                 raw_tokens=raw_tokens, tokens_in=trim_stats['tokens_in'], tokens_out=tokens_out)
+    print(f"   [HYBRID] Page {page_number}: {cards} cards, {llm_cards} sent to LLM "
+          f"in {llm_calls} call(s), {elapsed:.2f}s")
+    print(f"   [TOKENS] Page {page_number}: ~{trim_stats['tokens_in']} in (raw page ~{raw_tokens}), "
+          f"{tokens_out} out, {trim_stats['duplicates']} known cards skipped")
+
+    if not businesses:
         print(f"   ⚠️  No businesses found on page {page_number}")
         return [], False
 
-    print(f"   ✓ Extracted {len(all_businesses)} businesses from page {page_number}")
-    return all_businesses, False  # Continue crawling
+    print(f"   ✓ Extracted {len(businesses)} businesses from page {page_number}")
+    return businesses, False  # Continue crawling
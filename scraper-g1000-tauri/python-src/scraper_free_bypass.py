@@ -3,12 +3,16 @@ FREE Cloudflare Bypass Scraper using undetected-chromedriver
 NO PAID SERVICES - 100% FREE
 """
 
+import os
 import time
 import re
 from typing import List, Dict
 from bs4 import BeautifulSoup
 import undetected_chromedriver as uc
 
+# Overridable so runs can be pointed at the local mocks (python -m mocks)
+LISTING_BASE_URL = os.getenv("LISTING_BASE_URL", "https://www.yellowpages.com").rstrip("/")
+
 
 def create_stealth_driver():
     """Create an undetected Chrome driver to bypass Cloudflare."""
@@ -123,7 +127,7 @@ def scrape_yellowpages_free(zip_code: str, category: str, max_pages: int = 2) ->
         print("[SUCCESS] Stealth browser created")
 
         for page in range(1, max_pages + 1):
-            url = f"https://www.yellowpages.com/search?search_terms={category.replace(' ', '+')}&geo_location_terms={zip_code}&page={page}"
+            url = f"{LISTING_BASE_URL}/search?search_terms={category.replace(' ', '+')}&geo_location_terms={zip_code}&page={page}"
 
             print(f"\n[PAGE {page}] Fetching {url}")
             driver.get(url)
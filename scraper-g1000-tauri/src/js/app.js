@@ -3,6 +3,7 @@
  */
 
 const API_BASE = 'http://localhost:5050';
+const LEADS_PAGE_SIZE = 200;  // Leads per /api/leads page ("Load more" fetches the next)
 let currentProfileId = null;
 let currentProfileData = null;
 let currentFilter = null;
@@ -144,9 +145,6 @@ function setupEventListeners() {
     document.getElementById('radiusValue').textContent = e.target.value;
   });
 
-  // Export button
-  document.getElementById('btnExportLeads')?.addEventListener('click', exportFilteredLeads);
-
   // Select All checkbox
   document.getElementById('selectAll')?.addEventListener('change', (e) => {
     const checkboxes = document.querySelectorAll('#leadsTableBody input[type="checkbox"]');
@@ -155,8 +153,9 @@ function setupEventListeners() {
 
   // Search functionality
   document.getElementById('searchLeads')?.addEventListener('input', (e) => {
-    filterLeadsTable(e.target.value);
+    searchLeadsDebounced(e.target.value);
   });
+  document.getElementById('btnLoadMoreLeads')?.addEventListener('click', loadMoreLeads);
 
   // Bulk actions
   document.getElementById('btnBulkContact')?.addEventListener('click', () => bulkUpdateStatus('Contacted'));
@@ -273,56 +272,12 @@ function resetManualMode() {
 async function viewFilteredLeads() {
   console.log('[ViewFiltered] Showing leads for:', lastScrapeMetadata);
 
-  // Navigate to leads-list screen directly with filter
-  showScreen('leads-list');
-
-  // Create combined filter for ZIP + Category
-  const combinedFilter = {
+  // Filtered and paged server-side, same as the dashboard cards
+  await showFilteredLeads({
     type: 'combined',
     zip: lastScrapeMetadata.zip,
     category: lastScrapeMetadata.category
-  };
-
-  // Update breadcrumb
-  const breadcrumb = document.getElementById('breadcrumb');
-  if (breadcrumb) {
-    breadcrumb.textContent = `ZIP ${lastScrapeMetadata.zip} • ${lastScrapeMetadata.category}`;
-  }
-
-  // Load leads with combined filter
-  const tbody = document.getElementById('leadsTableBody');
-  tbody.innerHTML = '<tr><td colspan="9" class="loading">Loading leads...</td></tr>';
-
-  try {
-    // Fetch ALL leads
-    const data = await apiCall(`/api/leads/${currentProfileId}`);
-
-    if (!data.success || !data.leads || data.leads.length === 0) {
-      tbody.innerHTML = '<tr><td colspan="9" class="empty">No leads found</td></tr>';
-      document.getElementById('leadsCount').textContent = '0';
-      return;
-    }
-
-    // Filter by BOTH ZIP and Category
-    let filteredLeads = data.leads.filter(lead =>
-      lead.zipCode === lastScrapeMetadata.zip &&
-      lead.category === lastScrapeMetadata.category
-    );
-
-    console.log('[ViewFiltered] Filtered', filteredLeads.length, 'leads from', data.leads.length, 'total');
-
-    // Render filtered results
-    renderLeadsTable(filteredLeads, data.leads);
-
-    // Store for export/search
-    currentFilter = combinedFilter;
-    window.currentAllLeads = data.leads;
-    window.currentFilteredLeads = filteredLeads;
-
-  } catch (error) {
-    console.error('[ViewFiltered] Error:', error);
-    tbody.innerHTML = '<tr><td colspan="9" class="error">Failed to load leads</td></tr>';
-  }
+  });
 }
 
 // === Checkbox Selection Tracking ===
@@ -403,14 +358,14 @@ async function toggleToCombinedView() {
 
 async function loadCombinedFilterOptions() {
   try {
-    // Get all leads to extract unique cities, ZIPs, and categories
-    const leadsData = await apiCall(`/api/leads/${currentProfileId}`);
-    if (!leadsData.success || !leadsData.leads || leadsData.leads.length === 0) {
+    // Cities, ZIPs and categories come from the dashboard aggregates, not the lead list
+    const statsData = await apiCall(`/api/dashboard/${currentProfileId}?cities=1`);
+    if (!statsData.success || !statsData.stats.total) {
       document.getElementById('combinedResults').innerHTML = '<div class="empty-state">No leads yet. Start scraping!</div>';
       return;
     }
 
-    const leads = leadsData.leads;
+    const stats = statsData.stats;
 
     const cityList = document.getElementById('cityList');
     const zipList = document.getElementById('zipList');
@@ -421,9 +376,9 @@ async function loadCombinedFilterOptions() {
     catList.innerHTML = '';
 
     // Extract unique values
-    const uniqueCities = [...new Set(leads.map(l => l.city).filter(c => c))].sort();
-    const uniqueZips = [...new Set(leads.map(l => l.zipCode).filter(z => z && z !== 'N/A'))].sort();
-    const uniqueCats = [...new Set(leads.map(l => l.category).filter(c => c && c !== 'N/A'))].sort();
+    const uniqueCities = (stats.cities || []).filter(c => c);
+    const uniqueZips = stats.by_zip.map(([zip]) => zip).filter(z => z && z !== 'N/A').sort();
+    const uniqueCats = stats.by_category.map(([cat]) => cat).filter(c => c && c !== 'N/A').sort();
 
     // Populate city dropdown
     uniqueCities.forEach(city => {
@@ -498,27 +453,19 @@ async function loadLeadsDashboard() {
     const stats = statsData.stats;
 
     // Populate KPI cards with FRESH data
-    document.getElementById('cardAllLeadsCount').textContent = stats.total || 0;
-    document.getElementById('cardUncontactedCount').textContent = stats.by_status?.New || 0;
-    document.getElementById('cardContactedCount').textContent = stats.by_status?.Contacted || 0;
-    document.getElementById('cardArchivedCount').textContent = stats.by_status?.Archived || 0;
-
-    // Load FRESH leads data
-    const leadsData = await apiCall(`/api/leads/${currentProfileId}`);
-    const allLeads = leadsData.success ? leadsData.leads : [];
+    updateStatsCards(stats);
 
     // Generate ZIP cards with breakdown
     const zipCards = document.getElementById('zipCards');
     if (stats.by_zip && stats.by_zip.length > 0) {
       zipCards.innerHTML = stats.by_zip.map(([zip, count]) => {
-        // Calculate breakdown for this ZIP from FRESH data
-        const zipLeads = allLeads.filter(lead => lead.zipCode === zip);
-        const newCount = zipLeads.filter(lead => (lead.status || 'New') === 'New').length;
-        const contactedCount = zipLeads.filter(lead => lead.status === 'Contacted').length;
-        const archivedCount = zipLeads.filter(lead => lead.status === 'Archived').length;
-
-        // Get city name from first lead with this ZIP
-        const cityName = zipLeads.length > 0 && zipLeads[0].city ? zipLeads[0].city : null;
+        // Status breakdown and city name are aggregated server-side
+        const breakdown = stats.zip_status?.[zip] || {};
+        const newCount = breakdown.New || 0;
+        const contactedCount = breakdown.Contacted || 0;
+        const archivedCount = breakdown.Archived || 0;
+
+        const cityName = stats.zip_cities?.[zip] || null;
         const displayName = cityName ? `${cityName} (${zip})` : `ZIP ${zip}`;
 
         return `
@@ -552,11 +499,11 @@ async function loadLeadsDashboard() {
     const categoryCards = document.getElementById('categoryCards');
     if (stats.by_category && stats.by_category.length > 0) {
       categoryCards.innerHTML = stats.by_category.map(([category, count]) => {
-        // Calculate breakdown for this Category from FRESH data
-        const categoryLeads = allLeads.filter(lead => lead.category === category);
-        const newCount = categoryLeads.filter(lead => (lead.status || 'New') === 'New').length;
-        const contactedCount = categoryLeads.filter(lead => lead.status === 'Contacted').length;
-        const archivedCount = categoryLeads.filter(lead => lead.status === 'Archived').length;
+        // Status breakdown is aggregated server-side
+        const breakdown = stats.category_status?.[category] || {};
+        const newCount = breakdown.New || 0;
+        const contactedCount = breakdown.Contacted || 0;
+        const archivedCount = breakdown.Archived || 0;
 
         return `
           <div class="category-card" onclick="showFilteredLeads({type: 'category', value: '${category}'})">
@@ -596,12 +543,65 @@ async function loadLeadsDashboard() {
 }
 
 // === Show Filtered Leads ===
+// Server-side filter parameters shared by /api/leads and /api/leads/<id>/search
+function leadFilterParams(filter) {
+  const params = new URLSearchParams();
+  if (!filter) return params;
+  if (filter.type === 'status') params.set('status', filter.value);
+  else if (filter.type === 'zip') params.set('zip', filter.value);
+  else if (filter.type === 'category') params.set('category', filter.value);
+  else if (filter.type === 'combined') {
+    params.set('zip', filter.zip);
+    params.set('category', filter.category);
+  } else if (filter.type === 'multi') {
+    if (filter.city) params.set('city', filter.city);
+    if (filter.zip) params.set('zip', filter.zip);
+    if (filter.category) params.set('category', filter.category);
+  }
+  return params;
+}
+
+// One page of leads for a filter (archived leads only come back for status=Archived)
+function fetchLeadsPage(filter, cursor = null) {
+  const params = leadFilterParams(filter);
+  params.set('limit', LEADS_PAGE_SIZE);
+  if (cursor) params.set('cursor', cursor);
+  return apiCall(`/api/leads/${currentProfileId}?${params.toString()}`);
+}
+
+function updateLoadMoreButton() {
+  const button = document.getElementById('btnLoadMoreLeads');
+  if (button) button.style.display = window.leadsNextCursor ? 'inline-block' : 'none';
+}
+
+// Append the next page to the current list
+async function loadMoreLeads() {
+  if (!window.leadsNextCursor || !window.currentAllLeads) return;
+
+  try {
+    const data = await fetchLeadsPage(currentFilter, window.leadsNextCursor);
+    if (!data.success) {
+      showToast('Failed to load more leads: ' + data.error, 'error');
+      return;
+    }
+    const known = new Set(window.currentAllLeads.map(lead => lead.id));
+    window.currentAllLeads = [...window.currentAllLeads, ...data.leads.filter(lead => !known.has(lead.id))];
+    window.leadsNextCursor = data.nextCursor;
+    updateLoadMoreButton();
+    filterLeadsTable(document.getElementById('searchLeads')?.value || '');
+  } catch (error) {
+    console.error('[LoadMore] Error:', error);
+    showToast('Failed to load more leads: ' + error.message, 'error');
+  }
+}
+
 async function showFilteredLeads(filter) {
   console.log('[Filter] Showing filtered leads:', filter);
   currentFilter = filter;
 
-  // Fetch leads first to get city names
-  const data = await apiCall(`/api/leads/${currentProfileId}`);
+  // Filter server-side; the same response feeds the breadcrumb and the table
+  const leadsRequest = fetchLeadsPage(filter);
+  const data = await leadsRequest.catch(() => ({ success: false, leads: [] }));
   const allLeads = data.success ? data.leads : [];
 
   // Update breadcrumb with city names
@@ -646,40 +646,25 @@ async function showFilteredLeads(filter) {
   tbody.innerHTML = '<tr><td colspan="9" class="loading">Loading leads...</td></tr>';
 
   try {
-    // ALWAYS fetch FRESH data from server
-    const data = await apiCall(`/api/leads/${currentProfileId}`);
+    // Fresh, already-filtered data from the request above
+    const data = await leadsRequest;
     console.log('[Filter] Fresh leads data:', data);
 
     if (!data.success || !data.leads || data.leads.length === 0) {
       tbody.innerHTML = '<tr><td colspan="9" class="empty">No leads found</td></tr>';
       document.getElementById('leadsCount').textContent = '0';
+      window.leadsNextCursor = null;
+      updateLoadMoreButton();
       return;
     }
 
-    // Apply filter to FRESH data
-    let filteredLeads = data.leads;
-    if (filter.type === 'status') {
-      filteredLeads = data.leads.filter(lead => lead.status === filter.value);
-    } else if (filter.type === 'zip') {
-      filteredLeads = data.leads.filter(lead => lead.zipCode === filter.value);
-    } else if (filter.type === 'category') {
-      filteredLeads = data.leads.filter(lead => lead.category === filter.value);
-    } else if (filter.type === 'combined') {
-      filteredLeads = data.leads.filter(lead =>
-        lead.zipCode === filter.zip && lead.category === filter.category
-      );
-    } else if (filter.type === 'multi') {
-      // Flexible multi-filter: Match ALL provided criteria
-      filteredLeads = data.leads.filter(lead => {
-        let matches = true;
-        if (filter.city) matches = matches && lead.city === filter.city;
-        if (filter.zip) matches = matches && lead.zipCode === filter.zip;
-        if (filter.category) matches = matches && lead.category === filter.category;
-        return matches;
-      });
-    }
+    // Already filtered server-side; the client check matches what syncLeadChanges applies
+    const filteredLeads = data.leads.filter(leadMatchesFilter);
 
     renderLeadsTable(filteredLeads, data.leads);
+    window.leadsChangeSeq = data.changeSeq;
+    window.leadsNextCursor = data.nextCursor;
+    updateLoadMoreButton();
 
   } catch (error) {
     console.error('[Filter] Error:', error);
@@ -727,53 +712,117 @@ function renderLeadsTable(leads, allLeads) {
 }
 
 // === Filter Leads Table (Search) ===
-function filterLeadsTable(searchQuery) {
+// Full-text search runs server-side (/search), so it also finds leads on pages not loaded yet
+let searchTimer = null;
+function searchLeadsDebounced(searchQuery) {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => filterLeadsTable(searchQuery), 250);
+}
+
+function currentSearchQuery() {
+  return (document.getElementById('searchLeads')?.value || '').trim();
+}
+
+async function filterLeadsTable(searchQuery) {
   if (!window.currentAllLeads) return;
 
-  if (!searchQuery || searchQuery.trim() === '') {
-    // Show all filtered leads (based on current filter)
-    if (currentFilter.type === 'all') {
-      renderLeadsTable(window.currentAllLeads, window.currentAllLeads);
-    } else if (currentFilter.type === 'status') {
-      const filtered = window.currentAllLeads.filter(lead => lead.status === currentFilter.value);
-      renderLeadsTable(filtered, window.currentAllLeads);
-    } else if (currentFilter.type === 'zip') {
-      const filtered = window.currentAllLeads.filter(lead => lead.zipCode === currentFilter.value);
-      renderLeadsTable(filtered, window.currentAllLeads);
-    } else if (currentFilter.type === 'category') {
-      const filtered = window.currentAllLeads.filter(lead => lead.category === currentFilter.value);
-      renderLeadsTable(filtered, window.currentAllLeads);
+  if (searchQuery && searchQuery.trim() !== '') {
+    const params = leadFilterParams(currentFilter);
+    params.set('q', searchQuery.trim());
+    params.set('limit', LEADS_PAGE_SIZE);
+    try {
+      const data = await apiCall(`/api/leads/${currentProfileId}/search?${params.toString()}`);
+      // Ignore responses for a query the user has already changed
+      if (data.success && (document.getElementById('searchLeads')?.value || '').trim() === searchQuery.trim()) {
+        renderLeadsTable(data.leads, window.currentAllLeads);
+      }
+    } catch (error) {
+      console.error('[Search] Error:', error);
     }
     return;
   }
 
-  const query = searchQuery.toLowerCase();
-  let filtered = window.currentAllLeads;
-
-  // Apply current filter first
-  if (currentFilter.type === 'status') {
-    filtered = filtered.filter(lead => lead.status === currentFilter.value);
-  } else if (currentFilter.type === 'zip') {
-    filtered = filtered.filter(lead => lead.zipCode === currentFilter.value);
-  } else if (currentFilter.type === 'category') {
-    filtered = filtered.filter(lead => lead.category === currentFilter.value);
-  } else if (currentFilter.type === 'combined') {
-    filtered = filtered.filter(lead =>
-      lead.zipCode === currentFilter.zip && lead.category === currentFilter.category
-    );
+  // No search text: the loaded pages, narrowed to the current filter
+  // (leads added by syncLeadChanges need not match it)
+  renderLeadsTable(window.currentAllLeads.filter(leadMatchesFilter), window.currentAllLeads);
+}
+
+function leadMatchesFilter(lead) {
+  const filter = currentFilter || { type: 'all' };
+  if (filter.type === 'status') return lead.status === filter.value;
+  if (filter.type === 'zip') return lead.zipCode === filter.value;
+  if (filter.type === 'category') return lead.category === filter.value;
+  if (filter.type === 'combined') return lead.zipCode === filter.zip && lead.category === filter.category;
+  if (filter.type === 'multi') {
+    return (!filter.city || lead.city === filter.city) &&
+      (!filter.zip || lead.zipCode === filter.zip) &&
+      (!filter.category || lead.category === filter.category);
+  }
+  return true;
+}
+
+// === KPI Cards ===
+function updateStatsCards(stats) {
+  window.dashboardStats = stats;
+  document.getElementById('cardAllLeadsCount').textContent = stats.total || 0;
+  document.getElementById('cardUncontactedCount').textContent = stats.by_status?.New || 0;
+  document.getElementById('cardContactedCount').textContent = stats.by_status?.Contacted || 0;
+  document.getElementById('cardArchivedCount').textContent = stats.by_status?.Archived || 0;
+}
+
+// The loaded list is only a page, so counts come from the server's counters
+async function refreshStatsCards() {
+  const statsData = await apiCall(`/api/dashboard/${currentProfileId}`);
+  if (statsData.success) updateStatsCards(statsData.stats);
+}
+
+// === Incremental Lead Sync ===
+// Applies /changes deltas to window.currentAllLeads instead of reloading the list
+async function syncLeadChanges() {
+  if (!window.currentAllLeads || window.leadsChangeSeq == null) return 0;
+
+  let since = window.leadsChangeSeq;
+  let applied = 0;
+  let hasMore = true;
+  while (hasMore) {
+    const data = await apiCall(`/api/leads/${currentProfileId}/changes?since=${since}`);
+    if (!data.success) return applied;
+    if (data.reset) {
+      // Too far behind - the next list view loads everything again
+      window.currentAllLeads = null;
+      window.leadsChangeSeq = null;
+      await refreshStatsCards();
+      return applied;
+    }
+
+    const byId = new Map(window.currentAllLeads.map(lead => [lead.id, lead]));
+    const current = new Map(data.leads.map(lead => [lead.id, lead]));
+    const added = new Map();
+    data.changes.forEach(change => {
+      const lead = current.get(change.leadId);
+      if (change.event === 'delete' || !lead) {
+        byId.delete(change.leadId);
+        added.delete(change.leadId);
+      } else if (byId.has(change.leadId)) {
+        byId.set(change.leadId, lead);
+      } else {
+        added.set(change.leadId, lead);
+      }
+    });
+
+    // New leads go on top, matching the newest-first list order
+    window.currentAllLeads = [...Array.from(added.values()).reverse(), ...byId.values()];
+    applied += data.changes.length;
+    since = data.nextSince;
+    hasMore = data.hasMore;
   }
 
-  // Apply search query
-  filtered = filtered.filter(lead =>
-    lead.name.toLowerCase().includes(query) ||
-    lead.phone.toLowerCase().includes(query) ||
-    (lead.address && lead.address.toLowerCase().includes(query)) ||
-    (lead.category && lead.category.toLowerCase().includes(query)) ||
-    (lead.city && lead.city.toLowerCase().includes(query)) ||
-    (lead.zipCode && lead.zipCode.toLowerCase().includes(query))
-  );
-
-  renderLeadsTable(filtered, window.currentAllLeads);
+  window.leadsChangeSeq = since;
+  if (applied) await refreshStatsCards();
+  if (applied && currentFilter && document.getElementById('leads-list')?.classList.contains('active')) {
+    filterLeadsTable(document.getElementById('searchLeads')?.value || '');
+  }
+  return applied;
 }
 
 // === Bulk Status Update ===
@@ -818,9 +867,12 @@ function openExportModal(defaultScope) {
   modal.classList.add('active');
 
   // Update counts
-  const currentCount = window.currentFilteredLeads?.length || 0;
+  // More pages on the server: "current view" exports all of them, not just the loaded rows
+  const loadedCount = window.currentFilteredLeads?.length || 0;
+  const currentCount = window.leadsNextCursor && !currentSearchQuery() ? `${loadedCount}+` : loadedCount;
   const selectedCount = document.querySelectorAll('#leadsTableBody input[type="checkbox"]:checked').length;
-  const allCount = window.currentAllLeads?.length || 0;
+  // "All" exports every lead server-side, not just the pages loaded here
+  const allCount = window.dashboardStats?.total ?? (window.currentAllLeads?.length || 0);
 
   document.getElementById('exportCurrentCount').textContent = currentCount;
   document.getElementById('exportSelectedCount').textContent = selectedCount;
@@ -852,23 +904,24 @@ async function performExport() {
     return;
   }
 
-  // Determine which leads to export
-  let leadsToExport = [];
-  let leadIds = null;
+  // Determine which leads to export; the list is paged, so the server resolves
+  // "current" and "all" instead of the rows loaded here
+  let leadIds = null;  // null means all leads
+  let filter = null;
 
   if (scope === 'selected') {
     const checkboxes = document.querySelectorAll('#leadsTableBody input[type="checkbox"]:checked');
     leadIds = Array.from(checkboxes).map(cb => parseInt(cb.dataset.id));
-    leadsToExport = window.currentAllLeads.filter(lead => leadIds.includes(lead.id));
   } else if (scope === 'current') {
-    leadsToExport = window.currentFilteredLeads || [];
-    leadIds = leadsToExport.map(lead => lead.id);
-  } else if (scope === 'all') {
-    leadsToExport = window.currentAllLeads || [];
-    leadIds = null; // null means all leads
+    if (currentSearchQuery()) {
+      // Search results are not paged: the table holds every match
+      leadIds = (window.currentFilteredLeads || []).map(lead => lead.id);
+    } else {
+      filter = Object.fromEntries(leadFilterParams(currentFilter));
+    }
   }
 
-  if (leadsToExport.length === 0) {
+  if (leadIds && leadIds.length === 0) {
     showToast('No leads to export', 'error');
     return;
   }
@@ -909,6 +962,7 @@ async function performExport() {
 
     const result = await apiCall(`/api/leads/${currentProfileId}/export`, 'POST', {
       leadIds,
+      filter,
       format,
       filename
     });
@@ -1052,57 +1106,6 @@ async function updateLeadStatus(leadId, newStatus) {
   }
 }
 
-// === Export Filtered Leads ===
-async function exportFilteredLeads() {
-  console.log('[Export] Exporting filtered leads...');
-
-  try {
-    // Get currently displayed leads from table
-    const leadsToExport = window.currentFilteredLeads || [];
-
-    if (leadsToExport.length === 0) {
-      showToast('No leads to export', 'error');
-      return;
-    }
-
-    const headers = ['Name', 'Phone', 'Address', 'Website', 'Email', 'Category', 'City', 'ZIP Code', 'Status'];
-    const csv = [
-      headers.join(','),
-      ...leadsToExport.map(lead => [
-        lead.name,
-        lead.phone,
-        lead.address || 'N/A',
-        lead.website || 'N/A',
-        lead.email || 'N/A',
-        lead.category || 'N/A',
-        lead.city || 'N/A',
-        lead.zipCode || 'N/A',
-        lead.status || 'New'
-      ].map(field => `"${field}"`).join(','))
-    ].join('\n');
-
-    const blob = new Blob([csv], { type: 'text/csv' });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-
-    // Generate filename based on filter
-    let filterName = 'all_leads';
-    if (currentFilter.type === 'status') filterName = `status_${currentFilter.value}`;
-    else if (currentFilter.type === 'zip') filterName = `zip_${currentFilter.value}`;
-    else if (currentFilter.type === 'category') filterName = currentFilter.value.replace(/\s+/g, '_').toLowerCase();
-
-    a.download = `${currentProfileData.name}_${filterName}_${new Date().toISOString().split('T')[0]}.csv`;
-    a.click();
-    URL.revokeObjectURL(url);
-
-    console.log('[Export] Downloaded', leadsToExport.length, 'leads');
-  } catch (error) {
-    console.error('[Export] Error:', error);
-    showToast('Failed to export: ' + error.message, 'error');
-  }
-}
-
 // === Manual Scrape ===
 async function startManualScrape() {
   const city = document.getElementById('inputCity').value;
@@ -1153,7 +1156,7 @@ async function pollScrapeStatus() {
           setTimeout(() => {
             showScreen('mode-selector');
             showToast(`Complete! Found ${status.total_leads || 0} leads`, 'success');
-            location.reload();
+            syncLeadChanges().catch(err => console.error('[Sync] Error:', err));
           }, 1000);
         }
       }
@@ -0,0 +1,200 @@
+"""
+Cross-profile analytics.
+
+Every profile keeps its leads in its own SQLite file. ProfileAnalytics
+ATTACHes them (read-only) to in-memory connections so questions that span
+profiles are answered in SQL. SQLite attaches at most SQLITE_LIMIT_ATTACHED
+(10 by default) files per connection, so profiles are split into shards of
+that size; with more than one shard each shard's rows are staged in a temp
+table and aggregated there. Results are cached per query and reused until
+one of the attached files changes, detected with PRAGMA <schema>.data_version.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.database import CONNECTION_PRAGMAS, LeadsDatabase
+
+
+class ProfileAnalytics:
+    """Read-only view over several profile databases"""
+
+    def __init__(self, profiles: List[Tuple[str, str]]):
+        """
+        Args:
+            profiles: (profile_id, db_path) pairs; missing or unreadable files are skipped
+        """
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, Tuple[tuple, object]] = {}
+        # (connection, {schema name: profile id}) per group of up to `limit` attached files
+        self._shards: List[Tuple[sqlite3.Connection, Dict[str, str]]] = []
+
+        # schema name -> profile id, over every shard
+        self.schemas: Dict[str, str] = {}
+        for profile_id, db_path in profiles:
+            if not os.path.exists(db_path):
+                continue
+            try:
+                # Opening through LeadsDatabase applies pending migrations first
+                LeadsDatabase(db_path)
+                self._attach(profile_id, db_path)
+            except sqlite3.Error as e:
+                print(f"[ANALYTICS] ⚠️  Skipping profile {profile_id} ({db_path}): {e}")
+
+    def _attach(self, profile_id: str, db_path: str):
+        if not self._shards or len(self._shards[-1][1]) >= self._shards[-1][0].getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+            conn = sqlite3.connect(':memory:', check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._shards.append((conn, {}))
+        conn, schemas = self._shards[-1]
+        schema = f"p{len(self.schemas)}"
+        uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+        conn.execute('ATTACH DATABASE ? AS ' + schema, (uri,))
+        schemas[schema] = profile_id
+        self.schemas[schema] = profile_id
+
+    def close(self):
+        with self._lock:
+            for conn, _ in self._shards:
+                conn.close()
+
+    def _data_versions(self) -> tuple:
+        return tuple(
+            conn.execute(f'PRAGMA {schema}.data_version').fetchone()[0]
+            for conn, schemas in self._shards for schema in schemas
+        )
+
+    def _cached(self, key: tuple, run) -> list:
+        """Call run() unless the same query ran since the last change to any profile DB"""
+        with self._lock:
+            versions = self._data_versions()
+            hit = self._cache.get(key)
+            if hit and hit[0] == versions:
+                return hit[1]
+            rows = run()
+            self._cache[key] = (versions, rows)
+            return rows
+
+    @staticmethod
+    def _union(select: str, schemas: Dict[str, str]) -> str:
+        """UNION ALL of `select` over the given schemas ({schema} and {profile} are filled in)"""
+        return '\nUNION ALL\n'.join(
+            select.format(schema=schema, profile=profile_id.replace("'", "''"))
+            for schema, profile_id in schemas.items()
+        )
+
+    def _select(self, select: str) -> list:
+        """Rows of `select` from every attached profile"""
+        return [row for conn, schemas in self._shards for row in conn.execute(self._union(select, schemas))]
+
+    def _aggregate(self, select: str, aggregate: str, params: tuple = ()) -> list:
+        """
+        Run `aggregate` over the rows of `select` from every attached profile.
+        `aggregate` reads them as {rows}.
+        """
+        conn, schemas = self._shards[0]
+        if len(self._shards) == 1:
+            return conn.execute(aggregate.format(rows=f'({self._union(select, schemas)})'), params).fetchall()
+
+        # Shards can't be joined in one statement: stage their rows on the first connection
+        conn.execute('DROP TABLE IF EXISTS temp.staged')
+        conn.execute(f'CREATE TEMP TABLE staged AS {self._union(select, schemas)}')
+        for other, other_schemas in self._shards[1:]:
+            cursor = other.execute(self._union(select, other_schemas))
+            placeholders = ', '.join('?' * len(cursor.description))
+            conn.executemany(f'INSERT INTO temp.staged VALUES ({placeholders})', cursor)
+        try:
+            return conn.execute(aggregate.format(rows='temp.staged'), params).fetchall()
+        finally:
+            conn.execute('DROP TABLE temp.staged')
+
+    def profile_totals(self) -> Dict[str, Dict[str, int]]:
+        """
+        Lead counts for every profile in one statement.
+
+        Returns:
+            {profile_id: {'total': n, 'valid': n}}
+        """
+        if not self.schemas:
+            return {}
+        rows = self._cached(('totals',), lambda: self._select('''
+            SELECT '{profile}',
+                   COALESCE((SELECT count FROM {schema}.lead_counters WHERE dimension = 'all' AND value = ''), 0),
+                   COALESCE((SELECT count FROM {schema}.lead_counters WHERE dimension = 'valid' AND value = ''), 0)
+        '''))
+        return {profile_id: {'total': total, 'valid': valid} for profile_id, total, valid in rows}
+
+    def overlapping_businesses(self, limit: int = 100) -> List[dict]:
+        """
+        Businesses stored by more than one profile (same phone_norm + name_key).
+
+        Returns:
+            Dicts with name, phone, the profile ids holding it, and the count,
+            most widely shared first
+        """
+        if len(self.schemas) < 2:
+            return []
+        rows = self._cached(('overlaps', limit), lambda: self._aggregate('''
+            SELECT '{profile}' AS profile, phone_norm, name_key, name, phone
+            FROM {schema}.leads WHERE phone_norm IS NOT NULL AND name_key IS NOT NULL
+        ''', '''
+            SELECT MIN(name), MIN(phone), json_group_array(DISTINCT profile), COUNT(DISTINCT profile) AS profiles
+            FROM {rows}
+            GROUP BY phone_norm, name_key
+            HAVING COUNT(DISTINCT profile) > 1
+            ORDER BY profiles DESC, MIN(name)
+            LIMIT ?
+        ''', (limit,)))
+        return [
+            {'name': name, 'phone': phone, 'profiles': json.loads(profiles), 'profileCount': count}
+            for name, phone, profiles, count in rows
+        ]
+
+    def scraped_combos(self, zip_code: Optional[str] = None) -> List[dict]:
+        """
+        ZIP + category combos scraped by any profile.
+
+        Args:
+            zip_code: Only combos for this ZIP
+
+        Returns:
+            Dicts with zip_code, category, the profiles that scraped it and
+            first/last scrape dates
+        """
+        if not self.schemas:
+            return []
+        rows = self._cached(('combos', zip_code), lambda: self._aggregate('''
+            SELECT '{profile}' AS profile, zip_code, category, scraped_date FROM {schema}.scraped_combos
+        ''', '''
+            SELECT zip_code, category, json_group_array(DISTINCT profile), MIN(scraped_date), MAX(scraped_date)
+            FROM {rows}
+            WHERE ? IS NULL OR zip_code = ?
+            GROUP BY zip_code, category
+            ORDER BY zip_code, category
+        ''', (zip_code, zip_code)))
+        return [
+            {'zipCode': zip_code, 'category': category, 'profiles': json.loads(profiles),
+             'firstScraped': first, 'lastScraped': last}
+            for zip_code, category, profiles, first, last in rows
+        ]
+
+
+_analytics: Optional[ProfileAnalytics] = None
+_analytics_key: Optional[tuple] = None
+_analytics_lock = threading.Lock()
+
+
+def get_profile_analytics(profiles: List[Tuple[str, str]]) -> ProfileAnalytics:
+    """Shared ProfileAnalytics, rebuilt when the set of profile databases changes"""
+    global _analytics, _analytics_key
+    key = tuple(sorted((pid, os.path.abspath(path)) for pid, path in profiles if os.path.exists(path)))
+    with _analytics_lock:
+        if _analytics is None or key != _analytics_key:
+            if _analytics is not None:
+                _analytics.close()
+            _analytics = ProfileAnalytics(profiles)
+            _analytics_key = key
+        return _analytics
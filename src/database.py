@@ -1,9 +1,794 @@
 import sqlite3
+import base64
 import hashlib
+import json
+import re
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import os
-from src.validators import LeadValidator
+from src.validators import LeadValidator, canonical_name, normalize_phone
+
+
+# Rollback-journal mode makes readers and the scrape writer block each other;
+# WAL lets the API serve reads while a background job is inserting.
+JOURNAL_MODE = os.getenv("LEADS_DB_JOURNAL_MODE", "WAL")
+
+# compact_archive() also moves leads older than this many days (unset = only
+# leads marked Archived)
+ARCHIVE_AFTER_DAYS = int(os.getenv("LEADS_ARCHIVE_AFTER_DAYS", "0")) or None
+
+# maintain() drops lead_events older than this; clients further behind get reset=True
+LEAD_EVENTS_RETENTION_DAYS = int(os.getenv("LEAD_EVENTS_RETENTION_DAYS", "30"))
+
+# Applied to every connection. synchronous=NORMAL is durable across app
+# crashes in WAL mode (only an OS crash can lose the last commits).
+CONNECTION_PRAGMAS = [
+    "PRAGMA busy_timeout = 30000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 MB page cache
+    "PRAGMA mmap_size = 268435456",  # 256 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+]
+
+# Pages copied per backup step when snapshotting (4 MB at the default page size)
+SNAPSHOT_PAGES_PER_STEP = 1024
+# Restarts (the source changed mid-copy) tolerated before copying in one step
+SNAPSHOT_MAX_RESTARTS = 3
+
+
+class ConnectionManager:
+    """
+    One long-lived SQLite connection per thread for a database file.
+
+    Connections are opened lazily, reused by every call made on the same
+    thread (so the sqlite3 statement cache stays warm) and closed when the
+    owning thread exits, on close()/close_all() or at interpreter exit.
+    Writes go through transaction(), which nests: only the outermost block
+    commits or rolls back. Pure reads can use reader(), a separate
+    read-only connection that can never take the write lock.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30.0, cached_statements: int = 256):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.schema_ready = False
+        self._journal_mode_set = False
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (thread, read_only) -> connection
+        self._connections: Dict[Tuple[threading.Thread, bool], sqlite3.Connection] = {}
+
+    def _open(self, read_only: bool = False) -> sqlite3.Connection:
+        if read_only:
+            target = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        else:
+            target = self.db_path
+        conn = sqlite3.connect(
+            target,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            isolation_level=None,  # Transactions are explicit (see transaction())
+            check_same_thread=False,  # Only the owner uses it; close_all() may run elsewhere
+            uri=read_only,
+        )
+        if not read_only and not self._journal_mode_set:
+            # Persistent in the file; must run outside a transaction.
+            # auto_vacuum only takes effect on a new file (maintain() converts old ones)
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+            self._journal_mode_set = True
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+
+        with self._lock:
+            # Close connections left behind by threads that have finished
+            for key in [k for k in self._connections if not k[0].is_alive()]:
+                self._connections.pop(key).close()
+            self._connections[(threading.current_thread(), read_only)] = conn
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it if needed"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Return the calling thread's read-only connection, opening it if needed"""
+        conn = getattr(self._local, 'ro_conn', None)
+        if conn is None:
+            conn = self._open(read_only=True)
+            self._local.ro_conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block in a write transaction; yields a cursor"""
+        conn = self.connection()
+        outermost = self._local.depth == 0
+        if outermost:
+            conn.execute('BEGIN IMMEDIATE')
+        self._local.depth += 1
+        try:
+            yield conn.cursor()
+        except BaseException:
+            self._local.depth -= 1
+            if outermost:
+                conn.rollback()
+            raise
+        self._local.depth -= 1
+        if outermost:
+            conn.commit()
+
+    def close(self):
+        """Close the calling thread's connections"""
+        for attr, read_only in (('conn', False), ('ro_conn', True)):
+            conn = getattr(self._local, attr, None)
+            if conn is None:
+                continue
+            setattr(self._local, attr, None)
+            with self._lock:
+                self._connections.pop((threading.current_thread(), read_only), None)
+            conn.close()
+
+    def close_all(self):
+        """Close every connection (shutdown only - other threads must be idle)"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """Shared manager per database file, so every LeadsDatabase on a path reuses connections"""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = ConnectionManager(db_path)
+        return manager
+
+
+def release_connection_manager(db_path: str):
+    """Close and forget the shared manager for db_path (for files about to be deleted)"""
+    with _managers_lock:
+        manager = _managers.pop(os.path.abspath(db_path), None)
+    if manager is not None:
+        manager.close_all()
+
+
+class _SnapshotRestarted(Exception):
+    pass
+
+
+def backup_database(source_path: str, target_path: str, pages: int = SNAPSHOT_PAGES_PER_STEP) -> int:
+    """
+    Copy a live database with SQLite's online backup API.
+
+    The copy proceeds `pages` at a time so the source is only read-locked
+    briefly per step. A write from another connection restarts the copy;
+    after SNAPSHOT_MAX_RESTARTS restarts the rest is copied in a single
+    step (one short read transaction, which WAL writers do not wait on).
+
+    Returns:
+        Number of pages copied
+    """
+    restarts = 0
+    copied = [0]
+
+    def progress(status, remaining, total):
+        nonlocal restarts
+        if copied[0] and total - remaining < copied[0]:
+            restarts += 1
+            if restarts > SNAPSHOT_MAX_RESTARTS:
+                raise _SnapshotRestarted()
+        copied[0] = total - remaining
+
+    source = sqlite3.connect(f"file:{os.path.abspath(source_path)}?mode=ro", uri=True)
+    target = sqlite3.connect(target_path)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress, sleep=0.01)
+        except _SnapshotRestarted:
+            print(f"[SNAPSHOT] ⚠️  {source_path} kept changing, copying in one step")
+            source.backup(target, pages=-1)
+        return target.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+
+
+@atexit.register
+def close_all_connections():
+    """Close every pooled connection (called automatically at exit)"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close_all()
+
+
+# A lead is listed/counted only if it has a phone and its name is not scraped
+# page chrome. Stored in leads.is_valid at insert time so listing and
+# dashboard queries can use an index instead of LIKE scans.
+JUNK_NAME_PATTERNS = ['![', '[website', 'about search', '[next]']
+
+VALID_LEAD_SQL = '''
+    phone IS NOT NULL AND phone NOT IN ('N/A', '')
+    AND name NOT LIKE '%![%' AND name NOT LIKE '%[Website%'
+    AND name NOT LIKE '%About Search%' AND name NOT LIKE '%[Next]%'
+'''
+
+
+def lead_is_valid(name: Optional[str], phone: Optional[str]) -> int:
+    """Python twin of VALID_LEAD_SQL (LIKE is case-insensitive, hence lower())"""
+    if not phone or phone in ('N/A', ''):
+        return 0
+    lowered = (name or '').lower()
+    return 0 if any(pattern in lowered for pattern in JUNK_NAME_PATTERNS) else 1
+
+
+def _migration_base_schema(cursor):
+    """Tables and indexes shared by the CLI and the desktop app"""
+    # Table for tracking all scraped leads
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            business_hash TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            website TEXT,
+            zip_code TEXT,
+            location TEXT,
+            scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            source_file TEXT,
+            category TEXT,
+            city TEXT,
+            status TEXT DEFAULT 'New'
+        )
+    ''')
+
+    # Table for tracking scraped zip+category combos (prevents re-scraping)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scraped_combos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            zip_code TEXT NOT NULL,
+            category TEXT NOT NULL,
+            scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            lead_number INTEGER NOT NULL,
+            UNIQUE(zip_code, category)
+        )
+    ''')
+
+    # Index for fast duplicate checking
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_business_hash
+        ON leads(business_hash)
+    ''')
+
+    # Index for searching by location/zip
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_location
+        ON leads(location, zip_code)
+    ''')
+
+
+def _migration_unify_lead_columns(cursor):
+    """Databases created by older versions lack some of category/city/status"""
+    cursor.execute("PRAGMA table_info(leads)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'category' not in columns:
+        cursor.execute('ALTER TABLE leads ADD COLUMN category TEXT')
+    if 'city' not in columns:
+        cursor.execute('ALTER TABLE leads ADD COLUMN city TEXT')
+    if 'status' not in columns:
+        cursor.execute("ALTER TABLE leads ADD COLUMN status TEXT DEFAULT 'New'")
+
+
+def _migration_status_not_null(cursor):
+    """
+    Backfill NULL statuses and enforce NOT NULL DEFAULT 'New'.
+    SQLite cannot change a column constraint in place, so the table is rebuilt.
+    """
+    cursor.execute('''
+        CREATE TABLE leads_rebuild (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            business_hash TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            website TEXT,
+            zip_code TEXT,
+            location TEXT,
+            scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            source_file TEXT,
+            category TEXT,
+            city TEXT,
+            status TEXT NOT NULL DEFAULT 'New'
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO leads_rebuild
+        (id, business_hash, name, address, phone, email, website, zip_code, location,
+         scraped_date, source_file, category, city, status)
+        SELECT id, business_hash, name, address, phone, email, website, zip_code, location,
+               scraped_date, source_file, category, city, COALESCE(status, 'New')
+        FROM leads
+    ''')
+    # Keep AUTOINCREMENT from reusing ids of leads deleted before the rebuild
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'leads'")
+    row = cursor.fetchone()
+    if row:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'leads_rebuild'")
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('leads_rebuild', ?)", (row[0],))
+    cursor.execute('DROP TABLE leads')
+    cursor.execute('ALTER TABLE leads_rebuild RENAME TO leads')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_business_hash ON leads(business_hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_location ON leads(location, zip_code)')
+
+
+def _migration_is_valid_flag(cursor):
+    """Precomputed validity flag plus the indexes the listing/dashboard queries use"""
+    cursor.execute('ALTER TABLE leads ADD COLUMN is_valid INTEGER NOT NULL DEFAULT 0')
+    cursor.execute(f'UPDATE leads SET is_valid = CASE WHEN {VALID_LEAD_SQL} THEN 1 ELSE 0 END')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_date ON leads(is_valid, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_zip ON leads(is_valid, zip_code)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_category ON leads(is_valid, category)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_status ON leads(is_valid, status)')
+
+
+# Lead insert that also skips rows matching an existing (phone_norm, name_key),
+# i.e. the same business with differently formatted phone/name, and anything
+# already moved to leads_archive. Parameters: the 14 column values, then
+# phone_norm and name_key again, then business_hash again.
+INSERT_LEAD_SQL = '''
+    INSERT {conflict} INTO leads
+    (business_hash, name, address, phone, email, website, zip_code, category, location, source_file, city,
+     is_valid, phone_norm, name_key)
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM all_leads WHERE phone_norm = ? AND name_key = ?)
+      AND NOT EXISTS (SELECT 1 FROM leads_archive WHERE business_hash = ?)
+'''
+
+
+def lead_insert_params(business_hash: str, name: str, address: str, phone: str, email, website,
+                       zip_code, category, location, source_file, city) -> tuple:
+    """Parameters for INSERT_LEAD_SQL (derived columns computed here)"""
+    phone_norm, name_key = normalize_phone(phone), canonical_name(name)
+    return (business_hash, name, address, phone, email, website, zip_code, category, location,
+            source_file, city, lead_is_valid(name, phone), phone_norm, name_key, phone_norm, name_key,
+            business_hash)
+
+
+# Lead listing: filter name -> column, and the sort orders query_leads supports.
+# Every sort is keyset-paginated on (scraped_date, id).
+LEAD_FILTER_COLUMNS = {'zip_code': 'zip_code', 'category': 'category', 'status': 'status', 'city': 'location'}
+LEAD_SORTS = {'newest': 'DESC', 'oldest': 'ASC'}
+LEAD_LIST_COLUMNS = 'id, name, phone, address, website, email, category, zip_code, status, location, scraped_date'
+
+
+# bm25 weights for leads_fts columns (name, address, website, email)
+SEARCH_RANK = 'bm25(leads_fts, 10.0, 4.0, 2.0, 2.0)'
+
+
+def build_fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+    Quoting each term keeps user input from being read as FTS syntax.
+    """
+    terms = re.findall(r'\w+', text.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def encode_lead_cursor(scraped_date: str, lead_id: int) -> str:
+    """Opaque, URL-safe page cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps([scraped_date, lead_id]).encode()).decode()
+
+
+def decode_lead_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_lead_cursor; raises ValueError on a malformed cursor"""
+    try:
+        scraped_date, lead_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return scraped_date, int(lead_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+# Dashboard aggregates kept by triggers: (dimension, value) -> count.
+# 'all' counts every lead; 'valid', 'zip', 'category' and 'status' count
+# only is_valid leads, mirroring the dashboard filters. Rows in leads_archive
+# count too, so moving a lead between the tables leaves the totals unchanged.
+# Any migration that rebuilds the leads table must call _create_counter_triggers again.
+COUNTER_DIMENSIONS = [
+    # (dimension, value expression, extra condition)
+    ('all', "''", '1'),
+    ('valid', "''", '{row}.is_valid = 1'),
+    ('zip', '{row}.zip_code', '{row}.is_valid = 1 AND {row}.zip_code IS NOT NULL'),
+    ('category', '{row}.category', '{row}.is_valid = 1 AND {row}.category IS NOT NULL'),
+    ('status', '{row}.status', '{row}.is_valid = 1'),
+    # Per-ZIP and per-category status breakdown, value is '<zip or category>|<status>'
+    ('zip_status', "{row}.zip_code || '|' || {row}.status", '{row}.is_valid = 1 AND {row}.zip_code IS NOT NULL'),
+    ('category_status', "{row}.category || '|' || {row}.status", '{row}.is_valid = 1 AND {row}.category IS NOT NULL'),
+]
+
+
+def _counter_upserts(row: str, delta: int) -> str:
+    """Trigger body statements adding delta for the NEW/OLD row"""
+    statements = []
+    for dimension, value, condition in COUNTER_DIMENSIONS:
+        statements.append(
+            f"INSERT INTO lead_counters (dimension, value, count) "
+            f"SELECT '{dimension}', {value.format(row=row)}, {delta} WHERE {condition.format(row=row)} "
+            f"ON CONFLICT(dimension, value) DO UPDATE SET count = count + excluded.count;"
+        )
+    return "\n".join(statements)
+
+
+def _create_counter_triggers(cursor, table: str = 'leads'):
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_counters_insert AFTER INSERT ON {table} BEGIN
+        {_counter_upserts('NEW', 1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_counters_delete AFTER DELETE ON {table} BEGIN
+        {_counter_upserts('OLD', -1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_counters_update
+        AFTER UPDATE OF is_valid, zip_code, category, status ON {table} BEGIN
+        {_counter_upserts('OLD', -1)}
+        {_counter_upserts('NEW', 1)}
+        END
+    ''')
+
+
+def rebuild_lead_counters(cursor, source: str = 'all_leads'):
+    """Recompute lead_counters from source (hot + archived leads by default)"""
+    cursor.execute('DELETE FROM lead_counters')
+    for dimension, value, condition in COUNTER_DIMENSIONS:
+        value, condition = value.format(row=source), condition.format(row=source)
+        cursor.execute(f'''
+            INSERT INTO lead_counters (dimension, value, count)
+            SELECT '{dimension}', {value}, COUNT(*) FROM {source} WHERE {condition} GROUP BY {value}
+        ''')
+
+
+def check_lead_counters(conn: sqlite3.Connection, source: str = 'all_leads') -> List[Tuple[str, str, int, int]]:
+    """
+    Compare lead_counters with a fresh count of source (hot + archived leads by default).
+    Returns (dimension, value, stored, actual) for every mismatch.
+    """
+    actual = {}
+    for dimension, value, condition in COUNTER_DIMENSIONS:
+        value, condition = value.format(row=source), condition.format(row=source)
+        for key, count in conn.execute(f'SELECT {value}, COUNT(*) FROM {source} WHERE {condition} GROUP BY {value}'):
+            actual[(dimension, key)] = count
+    stored = {
+        (dimension, value): count
+        for dimension, value, count in conn.execute('SELECT dimension, value, count FROM lead_counters WHERE count != 0')
+    }
+    return [
+        (dimension, value, stored.get((dimension, value), 0), actual.get((dimension, value), 0))
+        for dimension, value in sorted(set(actual) | set(stored))
+        if stored.get((dimension, value), 0) != actual.get((dimension, value), 0)
+    ]
+
+
+def _migration_lead_counters(cursor):
+    """Trigger-maintained dashboard counters, seeded from the current rows"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lead_counters (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    _create_counter_triggers(cursor)
+    rebuild_lead_counters(cursor, source='leads')
+
+
+def _migration_listing_indexes(cursor):
+    """Filter + (scraped_date, id) indexes so filtered lead pages need no sort"""
+    cursor.execute('DROP INDEX IF EXISTS idx_valid_zip')
+    cursor.execute('DROP INDEX IF EXISTS idx_valid_category')
+    cursor.execute('DROP INDEX IF EXISTS idx_valid_status')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_zip_date ON leads(is_valid, zip_code, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_category_date ON leads(is_valid, category, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_valid_status_date ON leads(is_valid, status, scraped_date)')
+
+
+def _create_fts_triggers(cursor):
+    """Mirror leads writes into leads_fts (re-run after any leads table rebuild)"""
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads BEGIN
+            INSERT INTO leads_fts (rowid, name, address, website, email)
+            VALUES (NEW.id, NEW.name, NEW.address, NEW.website, NEW.email);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, name, address, website, email)
+            VALUES ('delete', OLD.id, OLD.name, OLD.address, OLD.website, OLD.email);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS leads_fts_update AFTER UPDATE OF name, address, website, email ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, name, address, website, email)
+            VALUES ('delete', OLD.id, OLD.name, OLD.address, OLD.website, OLD.email);
+            INSERT INTO leads_fts (rowid, name, address, website, email)
+            VALUES (NEW.id, NEW.name, NEW.address, NEW.website, NEW.email);
+        END
+    ''')
+
+
+def _migration_leads_fts(cursor):
+    """FTS5 index over name/address/website/email, kept in sync by triggers"""
+    # External-content table: the text lives in leads, leads_fts only holds the index
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+            name, address, website, email,
+            content='leads', content_rowid='id',
+            tokenize='unicode61', prefix='2 3'
+        )
+    ''')
+    _create_fts_triggers(cursor)
+    cursor.execute("INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')")
+
+
+def _migration_dedupe_keys(cursor):
+    """phone_norm/name_key columns for format-insensitive duplicate checks"""
+    cursor.execute('ALTER TABLE leads ADD COLUMN phone_norm TEXT')
+    cursor.execute('ALTER TABLE leads ADD COLUMN name_key TEXT')
+    rows = cursor.execute('SELECT id, name, phone FROM leads').fetchall()
+    cursor.executemany(
+        'UPDATE leads SET phone_norm = ?, name_key = ? WHERE id = ?',
+        [(normalize_phone(phone), canonical_name(name), lead_id) for lead_id, name, phone in rows]
+    )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_phone_name ON leads(phone_norm, name_key)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_name_key ON leads(name_key)')
+
+
+# Columns shared by leads and leads_archive, in the order rows are copied
+# between them. A migration adding a leads column must add it to both.
+ARCHIVE_COLUMNS = ('id, business_hash, name, address, phone, email, website, zip_code, location, scraped_date, '
+                   'source_file, category, city, status, is_valid, phone_norm, name_key')
+
+
+def unarchive_leads(cursor, ids: str, status: str) -> int:
+    """Move the leads_archive rows with these ids (JSON array) back to leads with a new status"""
+    columns = ', '.join('?' if column == 'status' else column for column in ARCHIVE_COLUMNS.split(', '))
+    cursor.execute(f'''
+        INSERT INTO leads ({ARCHIVE_COLUMNS})
+        SELECT {columns} FROM leads_archive WHERE id IN (SELECT value FROM json_each(?))
+    ''', (status, ids))
+    moved = cursor.rowcount
+    if moved:
+        cursor.execute('DELETE FROM leads_archive WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+    return moved
+
+
+def _migration_leads_archive(cursor):
+    """Cold leads_archive table, its counter triggers and the all_leads view"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS leads_archive (
+            id INTEGER PRIMARY KEY,
+            business_hash TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            website TEXT,
+            zip_code TEXT,
+            location TEXT,
+            scraped_date TIMESTAMP,
+            source_file TEXT,
+            category TEXT,
+            city TEXT,
+            status TEXT NOT NULL DEFAULT 'Archived',
+            is_valid INTEGER NOT NULL DEFAULT 0,
+            phone_norm TEXT,
+            name_key TEXT,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_location ON leads_archive(location, zip_code)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_valid_date ON leads_archive(is_valid, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_valid_zip_date ON leads_archive(is_valid, zip_code, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_valid_category_date ON leads_archive(is_valid, category, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_valid_status_date ON leads_archive(is_valid, status, scraped_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_phone_name ON leads_archive(phone_norm, name_key)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_name_key ON leads_archive(name_key)')
+    _create_counter_triggers(cursor, 'leads_archive')
+    cursor.execute(f'''
+        CREATE VIEW IF NOT EXISTS all_leads AS
+        SELECT {ARCHIVE_COLUMNS} FROM leads
+        UNION ALL
+        SELECT {ARCHIVE_COLUMNS} FROM leads_archive
+    ''')
+
+
+def _migration_sequences(cursor):
+    """Counter rows for gap-free numbering, seeded from the existing combos"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sequences (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO sequences (name, value)
+        SELECT 'combo_lead_number', COALESCE(MAX(lead_number), 0) FROM scraped_combos
+    ''')
+
+
+# Next combo lead number, or no row if (zip_code, category) is already recorded.
+# The UPDATE takes the write lock before anything is read, so parallel
+# workers queue up here instead of racing on MAX(lead_number), and the
+# sequence only moves when a combo is actually added (no gaps).
+NEXT_COMBO_NUMBER_SQL = '''
+    UPDATE sequences SET value = value + 1
+    WHERE name = 'combo_lead_number'
+      AND NOT EXISTS (SELECT 1 FROM scraped_combos WHERE zip_code = ? AND category = ?)
+    RETURNING value
+'''
+
+
+def _create_event_triggers(cursor):
+    """Append a lead_events row for every change to leads (re-run after any leads table rebuild)"""
+    # A lead moving to or from leads_archive is logged as archive/unarchive:
+    # compact_archive() copies to the archive before deleting, unarchive
+    # inserts into leads before deleting the archive row
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS lead_events_insert AFTER INSERT ON leads BEGIN
+            INSERT INTO lead_events (lead_id, event)
+            SELECT NEW.id, CASE WHEN EXISTS (SELECT 1 FROM leads_archive WHERE id = NEW.id)
+                                THEN 'unarchive' ELSE 'insert' END;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS lead_events_delete AFTER DELETE ON leads BEGIN
+            INSERT INTO lead_events (lead_id, event)
+            SELECT OLD.id, CASE WHEN EXISTS (SELECT 1 FROM leads_archive WHERE id = OLD.id)
+                                THEN 'archive' ELSE 'delete' END;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS lead_events_status AFTER UPDATE OF status ON leads
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            INSERT INTO lead_events (lead_id, event) VALUES (NEW.id, 'status');
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS lead_events_update
+        AFTER UPDATE OF name, address, phone, email, website, zip_code, category, location ON leads
+        WHEN (OLD.name, OLD.address, OLD.phone, OLD.email, OLD.website, OLD.zip_code, OLD.category, OLD.location)
+             IS NOT (NEW.name, NEW.address, NEW.phone, NEW.email, NEW.website, NEW.zip_code, NEW.category, NEW.location)
+        BEGIN
+            INSERT INTO lead_events (lead_id, event) VALUES (NEW.id, 'update');
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS lead_events_archive_delete AFTER DELETE ON leads_archive
+        WHEN NOT EXISTS (SELECT 1 FROM leads WHERE id = OLD.id) BEGIN
+            INSERT INTO lead_events (lead_id, event) VALUES (OLD.id, 'delete');
+        END
+    ''')
+
+
+def _migration_lead_events(cursor):
+    """Append-only lead_events change feed, written by triggers"""
+    # AUTOINCREMENT: seq never goes backwards, even after old events are pruned
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lead_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_lead_events_created ON lead_events(created_at)')
+    _create_event_triggers(cursor)
+
+
+def _migration_status_breakdown_counters(cursor):
+    """Recreate the counter triggers with the zip_status/category_status dimensions"""
+    for table in ('leads', 'leads_archive'):
+        for event in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_counters_{event}')
+        _create_counter_triggers(cursor, table)
+    rebuild_lead_counters(cursor)
+
+
+# Ordered schema migrations: (version, description, function).
+# Append new steps at the end - never edit or renumber one that has shipped.
+# The desktop app (scraper-g1000-tauri/python-src/database.py) imports this list:
+# both apps open the same profile files.
+MIGRATIONS = [
+    (1, "base tables and indexes", _migration_base_schema),
+    (2, "category/city/status columns on legacy leads tables", _migration_unify_lead_columns),
+    (3, "status NOT NULL DEFAULT 'New' (table rebuild)", _migration_status_not_null),
+    (4, "is_valid flag and listing/dashboard indexes", _migration_is_valid_flag),
+    (5, "trigger-maintained lead_counters", _migration_lead_counters),
+    (6, "filtered listing indexes ending in scraped_date", _migration_listing_indexes),
+    (7, "leads_fts full-text index", _migration_leads_fts),
+    (8, "phone_norm/name_key dedupe columns", _migration_dedupe_keys),
+    (9, "leads_archive cold table and all_leads view", _migration_leads_archive),
+    (10, "sequences table for combo lead numbers", _migration_sequences),
+    (11, "lead_events change feed", _migration_lead_events),
+    (12, "per-ZIP/category status counters", _migration_status_breakdown_counters),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def business_hash(name: str, phone: str, address: str) -> str:
+    """Unique hash for a business based on name + phone + address"""
+    # Normalize the data (lowercase, strip whitespace)
+    normalized = f"{name.lower().strip()}|{phone.strip()}|{address.lower().strip()}"
+    return hashlib.md5(normalized.encode()).hexdigest()
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Highest migration applied to this database (0 for a new/legacy file)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def apply_migrations(manager: ConnectionManager, migrations: Optional[list] = None) -> int:
+    """
+    Apply pending migrations, each in its own transaction.
+    Safe to call from several processes at once: the version is re-read
+    after taking the write lock, so a step never runs twice.
+
+    Args:
+        manager: Connections for the database file
+        migrations: (version, description, function) steps; defaults to MIGRATIONS
+
+    Returns:
+        Number of migrations applied
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    if get_schema_version(manager.connection()) >= migrations[-1][0]:
+        return 0
+
+    applied = 0
+    for version, description, migrate in migrations:
+        with manager.transaction() as cursor:
+            if get_schema_version(manager.connection()) >= version:
+                continue
+            migrate(cursor)
+            cursor.execute(
+                'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                (version, description)
+            )
+            applied += 1
+    return applied
+
 
 class LeadsDatabase:
     """Persistent database for tracking scraped leads and preventing duplicates"""
@@ -12,87 +797,115 @@ class LeadsDatabase:
         self.db_path = db_path
         # Ensure the data directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self._init_database()
+        # Connections are shared per db file and per thread
+        self._db = get_connection_manager(db_path)
+        if not self._db.schema_ready:
+            self._init_database()
+            self._db.schema_ready = True
         # Initialize validator
-        self.validator = LeadValidator(db_path)
+        self.validator = LeadValidator(db_path, connection=self._db.reader)
 
-    def _init_database(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Table for tracking all scraped leads
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS leads (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                business_hash TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                address TEXT,
-                phone TEXT,
-                email TEXT,
-                website TEXT,
-                zip_code TEXT,
-                location TEXT,
-                scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                source_file TEXT,
-                status TEXT DEFAULT 'New'
-            )
-        ''')
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.connection()
 
-        # Table for tracking scraped zip+category combos (prevents re-scraping)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scraped_combos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                zip_code TEXT NOT NULL,
-                category TEXT NOT NULL,
-                scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                lead_number INTEGER NOT NULL,
-                UNIQUE(zip_code, category)
-            )
-        ''')
+    def transaction(self):
+        """
+        Group several writes into one transaction, e.g.:
 
-        # Index for fast duplicate checking
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_business_hash
-            ON leads(business_hash)
-        ''')
+            with db.transaction():
+                for lead in leads:
+                    db.add_lead(...)
+        """
+        return self._db.transaction()
 
-        # Index for searching by location/zip
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_location
-            ON leads(location, zip_code)
-        ''')
+    def close(self):
+        """Close this thread's connection (it is reopened on next use)"""
+        self._db.close()
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Point-in-time copy of this database for long reads (exports, reports).
 
-        conn.commit()
-        conn.close()
+        Queries on the snapshot see one consistent state and hold no read
+        transaction on the live file, so they neither wait for the scraper
+        nor keep WAL checkpoints from completing. The copy is deleted on exit:
+
+            with db.snapshot() as snap:
+                leads = snap.get_all_leads(include_archived=True)
+        """
+        fd, path = tempfile.mkstemp(prefix='leads_snapshot_', suffix='.db')
+        os.close(fd)
+        try:
+            backup_database(self.db_path, path)
+            yield LeadsDatabase(path)
+        finally:
+            release_connection_manager(path)
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def _init_database(self):
+        """Bring the database up to the current schema version"""
+        applied = apply_migrations(self._db)
+        if applied:
+            print(f"🗄️  Database schema migrated to v{SCHEMA_VERSION} ({applied} step(s)): {self.db_path}")
+
+    def get_schema_version(self) -> int:
+        """Return the schema version recorded in the database"""
+        return get_schema_version(self._conn())
 
     def _generate_hash(self, name: str, phone: str, address: str) -> str:
         """Generate a unique hash for a business based on name + phone + address"""
-        # Normalize the data (lowercase, strip whitespace)
-        normalized = f"{name.lower().strip()}|{phone.strip()}|{address.lower().strip()}"
-        return hashlib.md5(normalized.encode()).hexdigest()
+        return business_hash(name, phone, address)
 
     def is_duplicate(self, name: str, phone: str, address: str) -> bool:
         """Check if a business already exists in the database"""
         business_hash = self._generate_hash(name, phone, address)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Exact hash, or the same normalized phone + canonical name (hot or archived)
+        cursor = self._conn().execute('''
+            SELECT 1 FROM all_leads WHERE business_hash = ?
+            UNION ALL
+            SELECT 1 FROM all_leads WHERE phone_norm = ? AND name_key = ?
+            LIMIT 1
+        ''', (business_hash, normalize_phone(phone), canonical_name(name)))
+        return cursor.fetchone() is not None
 
-        cursor.execute(
-            'SELECT COUNT(*) FROM leads WHERE business_hash = ?',
-            (business_hash,)
-        )
-        count = cursor.fetchone()[0]
-        conn.close()
+    def find_existing_leads(self, leads: List[dict]) -> List[bool]:
+        """
+        Batched is_duplicate: one query checks every lead's hash and
+        phone_norm/name_key against the database.
+
+        Args:
+            leads: Records with name, phone_number (or phone) and address
 
-        return count > 0
+        Returns:
+            One flag per lead, True if it is already stored
+        """
+        if not leads:
+            return []
+        batch = []
+        for lead in leads:
+            name = lead.get('name') or ''
+            phone = lead.get('phone_number') or lead.get('phone') or ''
+            address = lead.get('address') or ''
+            batch.append([self._generate_hash(name, phone, address), normalize_phone(phone), canonical_name(name)])
+
+        cursor = self._conn().execute('''
+            SELECT CAST(batch.key AS INTEGER) FROM json_each(?) AS batch
+            WHERE EXISTS (SELECT 1 FROM all_leads WHERE business_hash = json_extract(batch.value, '$[0]'))
+               OR EXISTS (SELECT 1 FROM all_leads WHERE phone_norm = json_extract(batch.value, '$[1]')
+                                                    AND name_key = json_extract(batch.value, '$[2]'))
+        ''', (json.dumps(batch),))
+        found = {row[0] for row in cursor}
+        return [i in found for i in range(len(batch))]
 
     def add_lead(self, name: str, address: str, phone: str,
                  email: Optional[str] = None, website: Optional[str] = None,
                  zip_code: Optional[str] = None, category: Optional[str] = None,
                  location: Optional[str] = None, source_file: Optional[str] = None,
-                 skip_validation: bool = False) -> Tuple[bool, Optional[str]]:
+                 skip_validation: bool = False, city: Optional[str] = None) -> Tuple[bool, Optional[str]]:
         """
         Add a lead to the database if it doesn't already exist
         Returns (success, reason) - reason is populated if validation fails
@@ -112,35 +925,136 @@ class LeadsDatabase:
 
         business_hash = self._generate_hash(name, phone, address)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._db.transaction() as cursor:
+            try:
+                cursor.execute(INSERT_LEAD_SQL.format(conflict=''), lead_insert_params(
+                    business_hash, name, address, phone, email, website,
+                    zip_code, category, location, source_file, city
+                ))
+            except sqlite3.IntegrityError:
+                # Duplicate entry (only this statement is undone, an outer transaction stays intact)
+                return False, "Duplicate entry"
+            if cursor.rowcount == 0:
+                # Same business with a differently formatted phone/name
+                return False, "Duplicate entry"
+        return True, None
 
-        # Check if category column exists, if not add it
-        cursor.execute("PRAGMA table_info(leads)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'category' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN category TEXT')
-            conn.commit()
+    def add_leads_bulk(self, leads: List[dict], zip_code: Optional[str] = None,
+                       category: Optional[str] = None, location: Optional[str] = None,
+                       source_file: Optional[str] = None, skip_validation: bool = False,
+                       city: Optional[str] = None) -> Dict[str, int]:
+        """
+        Insert many scraped leads in a single transaction.
 
-        try:
-            cursor.execute('''
-                INSERT INTO leads
-                (business_hash, name, address, phone, email, website, zip_code, category, location, source_file)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (business_hash, name, address, phone, email, website, zip_code, category, location, source_file))
+        Args:
+            leads: Scraper records (name, phone_number or phone, address, email, website).
+                A record's own zip_code/category/city take precedence over the defaults.
+            zip_code, category, location, source_file, city: Defaults for every lead
+            skip_validation: Insert without running the lead validator
 
-            conn.commit()
-            conn.close()
-            return True, None
-        except sqlite3.IntegrityError:
-            # Duplicate entry
-            conn.close()
-            return False, "Duplicate entry"
+        Returns:
+            Dict with 'inserted', 'duplicates' (already stored or repeated in the batch)
+            and 'invalid' (rejected by validation) counts
+        """
+        rows = []
+        invalid = 0
+
+        for lead in leads:
+            name = lead.get('name') or ''
+            phone = lead.get('phone_number') or lead.get('phone') or ''
+            address = lead.get('address') or ''
+            email = lead.get('email')
+            website = lead.get('website')
+
+            if not skip_validation:
+                is_valid, _ = self.validator.is_valid_lead({
+                    'name': name,
+                    'phone': phone,
+                    'email': email,
+                    'website': website,
+                    'address': address
+                }, strict=False)
+                if not is_valid:
+                    invalid += 1
+                    continue
+
+            rows.append(lead_insert_params(
+                self._generate_hash(name, phone, address), name, address, phone, email, website,
+                lead.get('zip_code') or zip_code, lead.get('category') or category,
+                location, source_file, lead.get('city') or city
+            ))
+
+        inserted = 0
+        if rows:
+            with self._db.transaction() as cursor:
+                # OR IGNORE: duplicates are skipped by the business_hash UNIQUE index,
+                # reformatted duplicates by the phone_norm/name_key check
+                cursor.executemany(INSERT_LEAD_SQL.format(conflict='OR IGNORE'), rows)
+                inserted = max(cursor.rowcount, 0)
+
+        return {
+            'inserted': inserted,
+            'duplicates': len(rows) - inserted,
+            'invalid': invalid
+        }
+
+    def add_new_leads(self, leads: List[dict], location: Optional[str] = None,
+                      source_file: Optional[str] = None) -> Tuple[List[dict], int, int]:
+        """
+        Drop repeats and already stored businesses from a scraped page, then store the rest.
+        Leads without a name or phone number are skipped.
+
+        Args:
+            leads: Scraper records (name, phone_number, address, email, website)
+            location, source_file: Passed through to add_leads_bulk
+
+        Returns:
+            (new_leads, batch_duplicates, db_duplicates); new_leads are the original records
+        """
+        candidates = []
+        batch_dupes = 0
+        seen_hashes = set()
+        seen_keys = set()
+
+        for lead in leads:
+            if not lead.get('name') or not lead.get('phone_number'):
+                continue
+
+            name = lead['name'].strip()
+            phone = lead['phone_number'].strip()
+            address = (lead.get('address') or '').strip()
+
+            # Same rule as the database: same hash, or same normalized phone + canonical name
+            business_hash = self._generate_hash(name, phone, address)
+            key = (normalize_phone(phone), canonical_name(name))
+            if business_hash in seen_hashes or key in seen_keys:
+                batch_dupes += 1
+                continue
+            seen_hashes.add(business_hash)
+            seen_keys.add(key)
+
+            candidates.append((lead, {
+                **lead,
+                'name': name,
+                'phone_number': phone,
+                'address': address,
+                'email': lead.get('email', 'N/A'),
+                'website': lead.get('website', 'N/A'),
+            }))
+
+        # Check database duplicates for the whole page in one query
+        existing = self.find_existing_leads([record for _, record in candidates])
+        new_leads = [lead for (lead, _), is_known in zip(candidates, existing) if not is_known]
+        new_records = [record for (_, record), is_known in zip(candidates, existing) if not is_known]
+
+        # Add to database in one transaction
+        self.add_leads_bulk(new_records, location=location, source_file=source_file)
+
+        return new_leads, batch_dupes, len(candidates) - len(new_leads)
 
     def get_leads_by_location(self, location: str, zip_code: Optional[str] = None):
         """Retrieve all leads for a specific location"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn().cursor()
 
         if zip_code:
             cursor.execute(
@@ -153,68 +1067,189 @@ class LeadsDatabase:
                 (location,)
             )
 
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return cursor.fetchall()
 
-    def get_all_leads(self, valid_only=True):
-        """Retrieve leads from database, optionally filtering out junk"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Ensure status column exists
-        cursor.execute("PRAGMA table_info(leads)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'status' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN status TEXT DEFAULT "New"')
-            conn.commit()
-
-        # Set all NULL statuses to 'New'
-        cursor.execute('UPDATE leads SET status = "New" WHERE status IS NULL')
-        conn.commit()
+    def get_all_leads(self, valid_only=True, include_archived=False):
+        """Retrieve leads from database, optionally filtering out junk and/or adding archived leads"""
+        # Pure read - status is NOT NULL since schema v3
+        cursor = self._db.reader().cursor()
+        source = 'all_leads' if include_archived else 'leads'
 
         if valid_only:
-            # Filter out junk leads (no phone, or name contains junk patterns)
-            cursor.execute('''
-                SELECT id, name, phone, address, website, email, category, zip_code, COALESCE(status, 'New') as status, location
-                FROM leads
-                WHERE phone NOT IN ("N/A", "")
-                AND phone IS NOT NULL
-                AND name NOT LIKE "%![%"
-                AND name NOT LIKE "%[Website%"
-                AND name NOT LIKE "%About Search%"
-                AND name NOT LIKE "%[Next]%"
+            # Filter out junk leads (flag computed at insert, see lead_is_valid)
+            cursor.execute(f'''
+                SELECT id, name, phone, address, website, email, category, zip_code, status, location
+                FROM {source}
+                WHERE is_valid = 1
                 ORDER BY scraped_date DESC
             ''')
         else:
-            cursor.execute('SELECT id, name, phone, address, website, email, category, zip_code, COALESCE(status, \'New\') as status, location FROM leads ORDER BY scraped_date DESC')
+            cursor.execute(f'SELECT id, name, phone, address, website, email, category, zip_code, status, location FROM {source} ORDER BY scraped_date DESC')
 
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return cursor.fetchall()
+
+    def query_leads(self, filters: Optional[Dict[str, str]] = None, sort: str = 'newest',
+                    after_cursor: Optional[str] = None, limit: Optional[int] = 100,
+                    valid_only: bool = True, include_archived: bool = False) -> Tuple[list, Optional[str]]:
+        """
+        One page of leads, filtered and sorted in SQL (keyset pagination).
+        Only the hot leads table is read unless include_archived is set or
+        the status filter is 'Archived'.
+
+        Args:
+            filters: Exact matches on zip_code, category, status and/or city
+            sort: 'newest' or 'oldest' by scraped_date (ties broken by id)
+            after_cursor: next_cursor from the previous page, None for the first page
+            limit: Page size; None returns every matching lead
+            valid_only: Skip junk leads (see lead_is_valid)
+            include_archived: Also read leads_archive
+
+        Returns:
+            Tuple[list, Optional[str]]:
+                - Rows in get_all_leads column order, plus scraped_date.
+                - Cursor for the next page, or None on the last page.
+        """
+        if sort not in LEAD_SORTS:
+            raise ValueError(f"Unknown sort {sort!r} (expected one of {', '.join(LEAD_SORTS)})")
+        direction = LEAD_SORTS[sort]
+
+        clauses, params = self._filter_clauses(filters, valid_only)
+        if after_cursor:
+            clauses.append(f"(scraped_date, id) {'<' if direction == 'DESC' else '>'} (?, ?)")
+            params.extend(decode_lead_cursor(after_cursor))
+
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        sql = f'SELECT {LEAD_LIST_COLUMNS} FROM leads{where}'
+        if include_archived or (filters or {}).get('status') == 'Archived':
+            # Compound SELECT rather than the all_leads view: SQLite merges the
+            # two index-ordered halves instead of sorting the union
+            sql += f' UNION ALL SELECT {LEAD_LIST_COLUMNS} FROM leads_archive{where}'
+            params = params * 2
+        sql += f' ORDER BY scraped_date {direction}, id {direction}'
+        if limit is not None:
+            # One extra row tells us whether there is a next page
+            sql += ' LIMIT ?'
+            params.append(limit + 1)
+
+        rows = self._db.reader().execute(sql, params).fetchall()
+        if limit is None or len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_lead_cursor(rows[-1][10], rows[-1][0])
+
+    def search_leads(self, query: str, filters: Optional[Dict[str, str]] = None,
+                     limit: int = 50, valid_only: bool = True) -> list:
+        """
+        Full-text search over name, address, website and email.
+
+        Args:
+            query: Free text; each word matches as a prefix ("vet tam" finds "Tampa Vets")
+            filters: Same exact-match filters as query_leads
+            limit: Max results
+            valid_only: Skip junk leads (see lead_is_valid)
+
+        Returns:
+            Rows in query_leads column order, best match first
+        """
+        match = build_fts_query(query)
+        if not match:
+            return []
+
+        clauses, params = self._filter_clauses(filters, valid_only, table='l')
+        sql = f'''
+            SELECT {', '.join('l.' + c for c in LEAD_LIST_COLUMNS.split(', '))}
+            FROM leads_fts JOIN leads l ON l.id = leads_fts.rowid
+            WHERE leads_fts MATCH ?{''.join(' AND ' + c for c in clauses)}
+            ORDER BY {SEARCH_RANK}
+            LIMIT ?
+        '''
+        return self._db.reader().execute(sql, [match] + params + [limit]).fetchall()
+
+    @staticmethod
+    def _filter_clauses(filters: Optional[Dict[str, str]], valid_only: bool,
+                        table: str = '') -> Tuple[List[str], list]:
+        """WHERE clauses and parameters for the query_leads/search_leads filters"""
+        prefix = f'{table}.' if table else ''
+        clauses, params = [], []
+        if valid_only:
+            clauses.append(f'{prefix}is_valid = 1')
+        for key, value in (filters or {}).items():
+            if key not in LEAD_FILTER_COLUMNS:
+                raise ValueError(f"Unknown lead filter {key!r}")
+            if value:
+                clauses.append(f'{prefix}{LEAD_FILTER_COLUMNS[key]} = ?')
+                params.append(value)
+        return clauses, params
+
+    def get_change_seq(self) -> int:
+        """Sequence number of the latest lead_events row (0 if none)"""
+        return self._db.reader().execute('SELECT COALESCE(MAX(seq), 0) FROM lead_events').fetchone()[0]
+
+    def get_lead_changes(self, since: int = 0, limit: int = 500) -> dict:
+        """
+        Lead changes after sequence number `since` (see lead_events).
+
+        Args:
+            since: Last seq the caller has seen (get_change_seq() when it loaded the list)
+            limit: Max events per call
+
+        Returns:
+            Dict with:
+                - events: (seq, lead_id, event, created_at) in seq order; event is
+                  insert, status, update, delete, archive or unarchive
+                - leads: Current rows (query_leads columns) of the leads the
+                  events touch that still exist, archived ones included
+                - last_seq: Pass as `since` on the next call
+                - has_more: More events are waiting
+                - reset: Events after `since` were pruned; reload the full list
+        """
+        reader = self._db.reader()
+        oldest = reader.execute('SELECT MIN(seq) FROM lead_events').fetchone()[0]
+        events = reader.execute(
+            'SELECT seq, lead_id, event, created_at FROM lead_events WHERE seq > ? ORDER BY seq LIMIT ?',
+            (since, limit + 1)
+        ).fetchall()
+        has_more = len(events) > limit
+        events = events[:limit]
+
+        ids = json.dumps(sorted({event[1] for event in events}))
+        leads = reader.execute(f'''
+            SELECT {LEAD_LIST_COLUMNS} FROM leads WHERE id IN (SELECT value FROM json_each(?))
+            UNION ALL
+            SELECT {LEAD_LIST_COLUMNS} FROM leads_archive WHERE id IN (SELECT value FROM json_each(?))
+        ''', (ids, ids)).fetchall() if events else []
+
+        return {
+            'events': events,
+            'leads': leads,
+            'last_seq': events[-1][0] if events else since,
+            'has_more': has_more,
+            'reset': oldest is not None and since < oldest - 1,
+        }
 
     def get_total_leads(self) -> int:
         """Get total number of unique leads in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM leads')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self._counter('all')
+
+    def get_valid_lead_count(self) -> int:
+        """Number of leads that pass the listing filter (see lead_is_valid)"""
+        return self._counter('valid')
+
+    def _counter(self, dimension: str, value: str = '') -> int:
+        row = self._db.reader().execute(
+            'SELECT count FROM lead_counters WHERE dimension = ? AND value = ?', (dimension, value)
+        ).fetchone()
+        return row[0] if row else 0
 
     def is_combo_scraped(self, zip_code: str, category: str):
         """Check if a zip+category combo has already been scraped
         Returns (is_scraped, scraped_date, lead_number) tuple
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        cursor = self._conn().execute(
             'SELECT scraped_date, lead_number FROM scraped_combos WHERE zip_code = ? AND category = ?',
             (zip_code, category)
         )
         result = cursor.fetchone()
-        conn.close()
 
         if result:
             return (True, result[0], result[1])
@@ -222,101 +1257,271 @@ class LeadsDatabase:
 
     def mark_combo_scraped(self, zip_code: str, category: str) -> int:
         """Mark a zip+category combo as scraped and return its lead number"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._db.transaction() as cursor:
+            row = cursor.execute(NEXT_COMBO_NUMBER_SQL, (zip_code, category)).fetchone()
+            if row is None:
+                # Already exists, get existing number
+                cursor.execute(
+                    'SELECT lead_number FROM scraped_combos WHERE zip_code = ? AND category = ?',
+                    (zip_code, category)
+                )
+                return cursor.fetchone()[0]
 
-        # Get the next lead number
-        cursor.execute('SELECT MAX(lead_number) FROM scraped_combos')
-        max_lead = cursor.fetchone()[0]
-        next_lead_number = (max_lead or 0) + 1
-
-        try:
             cursor.execute('''
                 INSERT INTO scraped_combos (zip_code, category, lead_number)
                 VALUES (?, ?, ?)
-            ''', (zip_code, category, next_lead_number))
-            conn.commit()
-            conn.close()
-            return next_lead_number
-        except sqlite3.IntegrityError:
-            # Already exists, get existing number
-            cursor.execute(
-                'SELECT lead_number FROM scraped_combos WHERE zip_code = ? AND category = ?',
-                (zip_code, category)
-            )
-            lead_number = cursor.fetchone()[0]
-            conn.close()
-            return lead_number
+                ON CONFLICT(zip_code, category) DO NOTHING
+            ''', (zip_code, category, row[0]))
+            return row[0]
 
     def update_lead_status(self, lead_id, status):
         """Update the status of a lead"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE leads SET status = ? WHERE id = ?', (status, lead_id))
-        conn.commit()
-        conn.close()
+        self.update_lead_status_bulk([lead_id], status)
+
+    def update_lead_status_bulk(self, lead_ids: List[int], status: str) -> int:
+        """
+        Set the status of many leads in one transaction. Archived leads that
+        get any other status are moved back from leads_archive (unarchive).
+
+        Args:
+            lead_ids: Lead ids (unknown ids are ignored)
+            status: New status
+
+        Returns:
+            Number of leads updated
+        """
+        if not lead_ids:
+            return 0
+        ids = json.dumps([int(lead_id) for lead_id in lead_ids])
+        with self._db.transaction() as cursor:
+            cursor.execute('UPDATE leads SET status = ? WHERE id IN (SELECT value FROM json_each(?))', (status, ids))
+            updated = cursor.rowcount
+            if status == 'Archived':
+                cursor.execute(
+                    'UPDATE leads_archive SET status = ? WHERE id IN (SELECT value FROM json_each(?))', (status, ids)
+                )
+                return updated + cursor.rowcount
+            return updated + unarchive_leads(cursor, ids, status)
+
+    def compact_archive(self, older_than_days: Optional[int] = ARCHIVE_AFTER_DAYS, batch_size: int = 500) -> int:
+        """
+        Move cold leads from leads to leads_archive so listing queries stay small.
+
+        Args:
+            older_than_days: Also move leads scraped more than this many days ago,
+                whatever their status (None = only leads marked Archived)
+            batch_size: Leads moved per transaction, so writers are never blocked long
+
+        Returns:
+            Number of leads moved
+        """
+        # is_valid IN (0, 1) lets both lookups use the (is_valid, ...) indexes
+        selectors = [("SELECT id FROM leads WHERE is_valid IN (0, 1) AND status = 'Archived' LIMIT ?", ())]
+        if older_than_days:
+            selectors.append((
+                "SELECT id FROM leads WHERE is_valid IN (0, 1) AND scraped_date < datetime('now', ?) LIMIT ?",
+                (f'-{int(older_than_days)} days',)
+            ))
+
+        moved = 0
+        for select, params in selectors:
+            while True:
+                with self._db.transaction() as cursor:
+                    ids = json.dumps([row[0] for row in cursor.execute(select, params + (batch_size,))])
+                    cursor.execute(f'''
+                        INSERT INTO leads_archive ({ARCHIVE_COLUMNS})
+                        SELECT {ARCHIVE_COLUMNS} FROM leads WHERE id IN (SELECT value FROM json_each(?))
+                    ''', (ids,))
+                    count = cursor.rowcount
+                    cursor.execute('DELETE FROM leads WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+                moved += count
+                if count < batch_size:
+                    break
+        return moved
+
+    def get_archive_count(self) -> int:
+        """Number of leads in leads_archive"""
+        return self._db.reader().execute('SELECT COUNT(*) FROM leads_archive').fetchone()[0]
 
     def get_dashboard_stats(self):
-        """Get comprehensive stats for dashboard cards"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Ensure status column exists
-        cursor.execute("PRAGMA table_info(leads)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'status' not in columns:
-            cursor.execute('ALTER TABLE leads ADD COLUMN status TEXT DEFAULT "New"')
-            conn.commit()
+        """
+        Get comprehensive stats for dashboard cards (from lead_counters, constant time).
+        zip_status/category_status map each ZIP/category to its per-status counts
+        and zip_cities names the city of each ZIP in by_zip.
+        """
+        reader = self._db.reader()
+        cursor = reader.execute('SELECT dimension, value, count FROM lead_counters WHERE count > 0 ORDER BY count DESC')
 
-        # Set all NULL statuses to 'New'
-        cursor.execute('UPDATE leads SET status = "New" WHERE status IS NULL')
-        conn.commit()
+        counters = {'valid': [], 'zip': [], 'category': [], 'status': [], 'zip_status': [], 'category_status': []}
+        for dimension, value, count in cursor.fetchall():
+            if dimension in counters:
+                counters[dimension].append((value, count))
 
-        # Total valid leads
-        cursor.execute('''
-            SELECT COUNT(*) FROM leads
-            WHERE phone NOT IN ("N/A", "") AND phone IS NOT NULL
-        ''')
-        total = cursor.fetchone()[0]
-
-        # By ZIP
-        cursor.execute('''
-            SELECT zip_code, COUNT(*) as count
-            FROM leads
-            WHERE zip_code IS NOT NULL AND phone NOT IN ("N/A", "") AND phone IS NOT NULL
-            GROUP BY zip_code
-            ORDER BY count DESC
-        ''')
-        by_zip = cursor.fetchall()
-
-        # By Category
-        cursor.execute('''
-            SELECT category, COUNT(*) as count
-            FROM leads
-            WHERE category IS NOT NULL AND phone NOT IN ("N/A", "") AND phone IS NOT NULL
-            GROUP BY category
-            ORDER BY count DESC
-        ''')
-        by_category = cursor.fetchall()
-
-        # By Status - use COALESCE to treat NULL as 'New'
-        cursor.execute('''
-            SELECT COALESCE(status, 'New') as status, COUNT(*) as count
-            FROM leads
-            WHERE phone NOT IN ("N/A", "") AND phone IS NOT NULL
-            GROUP BY COALESCE(status, 'New')
-        ''')
-        by_status = cursor.fetchall()
+        total = counters['valid'][0][1] if counters['valid'] else 0
+        by_status = counters['status']
+
+        breakdowns = {'zip_status': {}, 'category_status': {}}
+        for dimension, breakdown in breakdowns.items():
+            for value, count in counters[dimension]:
+                key, status = value.rsplit('|', 1)
+                breakdown.setdefault(key, {})[status] = count
 
-        conn.close()
+        # One indexed probe per ZIP card
+        zips = json.dumps([zip_code for zip_code, _ in counters['zip']])
+        zip_cities = dict(reader.execute('''
+            SELECT zips.value, (SELECT location FROM leads
+                                WHERE is_valid = 1 AND zip_code = zips.value AND location IS NOT NULL LIMIT 1)
+            FROM json_each(?) AS zips
+        ''', (zips,)).fetchall())
 
         return {
             'total': total,
-            'by_zip': by_zip,
-            'by_category': by_category,
-            'by_status': dict(by_status) if by_status else {'New': total}
+            'by_zip': counters['zip'],
+            'by_category': counters['category'],
+            'by_status': dict(by_status) if by_status else {'New': total},
+            'zip_status': breakdowns['zip_status'],
+            'category_status': breakdowns['category_status'],
+            'zip_cities': {zip_code: city for zip_code, city in zip_cities.items() if city}
+        }
+
+    def get_lead_cities(self) -> List[str]:
+        """Distinct cities (location) of the hot leads, for filter suggestions"""
+        cursor = self._db.reader().execute(
+            'SELECT DISTINCT location FROM leads WHERE location IS NOT NULL ORDER BY location'
+        )
+        return [row[0] for row in cursor]
+
+    def check_counters(self, repair: bool = False) -> List[Tuple[str, str, int, int]]:
+        """
+        Verify lead_counters against the leads table.
+
+        Args:
+            repair: Rebuild the counters when they disagree
+
+        Returns:
+            Mismatches as (dimension, value, stored, actual); empty if consistent
+        """
+        with self.transaction() as cursor:
+            mismatches = check_lead_counters(cursor)
+            if mismatches and repair:
+                rebuild_lead_counters(cursor)
+        return mismatches
+
+    def file_size(self) -> int:
+        """Bytes on disk for the database file plus its WAL"""
+        return sum(os.path.getsize(self.db_path + suffix)
+                   for suffix in ('', '-wal') if os.path.exists(self.db_path + suffix))
+
+    def maintain(self, vacuum: bool = True, analyze: bool = True, quick: bool = False) -> dict:
+        """
+        Routine upkeep; run it while no scrape is writing to this database.
+        Also prunes lead_events older than LEAD_EVENTS_RETENTION_DAYS.
+
+        Args:
+            vacuum: Return free pages to the OS (incremental vacuum; the first
+                run on a file created before auto_vacuum=INCREMENTAL does a full VACUUM)
+            analyze: Refresh planner statistics (ANALYZE + PRAGMA optimize)
+            quick: PRAGMA quick_check instead of the full integrity_check
+
+        Returns:
+            Dict with size_before/size_after (bytes), freed_pages, integrity
+            (list of problems, empty when healthy), counter_mismatches and
+            the steps that ran
+        """
+        conn = self._conn()
+        size_before = self.file_size()
+        steps = []
+
+        check = 'quick_check' if quick else 'integrity_check'
+        integrity = [row[0] for row in conn.execute(f'PRAGMA {check}')]
+        integrity = [] if integrity == ['ok'] else integrity
+        steps.append(check)
+        with self.transaction() as cursor:
+            try:
+                cursor.execute("INSERT INTO leads_fts(leads_fts) VALUES ('integrity-check')")
+            except sqlite3.DatabaseError as e:
+                integrity.append(f"leads_fts: {e} (rebuild with INSERT INTO leads_fts(leads_fts) VALUES ('rebuild'))")
+            counter_mismatches = check_lead_counters(cursor)
+            cursor.execute(
+                "DELETE FROM lead_events WHERE created_at < datetime('now', ?)",
+                (f'-{LEAD_EVENTS_RETENTION_DAYS} days',)
+            )
+        steps += ['fts integrity-check', 'counters', 'prune lead_events']
+
+        freed_pages = 0
+        if vacuum:
+            pages_before = conn.execute('PRAGMA page_count').fetchone()[0]
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                # Switching to incremental needs one full rebuild
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.execute('VACUUM')
+                steps.append('vacuum (converted to auto_vacuum=INCREMENTAL)')
+            else:
+                # executescript steps the pragma to completion; execute() frees one page
+                conn.executescript('PRAGMA incremental_vacuum')
+                steps.append('incremental_vacuum')
+            freed_pages = pages_before - conn.execute('PRAGMA page_count').fetchone()[0]
+
+        if analyze:
+            conn.execute('ANALYZE')
+            conn.execute('PRAGMA optimize')
+            steps += ['analyze', 'optimize']
+
+        # Fold the WAL back into the file so the sizes reflect the result
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        return {
+            'size_before': size_before,
+            'size_after': self.file_size(),
+            'freed_pages': freed_pages,
+            'integrity': integrity,
+            'counter_mismatches': counter_mismatches,
+            'steps': steps,
         }
 
     def get_stats(self):
         """Get statistics about the database (legacy method)"""
         return self.get_dashboard_stats()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lead database utilities")
+    parser.add_argument('db_path', help='Path to a leads database')
+    parser.add_argument('--check-counters', action='store_true', help='Compare lead_counters with the leads table')
+    parser.add_argument('--repair', action='store_true', help='Rebuild lead_counters if they disagree')
+    parser.add_argument('--compact', action='store_true', help='Move Archived leads to leads_archive')
+    parser.add_argument('--maintain', action='store_true',
+                        help='Integrity check, incremental vacuum and ANALYZE (run while no scrape is active)')
+    parser.add_argument('--quick', action='store_true', help='With --maintain, quick_check instead of integrity_check')
+    parser.add_argument('--older-than-days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help='With --compact, also archive leads scraped more than N days ago')
+    args = parser.parse_args()
+
+    db = LeadsDatabase(args.db_path)
+    print(f"📊 {args.db_path}: schema v{db.get_schema_version()}, {db.get_total_leads():,} leads")
+    if args.compact:
+        moved = db.compact_archive(older_than_days=args.older_than_days)
+        print(f"   🧊 Moved {moved:,} lead(s) to leads_archive ({db.get_archive_count():,} archived)")
+    if args.maintain:
+        report = db.maintain(quick=args.quick)
+        print(f"   🧹 {', '.join(report['steps'])}")
+        print(f"   💾 {report['size_before'] / 1e6:.1f} MB -> {report['size_after'] / 1e6:.1f} MB "
+              f"({report['freed_pages']:,} free page(s) released)")
+        for problem in report['integrity']:
+            print(f"   ❌ {problem}")
+        if report['counter_mismatches']:
+            print(f"   ❌ {len(report['counter_mismatches'])} lead_counters mismatch(es), run --repair")
+        if report['integrity'] or report['counter_mismatches']:
+            raise SystemExit(1)
+        print("   ✅ Integrity OK")
+    if args.check_counters or args.repair:
+        mismatches = db.check_counters(repair=args.repair)
+        for dimension, value, stored, actual in mismatches:
+            print(f"   ❌ {dimension}={value!r}: stored {stored}, actual {actual}")
+        if not mismatches:
+            print("   ✅ lead_counters consistent")
+        elif args.repair:
+            print(f"   🔧 Rebuilt lead_counters ({len(mismatches)} mismatch(es) fixed)")
+        else:
+            raise SystemExit(1)
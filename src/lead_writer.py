@@ -0,0 +1,274 @@
+"""
+Write-behind queue for scraped leads.
+
+Scrape jobs hand their leads to a per-database writer thread and go on
+fetching. The writer drains the queue, coalesces whatever has piled up
+into one transaction (when the database supports nested transactions)
+and resolves a ticket per submission, so a job can still wait for
+durability where it matters (e.g. at the end of a combo):
+
+    writer = get_lead_writer(db)
+    ticket = writer.submit(leads, zip_code=zip_code, category=category)
+    ...keep scraping...
+    result = ticket.wait()        # {'inserted': n, 'duplicates': n, ...}
+    writer.flush()                # everything submitted so far is committed
+
+The desktop app (scraper-g1000-tauri) imports this module as well.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Max submissions waiting for the writer; submit() blocks when full (backpressure)
+WRITE_QUEUE_SIZE = int(os.getenv("LEAD_WRITE_QUEUE_SIZE", "64"))
+# Max leads committed in one transaction
+WRITE_BATCH_LEADS = int(os.getenv("LEAD_WRITE_BATCH_LEADS", "2000"))
+# How long the writer waits for more submissions before committing a batch
+WRITE_LINGER_SECONDS = float(os.getenv("LEAD_WRITE_LINGER_MS", "50")) / 1000
+
+
+class WriteTicket:
+    """Handle for one submit(); resolved once its leads are committed"""
+
+    def __init__(self, leads: List[dict], defaults: dict, callback: Optional[Callable] = None):
+        self.leads = leads
+        self.defaults = defaults
+        self.callback = callback
+        self.result: Optional[Dict[str, int]] = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict[str, int]]:
+        """
+        Block until the leads are committed.
+
+        Returns:
+            The add_leads_bulk result, or None on timeout. Re-raises the
+            writer's exception if the batch failed.
+        """
+        if not self._done.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _resolve(self, result: Optional[Dict[str, int]] = None, error: Optional[BaseException] = None):
+        self.result, self.error = result, error
+        self._done.set()
+        if self.callback is not None:
+            try:
+                self.callback(self)
+            except Exception as e:
+                print(f"[WRITER] ⚠️  Ticket callback failed: {e}")
+
+
+class LeadWriter:
+    """One background writer thread feeding a LeadsDatabase from a bounded queue"""
+
+    def __init__(self, db, queue_size: int = WRITE_QUEUE_SIZE, batch_leads: int = WRITE_BATCH_LEADS,
+                 linger: float = WRITE_LINGER_SECONDS):
+        self.db = db
+        self.batch_leads = batch_leads
+        self.linger = linger
+        self._queue: "queue.Queue[Optional[WriteTicket]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pending_leads = 0
+        self._latencies = deque(maxlen=200)  # seconds per committed batch
+        self._stats = {'submitted': 0, 'batches': 0, 'leads_written': 0, 'inserted': 0, 'errors': 0}
+        self._thread = threading.Thread(target=self._run, name=f"lead-writer:{db.db_path}", daemon=True)
+        self._thread.start()
+
+    def submit(self, leads: List[dict], callback: Optional[Callable[[WriteTicket], None]] = None,
+               timeout: Optional[float] = None, **defaults) -> WriteTicket:
+        """
+        Queue leads for writing and return immediately.
+
+        Args:
+            leads: Records for add_leads_bulk
+            callback: Called with the ticket on the writer thread once committed
+            timeout: Max seconds to block when the queue is full (None = wait)
+            **defaults: add_leads_bulk keyword arguments (zip_code, category, ...)
+
+        Returns:
+            WriteTicket to wait on
+        """
+        if self._closed:
+            raise RuntimeError("LeadWriter is closed")
+        ticket = WriteTicket(list(leads), defaults, callback)
+        # Counted before the put: the writer may commit (and subtract) the ticket right away
+        with self._lock:
+            self._pending_leads += len(ticket.leads)
+        try:
+            self._queue.put(ticket, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending_leads -= len(ticket.leads)
+            raise
+        if ticket.leads:
+            with self._lock:
+                self._stats['submitted'] += 1
+        return ticket
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything submitted before this call is committed"""
+        if self._closed:
+            return True
+        # The queue is FIFO, so an empty marker resolves after all earlier work
+        marker = self.submit([], timeout=timeout)
+        return marker._done.wait(timeout)
+
+    def metrics(self) -> dict:
+        """Queue depth and commit latency for status endpoints"""
+        with self._lock:
+            last = self._latencies[-1] if self._latencies else 0.0
+            latencies = sorted(self._latencies)
+            stats = dict(self._stats)
+            pending = self._pending_leads
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1) if latencies else 0.0
+
+        return {
+            **stats,
+            'queue_depth': self._queue.qsize(),
+            'pending_leads': pending,
+            'commit_ms_last': round(last * 1000, 1),
+            'commit_ms_p50': pct(0.5),
+            'commit_ms_p95': pct(0.95),
+        }
+
+    def close(self, timeout: Optional[float] = None):
+        """Drain the queue and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> List[Optional[WriteTicket]]:
+        """Block for one submission, then gather more for up to `linger` seconds"""
+        batch = [self._queue.get()]
+        size = len(batch[0].leads) if batch[0] else 0
+        deadline = time.monotonic() + self.linger
+        while batch[-1] is not None and size < self.batch_leads:
+            remaining = deadline - time.monotonic()
+            try:
+                ticket = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(ticket)
+            size += len(ticket.leads) if ticket else 0
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            tickets = [t for t in batch if t is not None]
+            if tickets:
+                self._commit(tickets)
+            if len(tickets) < len(batch):
+                return  # close() sentinel
+
+    def _commit(self, tickets: List[WriteTicket]):
+        started = time.perf_counter()
+        # Root LeadsDatabase nests add_leads_bulk inside one outer transaction;
+        # databases without transaction() commit each submission on its own
+        transaction = getattr(self.db, 'transaction', None)
+        if transaction is None:
+            outcomes = [self._write(ticket) for ticket in tickets]
+        else:
+            try:
+                with transaction() as cursor:
+                    outcomes = [self._write_savepoint(cursor, ticket) for ticket in tickets]
+            except Exception as e:
+                # Only the COMMIT itself can get here; nothing in the batch was written
+                outcomes = [(None, e)] * len(tickets)
+
+        elapsed = time.perf_counter() - started
+        failed = [(ticket, error) for ticket, (_, error) in zip(tickets, outcomes) if error is not None]
+        if failed:
+            with self._lock:
+                self._stats['errors'] += 1
+                self._pending_leads -= sum(len(ticket.leads) for ticket, _ in failed)
+            print(f"[WRITER] ❌ {len(failed)} of {len(tickets)} submission(s) failed: {failed[0][1]}")
+
+        committed = [(ticket, result) for ticket, (result, error) in zip(tickets, outcomes) if error is None]
+        written = sum(len(ticket.leads) for ticket, _ in committed)
+        if written:
+            self._record(elapsed, written, [result for _, result in committed])
+        for ticket, (result, error) in zip(tickets, outcomes):
+            ticket._resolve(result, error)
+
+    def _write(self, ticket: WriteTicket):
+        """Commit one submission on its own; returns (result, error)"""
+        try:
+            return self._write_leads(ticket), None
+        except Exception as e:
+            return None, e
+
+    def _write_savepoint(self, cursor, ticket: WriteTicket):
+        """Write one submission inside the batch transaction; a failure undoes only its own rows"""
+        cursor.execute('SAVEPOINT lead_writer_ticket')
+        try:
+            result = self._write_leads(ticket)
+        except Exception as e:
+            cursor.execute('ROLLBACK TO lead_writer_ticket')
+            cursor.execute('RELEASE lead_writer_ticket')
+            return None, e
+        cursor.execute('RELEASE lead_writer_ticket')
+        return result, None
+
+    def _write_leads(self, ticket: WriteTicket) -> Dict[str, int]:
+        if not ticket.leads:
+            return {'inserted': 0, 'duplicates': 0}
+        return self.db.add_leads_bulk(ticket.leads, **ticket.defaults)
+
+    def _record(self, elapsed: float, written: int, results: List[dict]):
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._stats['batches'] += 1
+            self._stats['leads_written'] += written
+            self._stats['inserted'] += sum(r.get('inserted', 0) for r in results)
+            self._pending_leads -= written
+
+
+_writers: Dict[str, LeadWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_lead_writer(db) -> LeadWriter:
+    """Shared writer for db's file (one writer thread per database)"""
+    key = os.path.abspath(db.db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = LeadWriter(db)
+            _writers[key] = writer
+        return writer
+
+
+def writer_metrics() -> Dict[str, dict]:
+    """metrics() of every active writer, keyed by database path"""
+    with _writers_lock:
+        writers = dict(_writers)
+    return {path: writer.metrics() for path, writer in writers.items()}
+
+
+def close_all_writers():
+    """Drain and stop every writer (registered at exit so queued leads are not lost)"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all_writers)
@@ -0,0 +1,310 @@
+"""
+Card-level batching for LLM extraction.
+Collects result cards from many pages/combos and sends them to the LLM in a
+single structured request, then routes the returned records back to the
+combo each card came from.
+"""
+import asyncio
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from src.llm_scheduler import get_scheduler, LLMThrottledError
+
+# Rough chars-per-token ratio used for budgeting (good enough for English listings)
+CHARS_PER_TOKEN = 4
+
+DEFAULT_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "6000"))
+
+BATCH_INSTRUCTIONS = (
+    "The content is a list of business listing cards. Each card starts with a "
+    "'### CARD <id>' header. For every card extract: 'card_id' (the number from "
+    "the header), 'name', 'address', 'website', 'phone_number', 'email' (if "
+    "available, otherwise 'N/A'). Return exactly one object per card and never "
+    "merge data from different cards."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for budgeting requests"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def split_result_cards(html_content: str, css_selector: str = "div.result") -> List[str]:
+    """
+    Split a YellowPages results page into one HTML fragment per listing card.
+
+    Args:
+        html_content: Raw HTML content of a results page
+        css_selector: Selector matching one listing card
+
+    Returns:
+        List of card HTML strings (empty if nothing matches css_selector)
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return [str(card) for card in soup.select(css_selector)]
+
+
+def card_to_markdown(card_html: str) -> str:
+    """
+    Convert a single listing card into compact markdown-like text for the LLM.
+    Keeps visible text (one line per element) and the website link target.
+    """
+    soup = BeautifulSoup(card_html, 'html.parser')
+
+    lines = [line for line in soup.get_text("\n", strip=True).split("\n") if line]
+
+    website_elem = soup.find('a', class_='track-visit-website')
+    if website_elem and website_elem.get('href'):
+        lines.append(f"[Website]({website_elem['href']})")
+
+    return "\n".join(lines)
+
+
+def merge_missing_fields(base: dict, extra: dict, fields: Optional[List[str]] = None) -> dict:
+    """
+    Fill fields that are empty/'N/A' in base with values from extra.
+
+    Args:
+        base: Record from the deterministic extractor
+        extra: Record returned by the LLM
+        fields: Only consider these fields (default: every field in extra)
+
+    Returns:
+        A new merged record
+    """
+    merged = dict(base)
+    for field in fields or extra.keys():
+        value = extra.get(field)
+        if not value or value == 'N/A':
+            continue
+        if fields is not None or not merged.get(field) or merged.get(field) == 'N/A':
+            merged[field] = value
+    return merged
+
+
+class CardChunk:
+    """
+    One listing card waiting to be sent to the LLM.
+    partial holds what the deterministic extractor already found and
+    missing lists the fields the LLM should fill in.
+    """
+
+    def __init__(self, combo_key: str, markdown: str, html: str = "",
+                 partial: Optional[dict] = None, missing: Optional[List[str]] = None):
+        self.combo_key = combo_key
+        self.markdown = markdown
+        self.html = html
+        self.partial = partial
+        self.missing = missing
+        self.tokens = estimate_tokens(markdown)
+
+    def resolve(self, llm_records: List[dict]) -> List[dict]:
+        """Combine the LLM output for this card with the partial record"""
+        if self.partial is None:
+            return llm_records
+        if not llm_records:
+            return [self.partial]
+        return [merge_missing_fields(self.partial, llm_records[0], self.missing)]
+
+
+def _build_batch_content(chunks: List[CardChunk]) -> str:
+    """Join chunks into one prompt body, each tagged with its card id"""
+    return "\n\n".join(
+        f"### CARD {card_id}\n{chunk.markdown}"
+        for card_id, chunk in enumerate(chunks)
+    )
+
+
+def _is_error_block(block: dict) -> bool:
+    return bool(block.get('error')) and 'card_id' not in block
+
+
+def _batch_error(blocks) -> Optional[str]:
+    """Error message if the strategy returned only error blocks, else None"""
+    errors = [b for b in blocks if isinstance(b, dict) and _is_error_block(b)]
+    if errors and len(errors) == len(blocks):
+        return str(errors[0].get('content', 'LLM returned an error block'))
+    return None
+
+
+async def extract_batch(llm_strategy, chunks: List[CardChunk],
+                        url: str = "batch://cards") -> Dict[int, List[dict]]:
+    """
+    Send a list of card chunks to the LLM in one request.
+
+    Args:
+        llm_strategy: LLMExtractionStrategy built with BATCH_INSTRUCTIONS
+        chunks: Cards to extract, in card_id order
+        url: Label passed through to the strategy (used only for logging)
+
+    Returns:
+        Dict mapping card index -> list of extracted records for that card
+
+    Raises:
+        LLMThrottledError: if the provider kept rate limiting the request
+        RuntimeError: if the LLM returned an error block instead of data
+    """
+    content = _build_batch_content(chunks)
+
+    # Shared scheduler enforces RPM/TPM budgets and 429 backoff across all jobs;
+    # returned error blocks count as failures (throttled ones trigger the backoff)
+    blocks = await get_scheduler().call(
+        llm_strategy.extract, url, 0, content,
+        tokens=estimate_tokens(content),
+        result_error=_batch_error,
+    )
+
+    by_card: Dict[int, List[dict]] = {}
+    for block in blocks:
+        if not isinstance(block, dict) or _is_error_block(block):
+            continue
+        try:
+            card_id = int(re.sub(r'\D', '', str(block.get('card_id', ''))))
+        except ValueError:
+            if len(chunks) != 1:
+                continue
+            card_id = 0  # Single-card request, nothing to demultiplex
+        if not 0 <= card_id < len(chunks):
+            continue
+
+        record = dict(block)
+        record.pop('card_id', None)
+        record.pop('error', None)
+        by_card.setdefault(card_id, []).append(record)
+
+    return by_card
+
+
+class LLMBatcher:
+    """
+    Accumulates card-level chunks across pages and combos and extracts them
+    with as few LLM requests as the token budget allows.
+
+    Usage:
+        batcher = LLMBatcher(llm_strategy, fallback_extractor=extract_business_from_html)
+        batcher.add_cards(combo_key, cards_html)
+        if batcher.ready:
+            await batcher.flush()
+        records = batcher.take(combo_key)
+    """
+
+    def __init__(self, llm_strategy, token_budget: Optional[int] = None,
+                 fallback_extractor: Optional[Callable[[str], List[dict]]] = None,
+                 max_attempts: int = 3):
+        self.llm_strategy = llm_strategy
+        self.token_budget = token_budget or DEFAULT_BATCH_TOKEN_BUDGET
+        self.fallback_extractor = fallback_extractor
+        self.max_attempts = max_attempts
+
+        self.pending: List[CardChunk] = []
+        self.results: Dict[str, List[dict]] = {}
+
+        # Simple counters for reporting
+        self.stats = {
+            'requests': 0,
+            'cards_sent': 0,
+            'cards_fallback': 0,
+            'records': 0
+        }
+
+    @property
+    def pending_tokens(self) -> int:
+        return sum(chunk.tokens for chunk in self.pending)
+
+    @property
+    def ready(self) -> bool:
+        """True once enough cards are queued to fill a request"""
+        return self.pending_tokens >= self.token_budget
+
+    def add_cards(self, combo_key: str, cards_html: List[str]) -> int:
+        """Queue card HTML fragments for a combo, returns number queued"""
+        for card_html in cards_html:
+            self.add_chunk(CardChunk(combo_key, card_to_markdown(card_html), card_html))
+        self.results.setdefault(combo_key, [])
+        return len(cards_html)
+
+    def add_chunk(self, chunk: CardChunk):
+        """Queue an already prepared chunk"""
+        self.pending.append(chunk)
+        self.results.setdefault(chunk.combo_key, [])
+
+    def add_records(self, combo_key: str, records: List[dict]):
+        """Store records that needed no LLM work so take() returns them too"""
+        self.results.setdefault(combo_key, []).extend(records)
+        self.stats['records'] += len(records)
+
+    def _next_batch(self) -> List[CardChunk]:
+        """Pop the next group of chunks that fits in the token budget"""
+        batch = []
+        used = 0
+        while self.pending:
+            chunk = self.pending[0]
+            if batch and used + chunk.tokens > self.token_budget:
+                break
+            batch.append(self.pending.pop(0))
+            used += chunk.tokens
+        return batch
+
+    async def _send(self, batch: List[CardChunk]) -> Optional[Dict[int, List[dict]]]:
+        """Send one batch with retries, None if every attempt failed"""
+        for attempt in range(self.max_attempts):
+            try:
+                self.stats['requests'] += 1
+                if attempt == 0:
+                    self.stats['cards_sent'] += len(batch)
+                return await extract_batch(self.llm_strategy, batch)
+            except LLMThrottledError:
+                print(f"   ⚠️ API quota exhausted for batch of {len(batch)} cards — using direct extraction.")
+                return None
+            except Exception as e:
+                if attempt < self.max_attempts - 1:
+                    print(f"   ⚠️ Batch extraction failed, retrying (attempt {attempt + 1}/{self.max_attempts})...")
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                print(f"   ⚠️ Batch extraction failed after {self.max_attempts} attempts: {e}")
+        return None
+
+    def _fallback(self, chunk: CardChunk) -> List[dict]:
+        self.stats['cards_fallback'] += 1
+        if chunk.partial is not None:
+            return [chunk.partial]
+        if not self.fallback_extractor or not chunk.html:
+            return []
+        return self.fallback_extractor(chunk.html)
+
+    async def flush(self) -> Dict[str, List[dict]]:
+        """
+        Extract every queued chunk and route the records to their combos.
+
+        Returns:
+            Dict combo_key -> all records collected so far for that combo
+        """
+        while self.pending:
+            batch = self._next_batch()
+            by_card = await self._send(batch) if self.llm_strategy else None
+
+            for card_id, chunk in enumerate(batch):
+                if by_card is None or card_id not in by_card:
+                    # Whole request failed or the model skipped this card
+                    records = self._fallback(chunk)
+                else:
+                    records = chunk.resolve(by_card[card_id])
+                self.results[chunk.combo_key].extend(records)
+                self.stats['records'] += len(records)
+
+        return self.results
+
+    def take(self, combo_key: str) -> List[dict]:
+        """Remove and return the extracted records for a combo"""
+        return self.results.pop(combo_key, [])
+
+    def has_pending(self, combo_key: str) -> bool:
+        return any(chunk.combo_key == combo_key for chunk in self.pending)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['cards_sent']} cards in {s['requests']} LLM request(s), "
+                f"{s['cards_fallback']} via fallback, {s['records']} records")
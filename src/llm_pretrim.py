@@ -0,0 +1,113 @@
+"""
+Pre-processing of card markdown before it is sent to the LLM.
+Strips listing noise (ads, ratings blurbs, navigation links), collapses
+whitespace, drops cards we already have and keeps the request inside a
+token budget.
+"""
+import os
+import re
+from typing import List, Optional, Set, Tuple
+
+from src.llm_batcher import CardChunk, CHARS_PER_TOKEN
+
+DEFAULT_PAGE_TOKEN_BUDGET = int(os.getenv("LLM_PAGE_TOKEN_BUDGET", "3000"))
+MAX_CARD_TOKENS = int(os.getenv("LLM_MAX_CARD_TOKENS", "200"))
+
+# Whole lines that never carry business contact data
+NOISE_LINE_PATTERNS = [
+    r'^(ad|sponsored|featured|promoted)$',
+    r'^(website|directions|more info|view menu|menu|order online|get a quote|request a quote|book now|call now|visit website|share|save)$',
+    r'^\(?\d+\)?\s*(reviews?|ratings?)\)?$',
+    r'^[★☆✩✪\s\d.]*[★☆✩✪][★☆✩✪\s\d.]*$',  # star ratings (needs a star, so phones survive)
+    r'^\d(\.\d)?$',  # bare rating such as 4.5
+    r'^(bbb rating|trip ?advisor rating|yp rating).*',
+    r'^\d+\s+years?\s+in business$',
+    r'^years in business.*',
+    r'^(from business|amenities|neighborhoods?|categories|other information|extra phones|accepted payment).*',
+    r'^(open now|closed now|opens? at .*|closes? at .*)$',
+    r'^(next|previous|prev|page \d+)$',
+]
+_NOISE_RE = re.compile('|'.join(NOISE_LINE_PATTERNS), re.IGNORECASE)
+
+# Free-text blurbs (business descriptions) longer than this are dropped
+MAX_LINE_CHARS = 160
+
+
+def trim_card_markdown(markdown: str, max_tokens: int = MAX_CARD_TOKENS) -> str:
+    """
+    Remove non-business lines from a card and cap its size.
+
+    Args:
+        markdown: Card text from card_to_markdown
+        max_tokens: Hard cap for the card after cleaning
+
+    Returns:
+        Cleaned card text
+    """
+    kept = []
+    for line in markdown.split("\n"):
+        line = re.sub(r'\s+', ' ', line).strip()
+        if not line or _NOISE_RE.match(line):
+            continue
+        if len(line) > MAX_LINE_CHARS and not line.startswith('[Website]'):
+            continue
+        if kept and kept[-1] == line:
+            continue
+        kept.append(line)
+
+    trimmed = "\n".join(kept)
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(trimmed) > max_chars:
+        trimmed = trimmed[:max_chars].rsplit("\n", 1)[0]
+    return trimmed
+
+
+def _is_known(chunk: CardChunk, seen_names: Set[str], db=None) -> bool:
+    """True if the card's business is already in this session or the DB"""
+    partial = chunk.partial or {}
+    name = partial.get('name', '')
+    if not name:
+        return False
+    if name in seen_names:
+        return True
+    if db is not None and partial.get('phone_number'):
+        return db.is_duplicate(name, partial['phone_number'], partial.get('address', ''))
+    return False
+
+
+def prepare_llm_chunks(chunks: List[CardChunk], seen_names: Optional[Set[str]] = None,
+                       db=None, token_budget: Optional[int] = None) -> Tuple[List[CardChunk], List[CardChunk], dict]:
+    """
+    Decide which incomplete cards are worth an LLM call.
+
+    Args:
+        chunks: Incomplete cards from prepare_page_cards (markdown already trimmed)
+        seen_names: Names already collected this session
+        db: Optional LeadsDatabase used to skip businesses we already stored
+        token_budget: Max estimated prompt tokens for the page
+
+    Returns:
+        Tuple[List[CardChunk], List[CardChunk], dict]:
+            - Chunks to send to the LLM.
+            - Chunks over budget (their partial record is used instead).
+            - Stats: cards dropped as duplicates and estimated tokens.
+    """
+    token_budget = token_budget or DEFAULT_PAGE_TOKEN_BUDGET
+    seen_names = seen_names or set()
+
+    send = []
+    over_budget = []
+    stats = {'duplicates': 0, 'tokens_in': 0}
+
+    for chunk in chunks:
+        if _is_known(chunk, seen_names, db):
+            stats['duplicates'] += 1
+            continue
+        if send and stats['tokens_in'] + chunk.tokens > token_budget:
+            over_budget.append(chunk)
+            continue
+        send.append(chunk)
+        stats['tokens_in'] += chunk.tokens
+
+    return send, over_budget, stats
+
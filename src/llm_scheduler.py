@@ -0,0 +1,216 @@
+"""
+Process-wide LLM request scheduler.
+Every LLM call goes through one shared scheduler so concurrent jobs (CLI
+automation, API background threads) respect the same requests/minute and
+tokens/minute budgets, a global concurrency cap, and back off together when
+the provider answers 429.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+# Errors that mean "slow down" rather than "this request is broken"
+RATE_LIMIT_MARKERS = [
+    'rate limit',
+    'ratelimit',
+    '429',
+    'quota',
+    'resource_exhausted',
+    'too many requests',
+]
+
+WINDOW_SECONDS = 60.0
+
+
+def is_rate_limit_error(error: Any) -> bool:
+    """
+    Check whether an exception/message is a provider throttling error.
+    Exceptions match on their HTTP status or type (e.g. litellm's
+    RateLimitError), including the exceptions they were raised from.
+    """
+    if not isinstance(error, BaseException):
+        return any(marker in str(error).lower() for marker in RATE_LIMIT_MARKERS)
+    seen = []
+    while error is not None and not any(error is e for e in seen):
+        seen.append(error)
+        if getattr(error, 'status_code', None) == 429 or 'ratelimit' in type(error).__name__.lower():
+            return True
+        if any(marker in str(error).lower() for marker in RATE_LIMIT_MARKERS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class LLMThrottledError(Exception):
+    """Raised when a call is still throttled after all scheduler retries"""
+
+
+class LLMScheduler:
+    """
+    Shared gate in front of the LLM provider.
+
+    Budgets are enforced over a sliding 60 second window. A 429 from any
+    caller blocks every caller for the current backoff, which doubles on
+    each consecutive throttle and resets after a successful call.
+    Thread-safe, and usable from several event loops at once.
+    """
+
+    def __init__(self, requests_per_minute: int = 15, tokens_per_minute: int = 1_000_000,
+                 max_concurrency: int = 2, base_backoff: float = 2.0, max_backoff: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._window = deque()  # (timestamp, tokens) per admitted request
+        self._window_tokens = 0
+        self._active = 0
+        self._backoff = 0.0
+        self._blocked_until = 0.0
+
+        self._metrics = {
+            'requests': 0,
+            'tokens': 0,
+            'throttle_events': 0,
+            'gave_up': 0,
+            'queue_wait_total': 0.0,
+            'queue_wait_max': 0.0,
+        }
+
+    def _trim_window(self, now: float):
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+    def _try_admit(self, tokens: int) -> float:
+        """Admit the request (returns 0) or return how long to wait. Lock held."""
+        now = time.monotonic()
+        self._trim_window(now)
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._active >= self.max_concurrency:
+            return 0.05
+        if len(self._window) >= self.requests_per_minute:
+            return self._window[0][0] + WINDOW_SECONDS - now
+        if self._window and self._window_tokens + tokens > self.tokens_per_minute:
+            return self._window[0][0] + WINDOW_SECONDS - now
+
+        self._active += 1
+        self._window.append((now, tokens))
+        self._window_tokens += tokens
+        return 0.0
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """Wait for a slot; returns the time spent queued in seconds"""
+        queued_at = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_admit(tokens)
+                if wait <= 0:
+                    waited = time.monotonic() - queued_at
+                    self._metrics['requests'] += 1
+                    self._metrics['tokens'] += tokens
+                    self._metrics['queue_wait_total'] += waited
+                    self._metrics['queue_wait_max'] = max(self._metrics['queue_wait_max'], waited)
+                    return waited
+            # Poll in short steps so a released slot is picked up quickly
+            await asyncio.sleep(min(max(wait, 0.01), 1.0))
+
+    def release(self):
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    def report_success(self):
+        with self._lock:
+            self._backoff = 0.0
+
+    def report_throttled(self) -> float:
+        """Record a 429 and block all callers for the (doubled) backoff"""
+        with self._lock:
+            self._backoff = min(self.max_backoff, self._backoff * 2 if self._backoff else self.base_backoff)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + self._backoff)
+            self._metrics['throttle_events'] += 1
+            return self._backoff
+
+    async def call(self, func: Callable, *args, tokens: int = 1, max_attempts: int = 4,
+                   result_error: Optional[Callable[[Any], Optional[str]]] = None) -> Any:
+        """
+        Run a blocking LLM call through the scheduler.
+
+        Args:
+            func: Blocking callable (e.g. LLMExtractionStrategy.extract)
+            *args: Arguments for func
+            tokens: Estimated prompt tokens, counted against the TPM budget
+            max_attempts: Attempts before giving up on repeated throttling
+            result_error: Returns the error message if func *returned* a
+                failure instead of raising (crawl4ai error blocks), else None
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            LLMThrottledError: if still throttled after max_attempts
+            RuntimeError: if result_error reports a failure that is not throttling
+        """
+        for attempt in range(max_attempts):
+            await self.acquire(tokens)
+            try:
+                result = await asyncio.to_thread(func, *args)
+                error = result_error(result) if result_error else None
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                error = e
+            finally:
+                self.release()
+
+            if error is None:
+                self.report_success()
+                return result
+            if not is_rate_limit_error(error):
+                raise RuntimeError(str(error))
+            backoff = self.report_throttled()
+            print(f"   ⚠️ LLM throttled, all jobs backing off {backoff:.1f}s (attempt {attempt + 1}/{max_attempts})")
+
+        with self._lock:
+            self._metrics['gave_up'] += 1
+        raise LLMThrottledError(f"LLM still rate limited after {max_attempts} attempts")
+
+    def metrics(self) -> dict:
+        """Snapshot of scheduler counters"""
+        with self._lock:
+            m = dict(self._metrics)
+            m['active'] = self._active
+            m['backoff_seconds'] = self._backoff
+            m['requests_in_window'] = len(self._window)
+            m['tokens_in_window'] = self._window_tokens
+        m['queue_wait_avg'] = m['queue_wait_total'] / m['requests'] if m['requests'] else 0.0
+        return m
+
+    def summary(self) -> str:
+        m = self.metrics()
+        return (f"{m['requests']} LLM requests, {m['throttle_events']} throttle events, "
+                f"avg queue wait {m['queue_wait_avg']:.2f}s (max {m['queue_wait_max']:.2f}s)")
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler, configured from the environment"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "15")),
+                tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000")),
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "2")),
+            )
+        return _scheduler
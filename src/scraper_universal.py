@@ -4,6 +4,7 @@ Tries YellowPages, Yelp, Google Maps, 411 in sequence
 Uses advanced bypasses: rotating user agents, cookies, delays
 """
 
+import os
 import time
 import re
 import random
@@ -22,6 +23,9 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
 ]
 
+# Overridable so runs can be pointed at the local mocks (python -m mocks)
+MAPS_BASE_URL = os.getenv("MAPS_BASE_URL", "https://www.google.com/maps").rstrip("/")
+
 
 def create_advanced_driver():
     """Create Chrome driver with ADVANCED anti-detection - RUNS INVISIBLY"""
@@ -73,7 +77,7 @@ def scrape_with_selenium(zip_code: str, category: str, max_results: int = 50) ->
         print("\n[ATTEMPT 1] Trying Google Maps...")
         try:
             query = f"{category} near {zip_code}".replace(' ', '+')
-            url = f"https://www.google.com/maps/search/{query}"
+            url = f"{MAPS_BASE_URL}/search/{query}"
 
             print(f"[INFO] Loading: {url}")
             driver.get(url)
@@ -0,0 +1,272 @@
+"""
+Shared lead store across profiles.
+
+Profiles that target the same ZIPs/categories would otherwise scrape,
+validate and store the same businesses once each. In shared mode
+(SHARED_LEAD_STORE=<path to a .db>) every scraped business is kept once
+in a canonical `businesses` table, deduplicated like the profile
+databases (business_hash, then phone_norm + name_key), and validated
+only the first time it is seen. `profile_leads` records which profiles
+hold a business. `shared_combos` remembers when each ZIP + category combo
+was last scraped and `combo_businesses` which businesses that scrape
+returned, so a profile that targets a recently scraped combo
+(SHARED_COMBO_MAX_AGE_DAYS) gets its businesses without scraping again.
+
+The store saves scraping and validation work only: each profile still
+keeps its own copy of its leads. Its database is the source for listings,
+counters, search, the change feed and lead status, and the desktop app
+opens that file directly, so those rows stay copies rather than links
+into this store.
+
+    store = get_shared_store()
+    leads = store.claim_combo(profile_id, zip_code, category)   # [] if not scraped recently
+    if not leads:
+        result = store.add_leads(profile_id, scraped, zip_code=zip_code, category=category)
+        leads = result['valid_leads']
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from src.database import (
+    apply_migrations, business_hash, get_connection_manager, lead_is_valid,
+)
+from src.validators import LeadValidator, canonical_name, normalize_phone
+
+# Path of the shared store; empty (the default) keeps every profile independent
+SHARED_STORE_PATH = os.getenv("SHARED_LEAD_STORE", "")
+# Combos scraped longer ago than this are scraped again instead of reused
+SHARED_COMBO_MAX_AGE_DAYS = int(os.getenv("SHARED_COMBO_MAX_AGE_DAYS", "30"))
+
+
+def _migration_shared_schema(cursor):
+    """Canonical businesses, per-profile membership, scraped combos and their businesses"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS businesses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            business_hash TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            website TEXT,
+            zip_code TEXT,
+            category TEXT,
+            city TEXT,
+            phone_norm TEXT,
+            name_key TEXT,
+            is_valid INTEGER NOT NULL DEFAULT 0,
+            passed_validation INTEGER NOT NULL,
+            validation_issues TEXT,
+            first_scraped TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_businesses_phone_name ON businesses(phone_norm, name_key)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS profile_leads (
+            profile_id TEXT NOT NULL,
+            business_id INTEGER NOT NULL REFERENCES businesses(id),
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (profile_id, business_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_profile_leads_business ON profile_leads(business_id)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shared_combos (
+            zip_code TEXT NOT NULL,
+            category TEXT NOT NULL,
+            first_profile TEXT,
+            scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (zip_code, category)
+        ) WITHOUT ROWID
+    ''')
+    # Every business a combo's scrape returned, including ones first stored under another combo
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS combo_businesses (
+            zip_code TEXT NOT NULL,
+            category TEXT NOT NULL,
+            business_id INTEGER NOT NULL REFERENCES businesses(id),
+            PRIMARY KEY (zip_code, category, business_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+# Same (version, description, function) format as src/database.py MIGRATIONS
+SHARED_MIGRATIONS = [
+    (1, "businesses, profile_leads, shared_combos and combo_businesses", _migration_shared_schema),
+]
+
+# Keys of the lead records claim_combo returns (add_leads_bulk input format)
+LEAD_FIELDS = ['name', 'address', 'phone_number', 'email', 'website', 'zip_code', 'category', 'city']
+
+
+class SharedLeadStore:
+    """One SQLite file holding every profile's businesses exactly once"""
+
+    def __init__(self, db_path: str = "data/shared_leads.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._db = get_connection_manager(db_path)
+        if not self._db.schema_ready:
+            applied = apply_migrations(self._db, SHARED_MIGRATIONS)
+            if applied:
+                print(f"🗄️  Shared store schema migrated ({applied} step(s)): {db_path}")
+            self._db.schema_ready = True
+        self.validator = LeadValidator()
+
+    def add_leads(self, profile_id: str, leads: List[dict], zip_code: Optional[str] = None,
+                  category: Optional[str] = None, city: Optional[str] = None) -> Dict[str, object]:
+        """
+        Store scraped leads once and link them to a profile.
+
+        Businesses already in the store keep their stored record and
+        validation result; only new ones are validated.
+
+        Args:
+            profile_id: Profile that scraped the leads
+            leads: Scraper records (name, phone_number or phone, address, email, website)
+            zip_code, category, city: Defaults for records without their own
+
+        Returns:
+            Dict with 'inserted' (new businesses), 'reused' (already stored),
+            'linked' (new for this profile), 'invalid' counts and 'valid_leads',
+            the records that passed validation, for the profile database
+        """
+        inserted = reused = linked = invalid = 0
+        valid_leads = []
+        seen = set()
+
+        combo = bool(zip_code and category)
+
+        with self._db.transaction() as cursor:
+            if combo:
+                # A rescrape replaces the combo's business list
+                cursor.execute('DELETE FROM combo_businesses WHERE zip_code = ? AND category = ?',
+                               (zip_code, category))
+            for lead in leads:
+                name = lead.get('name') or ''
+                phone = lead.get('phone_number') or lead.get('phone') or ''
+                address = lead.get('address') or ''
+                lead_hash = business_hash(name, phone, address)
+                phone_norm, name_key = normalize_phone(phone), canonical_name(name)
+
+                row = cursor.execute('''
+                    SELECT id, passed_validation FROM businesses WHERE business_hash = ?
+                    UNION ALL
+                    SELECT id, passed_validation FROM businesses WHERE phone_norm = ? AND name_key = ?
+                    LIMIT 1
+                ''', (lead_hash, phone_norm, name_key)).fetchone()
+
+                if row is None:
+                    passed, issues = self.validator.is_valid_lead({
+                        'name': name, 'phone': phone, 'email': lead.get('email'),
+                        'website': lead.get('website'), 'address': address,
+                    }, strict=False)
+                    cursor.execute('''
+                        INSERT INTO businesses
+                        (business_hash, name, address, phone, email, website, zip_code, category, city,
+                         phone_norm, name_key, is_valid, passed_validation, validation_issues)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (lead_hash, name, address, phone, lead.get('email'), lead.get('website'),
+                          lead.get('zip_code') or zip_code, lead.get('category') or category,
+                          lead.get('city') or city, phone_norm, name_key, lead_is_valid(name, phone),
+                          int(passed), json.dumps(issues) if issues else None))
+                    business_id = cursor.lastrowid
+                    inserted += 1
+                else:
+                    business_id, passed = row
+                    reused += 1
+
+                if combo:
+                    cursor.execute(
+                        'INSERT OR IGNORE INTO combo_businesses (zip_code, category, business_id) VALUES (?, ?, ?)',
+                        (zip_code, category, business_id)
+                    )
+
+                if not passed:
+                    invalid += 1
+                    continue
+                if business_id in seen:
+                    continue
+                seen.add(business_id)
+
+                cursor.execute(
+                    'INSERT OR IGNORE INTO profile_leads (profile_id, business_id) VALUES (?, ?)',
+                    (profile_id, business_id)
+                )
+                linked += cursor.rowcount
+                valid_leads.append({
+                    **lead, 'zip_code': lead.get('zip_code') or zip_code,
+                    'category': lead.get('category') or category, 'city': lead.get('city') or city,
+                })
+
+            if combo:
+                # A rescrape of a stale combo makes it reusable again
+                cursor.execute('''
+                    INSERT INTO shared_combos (zip_code, category, first_profile) VALUES (?, ?, ?)
+                    ON CONFLICT(zip_code, category) DO UPDATE SET scraped_date = CURRENT_TIMESTAMP
+                ''', (zip_code, category, profile_id))
+
+        return {'inserted': inserted, 'reused': reused, 'linked': linked, 'invalid': invalid,
+                'valid_leads': valid_leads}
+
+    def claim_combo(self, profile_id: str, zip_code: str, category: str,
+                    max_age_days: int = SHARED_COMBO_MAX_AGE_DAYS) -> List[dict]:
+        """
+        Link every valid stored business of a recently scraped combo to a profile.
+
+        Args:
+            max_age_days: Only reuse a scrape this many days old or newer
+
+        Returns:
+            The businesses as lead records (already validated), or [] if no
+            profile has scraped this combo within max_age_days
+        """
+        with self._db.transaction() as cursor:
+            fresh = cursor.execute('''
+                SELECT 1 FROM shared_combos
+                WHERE zip_code = ? AND category = ? AND scraped_date >= datetime('now', ?)
+            ''', (zip_code, category, f'-{max_age_days} days')).fetchone()
+            if fresh is None:
+                return []
+            cursor.execute('''
+                INSERT OR IGNORE INTO profile_leads (profile_id, business_id)
+                SELECT ?, b.id FROM combo_businesses c JOIN businesses b ON b.id = c.business_id
+                WHERE c.zip_code = ? AND c.category = ? AND b.passed_validation = 1
+            ''', (profile_id, zip_code, category))
+            # Filed under the claimed combo, like add_leads' valid_leads, whichever combo stored them first
+            rows = cursor.execute('''
+                SELECT b.name, b.address, b.phone, b.email, b.website, c.zip_code, c.category, b.city
+                FROM combo_businesses c JOIN businesses b ON b.id = c.business_id
+                WHERE c.zip_code = ? AND c.category = ? AND b.passed_validation = 1
+                ORDER BY b.id
+            ''', (zip_code, category)).fetchall()
+        return [dict(zip(LEAD_FIELDS, row)) for row in rows]
+
+    def stats(self) -> dict:
+        """Business count and how many profiles share them"""
+        reader = self._db.reader()
+        businesses = reader.execute('SELECT COUNT(*) FROM businesses').fetchone()[0]
+        per_profile = dict(reader.execute('SELECT profile_id, COUNT(*) FROM profile_leads GROUP BY profile_id'))
+        return {
+            'businesses': businesses,
+            'memberships': sum(per_profile.values()),
+            'by_profile': per_profile,
+            'combos': reader.execute('SELECT COUNT(*) FROM shared_combos').fetchone()[0],
+        }
+
+
+_store: Optional[SharedLeadStore] = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store() -> Optional[SharedLeadStore]:
+    """The shared store when SHARED_LEAD_STORE is set, otherwise None (per-profile mode)"""
+    global _store
+    if not SHARED_STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SharedLeadStore(SHARED_STORE_PATH)
+        return _store
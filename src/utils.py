@@ -4,6 +4,7 @@ from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional, Tuple, List
 from src.validators import LeadValidator
+from src.database import LeadsDatabase
 
 def is_duplicated(record: str, seen_names: set) -> bool:
     return record in seen_names
@@ -66,7 +67,8 @@ def validate_and_filter_leads(leads: list, db_path: str = None, strict: bool = F
     Validate leads and separate valid from invalid ones
     Returns: (valid_leads, invalid_leads_with_reasons)
     """
-    validator = LeadValidator(db_path)
+    # The database's validator checks near-duplicates over its pooled connection
+    validator = LeadsDatabase(db_path).validator if db_path else LeadValidator()
 
     valid_leads = []
     invalid_leads = []
@@ -103,5 +105,6 @@ def enrich_lead_with_validation_flags(lead: dict, db_path: str = None) -> dict:
     Add validation flags and enriched data to a lead
     Useful for exporting leads with quality indicators
     """
-    validator = LeadValidator(db_path)
+    # The database's validator checks near-duplicates over its pooled connection
+    validator = LeadsDatabase(db_path).validator if db_path else LeadValidator()
     return validator.enrich_lead_data(lead)
@@ -3,16 +3,47 @@ Data validation and quality checks for lead generation
 """
 import re
 import sqlite3
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 from difflib import SequenceMatcher
 from urllib.parse import urlparse
 
 
+# Legal-form words dropped from names before comparing them
+BUSINESS_SUFFIXES = {
+    'llc', 'inc', 'incorporated', 'co', 'corp', 'corporation', 'company',
+    'ltd', 'limited', 'pllc', 'pa', 'pc', 'lp', 'llp',
+}
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Digits only, without a leading US country code; None if no digits"""
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits or None
+
+
+def canonical_name(name: Optional[str]) -> Optional[str]:
+    """
+    Comparison key for a business name: lowercase, no punctuation, no
+    leading "the" and no trailing legal suffixes ("Acme Roofing, LLC" -> "acme roofing")
+    """
+    text = re.sub(r"['\u2019]", '', (name or '').lower()).replace('&', ' and ')
+    words = re.sub(r'[^\w\s]', ' ', text).split()
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    while len(words) > 1 and words[-1] in BUSINESS_SUFFIXES:
+        words.pop()
+    return ' '.join(words) or None
+
+
 class LeadValidator:
     """Validates and enriches lead data to ensure quality"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, connection: Optional[Callable[[], sqlite3.Connection]] = None):
         self.db_path = db_path
+        # Returns a connection to db_path; LeadsDatabase passes its pooled read-only one
+        self.connection = connection
 
         # Common generic email prefixes to flag
         self.generic_emails = [
@@ -104,20 +135,25 @@ class LeadValidator:
         Check for near-duplicate business names using fuzzy matching
         Returns: (lead_id, existing_name, similarity_score) if found, None otherwise
         """
-        if not self.db_path:
+        if not self.connection:
             return None
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get all existing business names
-        cursor.execute('SELECT id, name FROM leads')
-        existing_leads = cursor.fetchall()
-        conn.close()
-
         # Normalize the input name
         normalized_name = name.lower().strip()
 
+        # all_leads covers leads_archive too, so archived businesses are still matched
+        conn = self.connection()
+
+        # Same canonical name (e.g. "Acme Roofing" vs "Acme Roofing LLC") is an indexed lookup
+        name_key = canonical_name(name)
+        if name_key:
+            for lead_id, existing_name in conn.execute('SELECT id, name FROM all_leads WHERE name_key = ?', (name_key,)):
+                if existing_name.lower().strip() != normalized_name:
+                    return (lead_id, existing_name, 1.0)
+
+        # Get all existing business names
+        existing_leads = conn.execute('SELECT id, name FROM all_leads').fetchall()
+
         # Check similarity with each existing name
         for lead_id, existing_name in existing_leads:
             normalized_existing = existing_name.lower().strip()
@@ -188,7 +224,7 @@ class LeadValidator:
             enriched['address_standardized'] = self.standardize_address(lead_data['address'])
 
         # Check for near-duplicates
-        if self.db_path:
+        if self.connection:
             near_dup = self.check_near_duplicate(lead_data.get('name', ''))
             if near_dup:
                 enriched['near_duplicate'] = {
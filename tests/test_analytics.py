@@ -0,0 +1,28 @@
+from src.analytics import ProfileAnalytics
+from src.database import LeadsDatabase
+
+
+def test_profiles_beyond_attach_limit_are_included(tmp_path):
+    profiles = []
+    for i in range(12):  # SQLite attaches at most 10 databases per connection
+        db_path = str(tmp_path / f"profile{i}.db")
+        db = LeadsDatabase(db_path)
+        db.add_lead("Acme Roofing", "1 Main St", "813-555-1212", skip_validation=True)
+        db.add_lead(f"Shop {i}", f"{i} Oak Ave", f"813-555-{1000 + i}", skip_validation=True)
+        db.mark_combo_scraped("33527", "roofing")
+        profiles.append((f"profile,{i}", db_path))
+
+    analytics = ProfileAnalytics(profiles)
+    try:
+        totals = analytics.profile_totals()
+        assert sorted(totals) == sorted(pid for pid, _ in profiles)
+        assert all(counts["total"] == 2 for counts in totals.values())
+
+        overlaps = analytics.overlapping_businesses()
+        assert [(o["name"], o["profileCount"]) for o in overlaps] == [("Acme Roofing", 12)]
+        assert sorted(overlaps[0]["profiles"]) == sorted(pid for pid, _ in profiles)
+
+        combos = analytics.scraped_combos("33527")
+        assert len(combos) == 1 and len(combos[0]["profiles"]) == 12
+    finally:
+        analytics.close()
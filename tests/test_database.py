@@ -0,0 +1,59 @@
+import random
+
+from benchmarks.bench_database import seed_database
+from src.database import LeadsDatabase
+
+# Plan steps that mean a query is not served by an index. Sorting the handful
+# of aggregated groups (ORDER BY count) is fine; sorting rows is not.
+BAD_PLAN_STEPS = ('SCAN leads', 'USE TEMP B-TREE FOR GROUP BY')
+BAD_ROW_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+def test_add_new_leads_dedupes_within_batch_and_against_db(tmp_path):
+    db = LeadsDatabase(str(tmp_path / "leads.db"))
+    page = [
+        {"name": "Acme Roofing LLC", "phone_number": "(813) 555-1212", "address": "1 Main St"},
+        {"name": "Acme Roofing", "phone_number": "813-555-1212", "address": "1 Main Street"},
+        {"name": "Bob's Pest", "phone_number": "813-555-0000", "address": "2 Oak Ave"},
+    ]
+
+    new_leads, batch_dupes, db_dupes = db.add_new_leads(page)
+    assert [lead["name"] for lead in new_leads] == ["Acme Roofing LLC", "Bob's Pest"]
+    assert (batch_dupes, db_dupes) == (1, 0)
+    assert db.get_total_leads() == 2
+
+    new_leads, batch_dupes, db_dupes = db.add_new_leads(page)
+    assert (new_leads, batch_dupes, db_dupes) == ([], 1, 2)
+
+
+def _read_path_statements(db):
+    """SELECTs on leads issued by the listing and dashboard read paths"""
+    statements = []
+    reader = db._db.reader()
+    reader.set_trace_callback(statements.append)
+    try:
+        db.get_all_leads()
+        db.get_dashboard_stats()
+        db.get_valid_lead_count()
+        _, cursor = db.query_leads(limit=50)
+        db.query_leads(sort='oldest', after_cursor=cursor, limit=50)
+        for key in ('zip_code', 'category', 'status'):
+            db.query_leads({key: 'x'}, after_cursor=cursor, limit=50)
+        db.query_leads({'status': 'Archived'}, after_cursor=cursor, limit=50)
+        db.query_leads(include_archived=True, limit=50)
+    finally:
+        reader.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith('SELECT') and 'leads' in sql]
+
+
+def test_read_queries_use_indexes(tmp_path):
+    db = LeadsDatabase(str(tmp_path / "plans.db"))
+    seed_database(db, 2000, random.Random(7))
+    reader = db._db.reader()
+
+    statements = _read_path_statements(db)
+    assert statements
+    for sql in statements:
+        plan = [row[3] for row in reader.execute(f'EXPLAIN QUERY PLAN {sql}')]
+        bad_steps = BAD_PLAN_STEPS if 'GROUP BY' in sql else BAD_PLAN_STEPS + (BAD_ROW_SORT,)
+        assert not [step for step in plan if step.startswith(bad_steps)], (sql, plan)
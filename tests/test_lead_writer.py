@@ -0,0 +1,46 @@
+from src.database import LeadsDatabase
+from src.lead_writer import LeadWriter
+
+
+class FlakyDatabase:
+    """No transaction(), like the desktop app's LeadsDatabase; rejects leads named 'bad'"""
+
+    db_path = "flaky.db"
+
+    def add_leads_bulk(self, leads, **defaults):
+        if any(lead["name"] == "bad" for lead in leads):
+            raise ValueError("bad lead")
+        return {"inserted": len(leads), "duplicates": 0}
+
+
+def test_failed_submission_does_not_fail_the_batch():
+    writer = LeadWriter(FlakyDatabase(), linger=0.2)
+    good = writer.submit([{"name": "good"}])
+    bad = writer.submit([{"name": "bad"}])
+    writer.flush()
+    writer.close()
+
+    assert good.wait(1) == {"inserted": 1, "duplicates": 0}
+    assert isinstance(bad.error, ValueError)
+    metrics = writer.metrics()
+    assert (metrics["inserted"], metrics["errors"], metrics["pending_leads"]) == (1, 1, 0)
+
+
+def test_failed_submission_rolls_back_only_its_own_rows(tmp_path):
+    db = LeadsDatabase(str(tmp_path / "leads.db"))
+    writer = LeadWriter(db, linger=0.2)
+    first = writer.submit([{"name": "Acme Roofing", "phone_number": "813-555-1212", "address": "1 Main St"}],
+                          skip_validation=True)
+    # The second lead can't be bound, after the first one of this submission was inserted
+    bad = writer.submit([{"name": "Bob's Pest", "phone_number": "813-555-0000", "address": "2 Oak Ave"},
+                         {"name": "Broken", "phone_number": "813-555-0001", "email": ["not", "text"]}],
+                        skip_validation=True)
+    last = writer.submit([{"name": "Cal's Gutters", "phone_number": "813-555-2222", "address": "3 Elm St"}],
+                         skip_validation=True)
+    writer.flush()
+    writer.close()
+
+    assert first.wait(1)["inserted"] == 1 and last.wait(1)["inserted"] == 1
+    assert bad.error is not None
+    assert sorted(lead[1] for lead in db.get_all_leads(valid_only=False)) == ["Acme Roofing", "Cal's Gutters"]
+    assert writer.metrics()["batches"] == 1
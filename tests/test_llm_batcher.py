@@ -0,0 +1,13 @@
+import asyncio
+
+from src.llm_batcher import CardChunk, LLMBatcher
+
+
+def test_cards_without_llm_are_not_counted_as_sent():
+    batcher = LLMBatcher(None)
+    batcher.add_chunk(CardChunk("33527|roofing", "Acme Roofing", partial={"name": "Acme Roofing"}))
+
+    results = asyncio.run(batcher.flush())
+
+    assert results == {"33527|roofing": [{"name": "Acme Roofing"}]}
+    assert (batcher.stats["cards_sent"], batcher.stats["requests"], batcher.stats["cards_fallback"]) == (0, 0, 1)
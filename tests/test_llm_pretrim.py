@@ -0,0 +1,16 @@
+from src.llm_pretrim import trim_card_markdown
+
+
+def test_phone_lines_survive():
+    for phone in ("813.555.1212", "813 555 1212", "(813) 555-1212", "8135551212"):
+        assert phone in trim_card_markdown(f"Acme Pest Control\n{phone}\n123 Main St").split("\n")
+
+
+def test_zip_line_survives():
+    card = "Acme Pest Control\n123 Main St\nTampa, FL\n33527"
+    assert "33527" in trim_card_markdown(card).split("\n")
+
+
+def test_rating_and_navigation_noise_removed():
+    card = "Acme Pest Control\n★★★★☆\n4.5\n(12) Reviews\nNext\nPage 2\n(813) 555-1212"
+    assert trim_card_markdown(card).split("\n") == ["Acme Pest Control", "(813) 555-1212"]
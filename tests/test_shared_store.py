@@ -0,0 +1,36 @@
+from src.shared_store import SharedLeadStore
+
+LEADS = [{"name": "Acme Roofing", "phone_number": "(813) 555-1212", "address": "1 Main St, Tampa, FL 33527"}]
+
+
+def test_claim_combo_reuses_only_recent_scrapes(tmp_path):
+    store = SharedLeadStore(str(tmp_path / "shared.db"))
+    assert store.claim_combo("a", "33527", "roofing") == []
+
+    result = store.add_leads("a", LEADS, zip_code="33527", category="roofing")
+    assert result["inserted"] == 1 and len(result["valid_leads"]) == 1
+
+    assert [lead["name"] for lead in store.claim_combo("b", "33527", "roofing")] == ["Acme Roofing"]
+    assert store.stats()["by_profile"] == {"a": 1, "b": 1}
+
+    with store._db.transaction() as cursor:
+        cursor.execute("UPDATE shared_combos SET scraped_date = datetime('now', '-40 days')")
+    assert store.claim_combo("c", "33527", "roofing", max_age_days=30) == []
+
+    # Scraping the stale combo again makes it reusable
+    store.add_leads("c", LEADS, zip_code="33527", category="roofing")
+    assert len(store.claim_combo("d", "33527", "roofing", max_age_days=30)) == 1
+
+
+def test_claim_combo_includes_businesses_first_stored_under_another_combo(tmp_path):
+    store = SharedLeadStore(str(tmp_path / "shared.db"))
+    acme = {"name": "Acme Roofing", "phone_number": "(813) 555-1212", "address": "1 Main St, Tampa, FL 33527"}
+    bob = {"name": "Bob Gutters", "phone_number": "(813) 555-3434", "address": "2 Oak Ave, Tampa, FL 33527"}
+    store.add_leads("a", [acme], zip_code="33527", category="roofing")
+    result = store.add_leads("b", [acme, bob], zip_code="33527", category="gutters")
+    assert (result["inserted"], result["reused"]) == (1, 1)
+
+    claimed = store.claim_combo("c", "33527", "gutters")
+    assert [(lead["name"], lead["category"]) for lead in claimed] == [("Acme Roofing", "gutters"),
+                                                                      ("Bob Gutters", "gutters")]
+    assert [lead["name"] for lead in store.claim_combo("d", "33527", "roofing")] == ["Acme Roofing"]